@@ -0,0 +1,119 @@
+"""
+Microphone Capture for MAYA
+Thread-safe recording shared by the voice listeners
+
+Each recording gets its own chunk queue, and start/stop go through
+events instead of bare boolean flags, so the PortAudio callback thread,
+the recording thread and the GUI thread never race on shared state. This
+matters most on the free-threaded (no-GIL) build, where nothing
+serializes them implicitly.
+"""
+
+import queue
+import threading
+import numpy as np
+import sounddevice as sd
+
+
+class ListenError(Exception):
+    """One utterance could not be turned into text; the message is user-facing"""
+
+
+class MicrophoneCapture:
+    """One microphone stream at a time, stoppable from any thread"""
+    
+    def __init__(self, sample_rate=16000, dtype=np.float32, blocksize=1024):
+        """
+        Initialize capture
+        
+        Args:
+            sample_rate: Sample rate in Hz
+            dtype: Sample type delivered by the stream
+            blocksize: Frames per callback
+        """
+        self.sample_rate = sample_rate
+        self.dtype = dtype
+        self.blocksize = blocksize
+        self._stream_lock = threading.Lock()  # Serializes recordings
+        self._state_lock = threading.Lock()  # Guards arm/stop transitions
+        self._active = threading.Event()  # Set from arm() until the recording ends
+        self._stop = threading.Event()  # Stop token of the current recording
+    
+    @property
+    def is_recording(self):
+        return self._active.is_set()
+    
+    def arm(self):
+        """
+        Mark a recording as starting
+        
+        Call before handing record() to a thread so a stop() issued in
+        between is not lost. Each recording gets a fresh stop token, so
+        arming never revives a recording that was just stopped.
+        """
+        with self._state_lock:
+            self._stop = threading.Event()
+            self._active.set()
+    
+    def stop(self):
+        """Stop the current (or armed) recording"""
+        with self._state_lock:
+            self._stop.set()
+    
+    def prepare(self):
+        """
+        Initialize PortAudio and validate the input device ahead of the
+        first recording, without opening the microphone
+        """
+        sd.check_input_settings(channels=1, dtype=self.dtype, samplerate=self.sample_rate)
+    
+    def record(self, duration):
+        """
+        Record from the microphone (blocking)
+        
+        Args:
+            duration: Recording duration in seconds
+        Returns: mono audio of self.dtype (empty if nothing was captured)
+        """
+        audio_data = []
+        
+        with self._stream_lock:
+            with self._state_lock:
+                if not self._active.is_set():
+                    self._stop = threading.Event()
+                    self._active.set()
+                stop = self._stop
+            
+            # Fresh queue per recording: no stale chunks from a previous stream
+            chunks = queue.SimpleQueue()
+            
+            def callback(indata, frames, time, status):
+                if status:
+                    print(f"Audio status: {status}")
+                if not stop.is_set():
+                    chunks.put(indata.copy())
+            
+            try:
+                with sd.InputStream(
+                    samplerate=self.sample_rate,
+                    channels=1,
+                    dtype=self.dtype,
+                    blocksize=self.blocksize,
+                    callback=callback
+                ):
+                    print(f"Recording for {duration} seconds...")
+                    for _ in range(int(self.sample_rate * duration / self.blocksize)):
+                        if stop.is_set():
+                            break
+                        try:
+                            audio_data.append(chunks.get(timeout=1))
+                        except queue.Empty:
+                            continue
+            finally:
+                with self._state_lock:
+                    if self._stop is stop:  # Not re-armed for the next recording
+                        self._active.clear()
+        
+        if not audio_data:
+            return np.zeros(0, dtype=self.dtype)
+        return np.concatenate(audio_data, axis=0).flatten()
@@ -0,0 +1,159 @@
+"""
+Conversation Log for MAYA
+Append-only SQLite history of chat messages, read back in pages and
+searchable with FTS5
+
+Writes go through a queue to one writer thread that commits in batches,
+so the GUI thread never waits on disk. The database runs in WAL mode, so
+page and search reads never block on that writer.
+"""
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    is_user INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+"""
+
+
+class ConversationLog:
+    """Persistent message history; rows are (id, created_at, is_user, text)"""
+    
+    def __init__(self, db_path=None, batch_size=64, flush_interval=0.5):
+        """
+        Initialize log and start its writer thread
+        
+        Args:
+            db_path: SQLite file (default ~/.maya/conversations.db)
+            batch_size: Messages committed per transaction at most
+            flush_interval: Seconds a queued message may wait for its batch to fill
+        """
+        self.db_path = Path(db_path) if db_path else Path.home() / ".maya" / "conversations.db"
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = queue.SimpleQueue()
+        self._local = threading.local()
+        
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        try:
+            connection.executescript(FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            print("⚠ SQLite has no FTS5; history search falls back to LIKE")
+            self.has_fts = False
+        os.chmod(self.db_path, 0o600)
+        
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+    
+    def _connect(self):
+        """This thread's connection (one per thread, opened on first use)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+    
+    def append(self, text, is_user, created_at=None):
+        """Queue one message for writing (never blocks)"""
+        self._pending.put((created_at or time.time(), 1 if is_user else 0, text))
+    
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            item = self._pending.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._pending.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            
+            try:
+                with connection:
+                    connection.execute("BEGIN")
+                    connection.executemany(
+                        "INSERT INTO messages (created_at, is_user, text) VALUES (?, ?, ?)", batch
+                    )
+            except sqlite3.Error as e:
+                print(f"Error writing conversation log: {e}")
+            if stop:
+                break
+        connection.close()
+    
+    def recent(self, limit=50):
+        """Newest page of messages, oldest first"""
+        rows = self._connect().execute(
+            "SELECT id, created_at, is_user, text FROM messages ORDER BY id DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return rows[::-1]
+    
+    def page_before(self, before_id, limit=50):
+        """The page of messages just older than before_id, oldest first"""
+        rows = self._connect().execute(
+            "SELECT id, created_at, is_user, text FROM messages WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before_id, limit)
+        ).fetchall()
+        return rows[::-1]
+    
+    def search(self, query, limit=100):
+        """
+        Messages matching every word of query (prefix match), newest first
+        Returns: rows, or [] for an empty query
+        """
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        connection = self._connect()
+        if self.has_fts:
+            # Quote each word so FTS5 syntax in the query is matched literally
+            match = " ".join(f'"{word}"*' for word in words)
+            return connection.execute(
+                "SELECT m.id, m.created_at, m.is_user, m.text FROM messages_fts "
+                "JOIN messages m ON m.id = messages_fts.rowid "
+                "WHERE messages_fts MATCH ? ORDER BY m.id DESC LIMIT ?",
+                (match, limit)
+            ).fetchall()
+        
+        clauses = " AND ".join("text LIKE ?" for _ in words)
+        return connection.execute(
+            f"SELECT id, created_at, is_user, text FROM messages WHERE {clauses} "
+            "ORDER BY id DESC LIMIT ?",
+            [f"%{word}%" for word in words] + [limit]
+        ).fetchall()
+    
+    def close(self):
+        """Write everything still queued and stop the writer"""
+        self._pending.put(None)
+        self._writer.join(timeout=5)
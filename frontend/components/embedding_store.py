@@ -0,0 +1,227 @@
+"""
+Embedding Store for MAYA
+Versioned, append-only binary file of face embeddings
+
+Layout:
+    header   8-byte magic, u16 version, u16 dimension, u32 reserved
+    records  u32 length + one Fernet token per record
+
+Each decrypted record is an op byte (put or tombstone), the UTF-8 name
+and, for puts, the embedding as little-endian float32. Enrolling or
+deleting appends one record; the latest record for a name wins. The
+file is compacted only when dead records outnumber live ones.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import numpy as np
+from cryptography.fernet import InvalidToken
+
+MAGIC = b"MAYAEMB\0"
+VERSION = 1
+HEADER = struct.Struct(">8sHHI")
+RECORD_LENGTH = struct.Struct(">I")
+RECORD_HEAD = struct.Struct(">BH")  # op, name length
+
+OP_PUT = 1
+OP_TOMBSTONE = 2
+
+
+class EmbeddingStoreError(Exception):
+    """The store file is not a readable embedding store"""
+
+
+class EmbeddingStore:
+    """Encrypted per-record embedding log with a memory-mapped read path"""
+    
+    def __init__(self, path, cipher, compact_min_dead=16):
+        """
+        Initialize store (nothing is read until load())
+        
+        Args:
+            path: Store file
+            cipher: Fernet instance used for every record
+            compact_min_dead: Dead records tolerated before compaction is considered
+        """
+        self.path = path
+        self.cipher = cipher
+        self.compact_min_dead = compact_min_dead
+        self.dim = 0
+        self.live = {}  # name -> float32 embedding
+        self.dead = 0  # Superseded or tombstoned records in the file
+        self._valid_end = 0  # Offset after the last complete record
+        self._loaded = False
+        self._lock = threading.Lock()
+    
+    def exists(self):
+        return self.path.exists()
+    
+    def load(self):
+        """
+        Read the whole store once
+        Returns: {name: float32 embedding}
+        """
+        with self._lock:
+            self._load()
+            if self.path.exists():
+                print(f"✓ Loaded {len(self.live)} face embeddings")
+            return dict(self.live)
+    
+    def _load(self):
+        """Map the file and replay its records (lock held)"""
+        self.live = {}
+        self.dead = 0
+        self._valid_end = 0
+        self._loaded = True
+        if not self.path.exists():
+            return
+        
+        with open(self.path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise EmbeddingStoreError(f"{self.path} is truncated")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                self._read_header(view)
+                self._replay(view, size)
+    
+    def _read_header(self, view):
+        magic, version, dim, _ = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise EmbeddingStoreError(f"{self.path} is not an embedding store")
+        if version > VERSION:
+            raise EmbeddingStoreError(f"{self.path} has newer format version {version}")
+        self.dim = dim
+    
+    def _replay(self, view, size):
+        """Apply every complete record in file order"""
+        offset = HEADER.size
+        while offset + RECORD_LENGTH.size <= size:
+            (length,) = RECORD_LENGTH.unpack_from(view, offset)
+            end = offset + RECORD_LENGTH.size + length
+            if end > size:
+                break  # Torn final write; the next append overwrites it
+            token = view[offset + RECORD_LENGTH.size:end]
+            offset = end
+            try:
+                op, name, embedding = self._decode(self.cipher.decrypt(token))
+            except (InvalidToken, ValueError, struct.error) as e:
+                print(f"⚠ Skipping unreadable embedding record: {e}")
+                self.dead += 1
+                continue
+            
+            if name in self.live:
+                self.dead += 1
+            if op == OP_PUT:
+                self.live[name] = embedding
+            else:
+                self.live.pop(name, None)
+                self.dead += 1
+        self._valid_end = offset
+    
+    def _encode(self, op, name, embedding=None):
+        name_bytes = name.encode('utf-8')
+        data = RECORD_HEAD.pack(op, len(name_bytes)) + name_bytes
+        if embedding is not None:
+            data += np.asarray(embedding, dtype='<f4').tobytes()
+        token = self.cipher.encrypt(data)
+        return RECORD_LENGTH.pack(len(token)) + token
+    
+    def _decode(self, data):
+        op, name_length = RECORD_HEAD.unpack_from(data, 0)
+        start = RECORD_HEAD.size
+        name = data[start:start + name_length].decode('utf-8')
+        embedding = None
+        if op == OP_PUT:
+            embedding = np.frombuffer(data, dtype='<f4', offset=start + name_length).astype(np.float32)
+            if self.dim and embedding.size != self.dim:
+                raise ValueError(f"embedding for {name} has {embedding.size} values, expected {self.dim}")
+        elif op != OP_TOMBSTONE:
+            raise ValueError(f"unknown record type {op}")
+        return op, name, embedding
+    
+    def _append(self, record):
+        """Write one record after the last complete one and sync it"""
+        with open(self.path, 'r+b') as f:
+            f.seek(self._valid_end)
+            f.write(record)
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        self._valid_end += len(record)
+    
+    def _create(self, dim):
+        with open(self.path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, dim, 0))
+        os.chmod(self.path, 0o600)
+        self.dim = dim
+        self._valid_end = HEADER.size
+    
+    def put(self, name, embedding):
+        """Add or replace one embedding (appends one record)"""
+        embedding = np.asarray(embedding, dtype=np.float32).flatten()
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if not self.path.exists() or (self.dim == 0 and not self.live):
+                # No file yet, or an empty one whose dimension was never set
+                self._create(embedding.size)
+            elif embedding.size != self.dim:
+                raise ValueError(f"embedding has {embedding.size} values, store holds {self.dim}")
+            self._append(self._encode(OP_PUT, name, embedding))
+            if name in self.live:
+                self.dead += 1
+            self.live[name] = embedding
+            self._maybe_compact()
+    
+    def delete(self, name):
+        """Remove one embedding (appends a tombstone); returns False if unknown"""
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            if name not in self.live:
+                return False
+            self._append(self._encode(OP_TOMBSTONE, name))
+            del self.live[name]
+            self.dead += 2  # The put and its tombstone
+            self._maybe_compact()
+            return True
+    
+    def replace_all(self, embeddings):
+        """Rewrite the store with exactly these embeddings"""
+        with self._lock:
+            self._rewrite({name: np.asarray(value, dtype=np.float32).flatten()
+                           for name, value in embeddings.items()})
+    
+    def _maybe_compact(self):
+        if self.dead >= self.compact_min_dead and self.dead > len(self.live):
+            self._rewrite(dict(self.live))
+    
+    def _rewrite(self, embeddings):
+        """Write live records to a new file and swap it in atomically (lock held)"""
+        dim = next(iter(embeddings.values())).size if embeddings else self.dim
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, dim, 0))
+            for name, embedding in embeddings.items():
+                f.write(self._encode(OP_PUT, name, embedding))
+            f.flush()
+            os.fsync(f.fileno())
+            end = f.tell()
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, self.path)
+        
+        self.dim = dim
+        self.live = embeddings
+        self.dead = 0
+        self._valid_end = end
+        self._loaded = True
+    
+    def delete_file(self):
+        with self._lock:
+            if self.path.exists():
+                self.path.unlink()
+            self.live = {}
+            self.dead = 0
+            self._valid_end = 0
@@ -4,6 +4,7 @@ Biometric face unlock for MAYA application launch
 """
 
 import os
+import threading
 import cv2
 import numpy as np
 from PyQt6.QtWidgets import (
@@ -12,6 +13,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal, QPropertyAnimation, QRect, pyqtProperty
 from PyQt6.QtGui import QImage, QPixmap, QPainter, QPen, QColor, QFont, QPainterPath
+from .tracing import tracer
 
 
 class CircularCameraWidget(QWidget):
@@ -108,10 +110,19 @@ class FaceAuthScreen(QWidget):
     
     auth_success = pyqtSignal(str)  # Emits username on success
     auth_failed = pyqtSignal()
+    pin_checked = pyqtSignal(object)  # Owner name, or None for a wrong PIN
     
-    def __init__(self, face_recognizer=None):
+    def __init__(self, face_recognizer=None, pin_verifier=None):
+        """
+        Args:
+            face_recognizer: FaceRecognizer (or a stand-in) used for unlock
+            pin_verifier: Callable(pin) -> owner name or None; runs off the GUI thread
+        """
         super().__init__()
         self.face_recognizer = face_recognizer
+        self.pin_verifier = pin_verifier
+        self.pin_pending = False
+        self.pin_checked.connect(self.on_pin_checked)
         self.camera = None
         self.timer = None
         self.consecutive_matches = 0
@@ -444,7 +455,8 @@ class FaceAuthScreen(QWidget):
         if self.camera is None:
             return
         
-        ret, frame = self.camera.read()
+        with tracer.span("camera read", cat="face"):
+            ret, frame = self.camera.read()
         if not ret:
             return
         
@@ -457,7 +469,14 @@ class FaceAuthScreen(QWidget):
         
         # Perform face recognition
         if self.face_recognizer:
-            result = self.face_recognizer.recognize(frame)
+            with tracer.span("face recognize", cat="face") as span:
+                result = self.face_recognizer.recognize(frame)
+                span.annotate(fresh=result is not None)
+            
+            # A worker-backed recognizer has no new result for most frames;
+            # only fresh results count towards the consecutive matches
+            if result is None:
+                return
             
             if result["match"]:
                 self.consecutive_matches += 1
@@ -516,13 +535,40 @@ class FaceAuthScreen(QWidget):
             self.pin_error.setText("PIN must be 4 digits")
             return
         
-        # TODO: Verify against stored PIN
-        # For now, accept "1234" as demo
-        if pin == "1234":
-            self.auth_success.emit("Afraz")
+        if self.pin_verifier is None:
+            # No secure storage: accept "1234" as demo
+            self.on_pin_checked("Afraz" if pin == "1234" else None)
+            return
+        
+        if self.pin_pending:
+            return
+        
+        # The KDF is deliberately slow; keep it off the GUI thread
+        self.pin_pending = True
+        self.pin_input.setEnabled(False)
+        self.pin_error.setText("Checking...")
+        
+        def check():
+            try:
+                owner = self.pin_verifier(pin)
+            except Exception as e:
+                print(f"Error verifying PIN: {e}")
+                owner = None
+            self.pin_checked.emit(owner)
+        
+        threading.Thread(target=check, daemon=True).start()
+    
+    def on_pin_checked(self, owner):
+        """Handle a PIN verification result (GUI thread)"""
+        self.pin_pending = False
+        self.pin_input.setEnabled(True)
+        if owner:
+            self.pin_error.setText("")
+            self.auth_success.emit(owner)
         else:
             self.pin_error.setText("Incorrect PIN")
             self.pin_input.clear()
+            self.pin_input.setFocus()
     
     def stop_camera(self):
         """Stop camera and animations"""
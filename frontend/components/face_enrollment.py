@@ -340,6 +340,10 @@ class FaceEnrollmentScreen(QWidget):
                 
                 # Show retry button
                 QTimer.singleShot(2000, self.reset_enrollment)
+        else:
+            # Face engine still loading in the background
+            self.instruction_label.setText("Loading face engine...")
+            QTimer.singleShot(500, self.finish_enrollment)
     
     def reset_enrollment(self):
         """Reset enrollment to try again"""
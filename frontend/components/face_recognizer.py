@@ -3,26 +3,86 @@ Face Recognition Module using FaceNet (FN8)
 Lightweight face recognition for MAYA authentication
 """
 
-import os
+import threading
+import time
+from contextlib import contextmanager
 import cv2
 import numpy as np
-import pickle
 from pathlib import Path
+from .tracing import tracer
+
+
+@contextmanager
+def stage_span(name, stages=None):
+    """Trace one recognition stage; also append (name, start, seconds) to stages"""
+    start = time.perf_counter()
+    with tracer.span(name, cat="face"):
+        yield
+    if stages is not None:
+        stages.append((name, start, time.perf_counter() - start))
+
+
+class EmbeddingGallery:
+    """Immutable snapshot of the enrolled embeddings, normalized for matching"""
+    
+    def __init__(self, embeddings):
+        self.embeddings = dict(embeddings)
+        self.names = list(self.embeddings)
+        self.matrix = None
+        if self.names:
+            matrix = np.stack([np.asarray(self.embeddings[name], dtype=np.float32).flatten()
+                               for name in self.names])
+            self.matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    
+    def best_match(self, embedding):
+        """
+        Closest enrolled face by cosine similarity
+        Returns: (name, similarity) or (None, 0.0)
+        """
+        if self.matrix is None:
+            return None, 0.0
+        similarities = self.matrix @ (embedding / np.linalg.norm(embedding))
+        index = int(np.argmax(similarities))
+        return self.names[index], float(similarities[index])
 
 
 class FaceRecognizer:
     """Face recognition using OpenCV DNN with FaceNet model"""
     
-    def __init__(self, config_path=None):
+    def __init__(self, config_path=None, store=None):
+        """
+        Initialize recognizer
+        
+        Args:
+            config_path: Face data directory (default ~/.maya/face_data)
+            store: EmbeddingStore holding the enrolled faces; it is loaded
+                here, once, and updated record by record on enroll/delete
+                (without one, enrollments live in memory only)
+        """
         self.detector = None
         self.recognizer_model = None
-        self.known_embeddings = {}
+        # Readers take the current gallery without locking; writers build a
+        # new one and swap it in, so recognition never sees a half-updated dict
+        self._gallery = EmbeddingGallery({})
+        self._write_lock = threading.Lock()
+        # YuNet's setInputSize/detect pair and SFace are not safe to share
+        self._model_lock = threading.Lock()
         self.similarity_threshold = 0.6
         self.config_path = config_path or self._get_default_config_path()
+        self.store = store
         
         self.load_models()
         self.load_embeddings()
     
+    @property
+    def known_embeddings(self):
+        """Enrolled embeddings by name (treat as read-only; assign to replace)"""
+        return self._gallery.embeddings
+    
+    @known_embeddings.setter
+    def known_embeddings(self, embeddings):
+        self._gallery = EmbeddingGallery(embeddings)
+    
     def _get_default_config_path(self):
         """Get default path for face data storage"""
         return Path.home() / ".maya" / "face_data"
@@ -110,8 +170,9 @@ class FaceRecognizer:
             # Resize frame for faster detection
             height, width = frame.shape[:2]
             if isinstance(self.detector, cv2.FaceDetectorYN):
-                self.detector.setInputSize((width, height))
-                _, faces = self.detector.detect(frame)
+                with self._model_lock:
+                    self.detector.setInputSize((width, height))
+                    _, faces = self.detector.detect(frame)
                 
                 if faces is not None and len(faces) > 0:
                     # Get first face (most confident)
@@ -121,7 +182,8 @@ class FaceRecognizer:
             else:
                 # Haar Cascade fallback
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.detector.detectMultiScale(gray, 1.3, 5)
+                with self._model_lock:
+                    faces = self.detector.detectMultiScale(gray, 1.3, 5)
                 
                 if len(faces) > 0:
                     return tuple(faces[0])
@@ -152,7 +214,8 @@ class FaceRecognizer:
             aligned_face = cv2.resize(face_crop, (112, 112))
             
             # Extract embedding
-            embedding = self.recognizer_model.feature(aligned_face)
+            with self._model_lock:
+                embedding = self.recognizer_model.feature(aligned_face)
             
             return embedding.flatten()
         
@@ -177,9 +240,14 @@ class FaceRecognizer:
         
         return float(similarity)
     
-    def recognize(self, frame):
+    def recognize(self, frame, stages=None):
         """
         Recognize face in frame
+        
+        Args:
+            frame: BGR frame
+            stages: Optional list that receives (stage, perf_counter start,
+                seconds) per stage, for processes whose tracer is off
         Returns: {"match": bool, "name": str, "confidence": float}
         """
         result = {
@@ -189,25 +257,19 @@ class FaceRecognizer:
         }
         
         # Detect face
-        face_box = self.detect_face(frame)
+        with stage_span("face detect", stages):
+            face_box = self.detect_face(frame)
         if face_box is None:
             return result
         
         # Extract embedding
-        embedding = self.extract_embedding(frame, face_box)
+        with stage_span("face embedding", stages):
+            embedding = self.extract_embedding(frame, face_box)
         if embedding is None:
             return result
         
-        # Compare with known faces
-        best_match = None
-        best_similarity = 0.0
-        
-        for name, known_embedding in self.known_embeddings.items():
-            similarity = self.compare_embeddings(embedding, known_embedding)
-            
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_match = name
+        # Compare with known faces (one matrix product over the snapshot)
+        best_match, best_similarity = self._gallery.best_match(embedding)
         
         # Check threshold
         if best_similarity >= self.similarity_threshold:
@@ -243,55 +305,50 @@ class FaceRecognizer:
         # Average embeddings for robustness
         avg_embedding = np.mean(embeddings, axis=0)
         
-        # Store embedding
-        self.known_embeddings[name] = avg_embedding
-        
-        # Save to disk
-        self.save_embeddings()
+        # Store embedding (copy-on-write), then append one record to disk
+        with self._write_lock:
+            self.known_embeddings = {**self.known_embeddings, name: avg_embedding}
+            if self.store is not None:
+                self.store.put(name, avg_embedding)
         
         print(f"✓ Enrolled {name} with {len(embeddings)} samples")
         return True
     
     def load_embeddings(self):
-        """Load saved face embeddings from disk"""
-        embedding_file = self.config_path / "embeddings.pkl"
+        """Load enrolled embeddings from the store"""
+        if self.store is None:
+            self.known_embeddings = {}
+            return
         
-        if embedding_file.exists():
-            try:
-                with open(embedding_file, 'rb') as f:
-                    self.known_embeddings = pickle.load(f)
-                print(f"✓ Loaded {len(self.known_embeddings)} face(s)")
-            except Exception as e:
-                print(f"Error loading embeddings: {e}")
-                self.known_embeddings = {}
-        else:
-            print("No saved embeddings found")
+        try:
+            self.known_embeddings = self.store.load()
+        except Exception as e:
+            print(f"Error loading embeddings: {e}")
             self.known_embeddings = {}
     
     def save_embeddings(self):
-        """Save face embeddings to disk (encrypted)"""
-        self.config_path.mkdir(parents=True, exist_ok=True)
-        embedding_file = self.config_path / "embeddings.pkl"
+        """Rewrite the store from the in-memory embeddings (enroll/delete append instead)"""
+        if self.store is None:
+            return
         
         try:
-            with open(embedding_file, 'wb') as f:
-                pickle.dump(self.known_embeddings, f)
-            
-            # Set file permissions to owner-only
-            os.chmod(embedding_file, 0o600)
-            
-            print(f"✓ Saved embeddings to {embedding_file}")
+            self.store.replace_all(self.known_embeddings)
+            print(f"✓ Saved embeddings to {self.store.path}")
         except Exception as e:
             print(f"Error saving embeddings: {e}")
     
     def delete_face(self, name):
         """Remove a person's face from database"""
-        if name in self.known_embeddings:
-            del self.known_embeddings[name]
-            self.save_embeddings()
-            print(f"✓ Deleted {name}'s face data")
-            return True
-        return False
+        with self._write_lock:
+            if name not in self.known_embeddings:
+                return False
+            self.known_embeddings = {
+                known: embedding for known, embedding in self.known_embeddings.items() if known != name
+            }
+            if self.store is not None:
+                self.store.delete(name)
+        print(f"✓ Deleted {name}'s face data")
+        return True
     
     def list_enrolled_faces(self):
         """Get list of enrolled face names"""
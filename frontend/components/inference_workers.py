@@ -0,0 +1,633 @@
+"""
+Inference Workers for MAYA
+Runs face recognition and Whisper in supervised child processes so
+inference never competes with Qt for the GUI process's GIL
+
+Frames and audio are written once into shared-memory ring buffers and
+read in place by the worker; only small control tuples cross the queues.
+Cancelling a request marks its slot, so the worker skips or aborts it.
+"""
+
+import itertools
+import multiprocessing
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+import numpy as np
+
+from .resource_governor import apply_allocation
+from .tracing import tracer
+from .stt_model_manager import STTModelManager
+from .voice_listener import VoiceListener, TranscriptionCancelled
+
+SLOT_FREE = 0
+SLOT_BUSY = 1
+
+# Ring sizes: 8 frames up to 1080p, 4 utterances up to 60 s of float32 audio
+FACE_SLOTS = 8
+FACE_SLOT_BYTES = 1920 * 1080 * 3
+SPEECH_SLOTS = 4
+SPEECH_SLOT_BYTES = 60 * 16000 * 4
+
+NO_MATCH = {"match": False, "name": None, "confidence": 0.0}
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process died while a request was pending"""
+
+
+class SharedRing:
+    """Fixed-size slots in one shared-memory block, one array per slot"""
+    
+    def __init__(self, slots, slot_bytes, states, name=None):
+        """
+        Create (name=None) or attach to a ring
+        
+        Args:
+            slots: Number of slots
+            slot_bytes: Capacity of each slot
+            states: Shared byte array of per-slot states (SLOT_FREE/SLOT_BUSY);
+                the producer marks a slot busy, the worker frees it
+            name: Existing shared memory block to attach to
+        """
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.states = states
+        self._next = 0
+        self._lock = threading.Lock()
+        
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        elif sys.version_info >= (3, 13):
+            # The creating process owns the block's lifetime
+            self.shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+    
+    def view(self, slot, shape, dtype):
+        """Array backed directly by a slot's memory (no copy)"""
+        return np.ndarray(shape, dtype=dtype, buffer=self.shm.buf,
+                          offset=slot * self.slot_bytes)
+    
+    def write(self, array):
+        """
+        Copy an array into a free slot
+        Returns: (slot, shape, dtype) or None if every slot is busy
+        """
+        if array.nbytes > self.slot_bytes:
+            raise ValueError(f"{array.nbytes} bytes exceed the {self.slot_bytes}-byte ring slot")
+        
+        with self._lock:
+            for _ in range(self.slots):
+                slot = self._next
+                self._next = (self._next + 1) % self.slots
+                if self.states[slot] == SLOT_FREE:
+                    self.states[slot] = SLOT_BUSY
+                    break
+            else:
+                return None
+        
+        self.view(slot, array.shape, array.dtype)[...] = array
+        return slot, array.shape, array.dtype.str
+    
+    def release(self, slot):
+        self.states[slot] = SLOT_FREE
+    
+    def reset(self):
+        for slot in range(self.slots):
+            self.states[slot] = SLOT_FREE
+    
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class _CancelFlag:
+    """Worker side: cancel_event for one request, set by the parent through its slot"""
+    
+    def __init__(self, cancelled, slot, request_id):
+        self.cancelled = cancelled  # Shared per-slot id of the last cancelled request
+        self.slot = slot
+        self.request_id = request_id
+    
+    def is_set(self):
+        # Ids are never reused, so a cancel aimed at an earlier request in
+        # this slot does not match
+        return self.slot is not None and self.cancelled[self.slot] == self.request_id
+
+
+class _FaceEngine:
+    """Worker side: FaceRecognizer with the securely stored embeddings"""
+    
+    def __init__(self, options, notify):
+        from frontend.components.face_recognizer import FaceRecognizer
+        from frontend.components.secure_storage import SecureStorage
+        
+        self.secure_storage = SecureStorage()
+        self.recognizer = FaceRecognizer(store=self.secure_storage.embedding_store())
+    
+    def ready_info(self):
+        return {"faces": len(self.recognizer.known_embeddings)}
+    
+    def handle(self, op, arrays, params, cancelled):
+        if op == "recognize":
+            # This process's tracer is off: stage times go back to the parent
+            started = time.perf_counter()
+            stages = []
+            result = self.recognizer.recognize(arrays[0], stages=stages)
+            stages = [(name, start - started, seconds) for name, start, seconds in stages]
+            return result, stages, time.perf_counter() - started
+        if op == "detect":
+            box = self.recognizer.detect_face(arrays[0])
+            return tuple(int(value) for value in box) if box is not None else None
+        if op == "enroll":
+            success = self.recognizer.enroll_face(params["name"], arrays)
+            # Only the new embedding crosses the pipe, not the whole gallery
+            embedding = self.recognizer.known_embeddings.get(params["name"]) if success else None
+            return {"success": success, "embedding": embedding}
+        if op == "set_embeddings":
+            self.recognizer.known_embeddings = params["embeddings"]
+            return None
+        raise ValueError(f"Unknown face operation '{op}'")
+
+
+class _SpeechEngine:
+    """Worker side: a VoiceListener that owns the Whisper models"""
+    
+    def __init__(self, options, notify):
+        self.notify = notify
+        self.listener = None
+        self.listener = VoiceListener(
+            model_manager=STTModelManager(on_change=self.report_state, **options.get("manager", {})),
+            quality_controller=options.get("quality_controller"),
+            **options.get("listener", {})
+        )
+        self.listener.load_model()
+        if not self.listener.is_model_loaded():
+            raise RuntimeError("Whisper model failed to load")
+        self.report_state()
+    
+    def ready_info(self):
+        return {"model": self.listener.model_name_for(self.listener.language)}
+    
+    def report_state(self):
+        """Tell the parent whether an utterance can be decoded right now"""
+        listener = self.listener
+        if listener is None:
+            return
+        self.notify("state", {
+            "language": listener.language,
+            "model_loaded": listener.is_model_loaded() or listener.is_model_loaded(listener.model_size),
+        })
+    
+    def set_language(self, language):
+        if language != self.listener.language:
+            self.listener.set_language(language)
+            self.report_state()
+    
+    def handle(self, op, arrays, params, cancelled):
+        if op == "transcribe":
+            self.set_language(params.get("language", self.listener.language))
+            # The decoder hook polls the flag, so a cancelled turn frees the worker
+            text = self.listener.transcribe(arrays[0], cancel_event=cancelled)
+            return {"text": text, "rtf": self.listener.last_rtf}
+        if op == "set_language":
+            self.set_language(params["language"])
+            return None
+        if op == "warm_up":
+            # Reloads in the background; report_state follows each load
+            self.listener.warm_up()
+            return None
+        raise ValueError(f"Unknown speech operation '{op}'")
+
+
+ENGINES = {"face": _FaceEngine, "speech": _SpeechEngine}
+
+
+def _worker_main(kind, options, shm_name, slots, slot_bytes, states, cancelled, requests, responses):
+    """Worker process loop: requests name ring slots, results go back by id"""
+    ring = SharedRing(slots, slot_bytes, states, name=shm_name)
+    resources = options.get("resources")
+    if resources:
+        apply_allocation(resources["workload"], resources["allocation"], resources["pin"])
+    
+    def notify(status, payload):
+        """Unsolicited message to the parent, e.g. a model state change"""
+        responses.put((None, status, payload))
+    
+    try:
+        engine = ENGINES[kind](options, notify)
+    except Exception as e:
+        responses.put((None, "fatal", str(e)))
+        return
+    responses.put((None, "ready", engine.ready_info()))
+    
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        request_id, op, slot_specs, params = message
+        cancel = _CancelFlag(cancelled, slot_specs[0][0] if slot_specs else None, request_id)
+        try:
+            if cancel.is_set():
+                raise TranscriptionCancelled("Cancelled while queued")
+            arrays = [ring.view(slot, shape, np.dtype(dtype)) for slot, shape, dtype in slot_specs]
+            responses.put((request_id, "ok", engine.handle(op, arrays, params, cancel)))
+        except Exception as e:
+            responses.put((request_id, "error", f"{type(e).__name__}: {e}"))
+        finally:
+            arrays = None
+            for slot, _, _ in slot_specs:
+                ring.release(slot)
+    
+    ring.close()
+
+
+class InferenceWorker:
+    """Parent side: owns one worker process, its ring and its restarts"""
+    
+    def __init__(self, kind, options=None, slots=FACE_SLOTS, slot_bytes=FACE_SLOT_BYTES,
+                 max_restarts=5, restart_window=60.0):
+        """
+        Start a worker process
+        
+        Args:
+            kind: 'face' or 'speech'
+            options: Picklable engine options
+            slots: Ring buffer slots (requests that can be in flight)
+            slot_bytes: Largest array a slot holds
+            max_restarts: Crashes tolerated within restart_window before giving up
+            restart_window: Seconds over which crashes are counted
+        """
+        self.kind = kind
+        self.options = options or {}
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.restarts = 0
+        self.ready = threading.Event()
+        self.ready_info = {}
+        self.state = {}  # Latest state the engine reported, e.g. whether models are loaded
+        self._state_changed = threading.Condition()
+        self.failed = None  # Reason once the worker is given up on
+        
+        self._context = multiprocessing.get_context("spawn")  # Never fork a Qt/torch process
+        self._states = self._context.Array('b', slots, lock=False)
+        self._cancelled = self._context.Array('q', slots, lock=False)  # Per slot: cancelled request id
+        self.ring = SharedRing(slots, slot_bytes, self._states)
+        self._ids = itertools.count(1)
+        self._pending = {}  # request id -> (Future, first ring slot or None)
+        self._lock = threading.Lock()
+        self._crash_times = deque()
+        self._closed = False
+        
+        self._start_process()
+        self._supervisor = threading.Thread(target=self._supervise, name=f"{kind}-supervisor")
+        self._supervisor.daemon = True
+        self._supervisor.start()
+    
+    def _start_process(self):
+        # Fresh queues: a crash can leave the old ones' locks held
+        self.ring.reset()
+        self._requests = self._context.Queue()
+        self._responses = self._context.Queue()
+        self.process = self._context.Process(
+            target=_worker_main,
+            args=(self.kind, self.options, self.ring.shm.name, self.ring.slots,
+                  self.ring.slot_bytes, self._states, self._cancelled, self._requests, self._responses),
+            name=f"maya-{self.kind}-worker"
+        )
+        self.process.daemon = True
+        self.process.start()
+        print(f"✓ {self.kind} worker started (pid {self.process.pid})")
+    
+    def wait_ready(self, timeout=None):
+        """Block until the worker has loaded its models; False on timeout or failure"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.failed is None:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            if self.ready.wait(0.5 if remaining is None else min(0.5, remaining)):
+                return True
+        return False
+    
+    def wait_state(self, predicate, timeout=None):
+        """Block until predicate(state) holds; False on timeout or failure"""
+        with self._state_changed:
+            self._state_changed.wait_for(
+                lambda: self.failed is not None or predicate(self.state), timeout
+            )
+            return self.failed is None and predicate(self.state)
+    
+    def _set_state(self, state):
+        with self._state_changed:
+            self.state = state
+            self._state_changed.notify_all()
+    
+    def submit(self, op, arrays=(), params=None, drop_if_busy=False):
+        """
+        Queue a request
+        
+        Args:
+            op: Operation name
+            arrays: numpy arrays placed in the ring
+            params: Small picklable parameters
+            drop_if_busy: Return None instead of raising when the ring is full
+        Returns: concurrent.futures.Future with the result
+        """
+        if self.failed is not None:
+            raise WorkerCrashed(self.failed)
+        
+        slot_specs = []
+        for array in arrays:
+            spec = self.ring.write(np.ascontiguousarray(array))
+            if spec is None:
+                for slot, _, _ in slot_specs:
+                    self.ring.release(slot)
+                if drop_if_busy:
+                    return None
+                raise RuntimeError(f"{self.kind} worker ring is full")
+            slot_specs.append(spec)
+        
+        future = Future()
+        with self._lock:
+            request_id = next(self._ids)
+            self._pending[request_id] = (future, slot_specs[0][0] if slot_specs else None)
+        self._requests.put((request_id, op, slot_specs, params or {}))
+        return future
+    
+    def cancel(self, future):
+        """
+        Abandon a request; the worker skips it if still queued and engines
+        that poll their cancel flag (speech) abort it mid-run
+        """
+        with self._lock:
+            for request_id, (pending, slot) in self._pending.items():
+                if pending is future:
+                    if slot is not None:
+                        self._cancelled[slot] = request_id
+                    break
+        future.cancel()
+    
+    def call(self, op, arrays=(), params=None, timeout=30.0):
+        """Submit and wait for the result"""
+        return self.submit(op, arrays, params).result(timeout)
+    
+    def _supervise(self):
+        """Deliver results and restart the worker when it dies"""
+        while not self._closed:
+            try:
+                request_id, status, payload = self._responses.get(timeout=0.5)
+            except queue.Empty:
+                if not self._closed and not self.process.is_alive():
+                    self._restart(f"exit code {self.process.exitcode}")
+                continue
+            except (EOFError, OSError):
+                continue
+            
+            if request_id is None:
+                if status == "ready":
+                    self.ready_info = payload
+                    self.ready.set()
+                    print(f"✓ {self.kind} worker ready {payload}")
+                elif status == "state":
+                    self._set_state(payload)
+                else:
+                    self._give_up(f"{self.kind} worker failed to start: {payload}")
+                continue
+            
+            with self._lock:
+                future, _ = self._pending.pop(request_id, (None, None))
+            if future is None or future.cancelled():
+                continue
+            if status == "ok":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(payload))
+    
+    def _fail_pending(self, reason):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future, _ in pending.values():
+            if not future.done():
+                future.set_exception(WorkerCrashed(reason))
+    
+    def _restart(self, reason):
+        """Fail in-flight requests and start a fresh process"""
+        self.ready.clear()
+        self._set_state({})
+        self._fail_pending(f"{self.kind} worker crashed ({reason})")
+        
+        now = time.monotonic()
+        self._crash_times.append(now)
+        while self._crash_times and now - self._crash_times[0] > self.restart_window:
+            self._crash_times.popleft()
+        if len(self._crash_times) > self.max_restarts:
+            self._give_up(f"{self.kind} worker crashed {len(self._crash_times)} times "
+                          f"in {self.restart_window:.0f}s")
+            return
+        
+        print(f"⚠ {self.kind} worker crashed ({reason}), restarting")
+        self.restarts += 1
+        self._start_process()
+    
+    def _give_up(self, reason):
+        print(f"❌ {reason}")
+        self.failed = reason
+        self._closed = True
+        self._set_state({})
+        self._fail_pending(reason)
+    
+    def close(self):
+        """Stop the worker and free the shared memory"""
+        self._closed = True
+        try:
+            self._requests.put(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self._fail_pending(f"{self.kind} worker closed")
+        self.ring.close(unlink=True)
+
+
+class WorkerFaceRecognizer:
+    """FaceRecognizer stand-in backed by a face worker process"""
+    
+    def __init__(self, worker):
+        self.worker = worker
+        self.known_embeddings = {}
+        self._inflight = None
+    
+    def recognize(self, frame):
+        """
+        Recognize face in frame without blocking the caller
+        
+        Hands the frame to the worker if it is idle and returns the result
+        that finished since the last call, so a slow worker drops frames
+        instead of queueing them. Each worker result is returned only once.
+        Returns: {"match": bool, "name": str, "confidence": float}, or None
+            while no new result has finished
+        """
+        result = None
+        if self._inflight is not None and self._inflight.done():
+            try:
+                result, _, _ = self._inflight.result()
+            except Exception as e:
+                print(f"Face recognition error: {e}")
+                result = dict(NO_MATCH)
+            self._inflight = None
+        
+        if self._inflight is None and self.worker.ready.is_set():
+            try:
+                self._inflight = self.worker.submit("recognize", [frame], drop_if_busy=True)
+            except WorkerCrashed as e:
+                print(f"Face recognition error: {e}")
+            if self._inflight is not None:
+                self._inflight.add_done_callback(self._trace_stages)
+        return result
+    
+    @staticmethod
+    def _trace_stages(future):
+        """Record the worker's stage times, ending when its result arrived"""
+        if not tracer.enabled or future.cancelled() or future.exception() is not None:
+            return
+        _, stages, elapsed = future.result()
+        started = tracer.now() - int(elapsed * 1e6)
+        for name, offset, seconds in stages:
+            start = started + int(offset * 1e6)
+            tracer.complete(name, start, start + int(seconds * 1e6), cat="face", process="face worker")
+    
+    def detect_face(self, frame):
+        """
+        Detect face in frame
+        Returns: (x, y, w, h) or None
+        """
+        if not self.worker.ready.is_set():
+            return None
+        try:
+            return self.worker.call("detect", [frame], timeout=2.0)
+        except (RuntimeError, FutureTimeout) as e:
+            print(f"Face detection error: {e}")
+            return None
+    
+    def enroll_face(self, name, frames):
+        """Enroll a face in the worker. Returns: bool"""
+        try:
+            self.worker.wait_ready(timeout=30)
+            result = self.worker.call("enroll", frames, {"name": name}, timeout=60.0)
+        except (RuntimeError, FutureTimeout) as e:
+            print(f"Failed to enroll {name}: {e}")
+            return False
+        if result["success"]:
+            self.known_embeddings = {**self.known_embeddings, name: result["embedding"]}
+        return result["success"]
+
+
+class ProcessVoiceListener(VoiceListener):
+    """VoiceListener that records here and decodes in a speech worker process"""
+    
+    def __init__(self, worker, language="en"):
+        """
+        Initialize listener
+        
+        Args:
+            worker: InferenceWorker of kind 'speech'
+            language: Language code ('en' for English, 'bn' for Bangla)
+        """
+        # Models live in the worker; the inherited local manager stays empty
+        super().__init__(language=language)
+        self.worker = worker
+    
+    def load_model(self):
+        """Wait until the worker's model is resident (call this in a separate thread)"""
+        self._load_requested = True
+        if self.worker.wait_ready() and self.worker.wait_state(lambda state: state.get("model_loaded")):
+            self.model_ready.emit(self.worker.ready_info.get("model", self.model_size))
+        else:
+            self.error_occurred.emit(f"Failed to load model: {self.worker.failed}")
+    
+    def warm_up(self):
+        """Have the worker reload a model it unloaded while idle; model_ready follows"""
+        self._load_requested = True
+        try:
+            self.worker.submit("warm_up")
+        except WorkerCrashed as e:
+            self.error_occurred.emit(f"Failed to load model: {e}")
+            return
+        thread = threading.Thread(target=self.load_model)
+        thread.daemon = True
+        thread.start()
+    
+    def is_model_loaded(self, model_name=None):
+        """True once the worker reports a model that can decode the current language"""
+        return self.worker.ready.is_set() and bool(self.worker.state.get("model_loaded"))
+    
+    def set_language(self, language_code):
+        """Change language; the worker loads the routed model in the background"""
+        self.language = language_code
+        try:
+            self.worker.submit("set_language", params={"language": language_code})
+        except WorkerCrashed:
+            pass  # Reported by the next transcription
+    
+    def transcribe(self, audio, cancel_event=None, language=None):
+        """
+        Transcribe float32 audio in the worker (blocking)
+        
+        Setting cancel_event cancels the request in the worker too, which
+        aborts the decode at its next decoder step.
+        """
+        future = self.worker.submit(
+            "transcribe", [np.asarray(audio, dtype=np.float32)], {"language": language or self.language}
+        )
+        while True:
+            try:
+                result = future.result(timeout=0.1)
+                break
+            except FutureTimeout:
+                if cancel_event is not None and cancel_event.is_set():
+                    self.worker.cancel(future)
+                    raise TranscriptionCancelled("Transcription cancelled")
+        
+        if result["rtf"] is not None:
+            self.last_rtf = result["rtf"]
+            self.rtf_measured.emit(self.last_rtf)
+        return result["text"]
+
+
+def start_speech_worker(listener_options, manager_options=None, quality_controller=None, governor=None):
+    """Start a speech worker; listener_options are VoiceListener keyword arguments"""
+    worker = InferenceWorker(
+        "speech",
+        {
+            "listener": listener_options,
+            "manager": manager_options or {},
+            "quality_controller": quality_controller,
+            "resources": governor.worker_options("stt") if governor else None,
+        },
+        slots=SPEECH_SLOTS,
+        slot_bytes=SPEECH_SLOT_BYTES
+    )
+    if governor:
+        governor.attach("stt", worker)
+    return worker
+
+
+def start_face_worker(governor=None):
+    """Start a face worker"""
+    worker = InferenceWorker(
+        "face",
+        {"resources": governor.worker_options("face") if governor else None},
+        slots=FACE_SLOTS,
+        slot_bytes=FACE_SLOT_BYTES
+    )
+    if governor:
+        governor.attach("face", worker)
+    return worker
@@ -0,0 +1,231 @@
+"""
+Resource Governor for MAYA
+Splits the CPU between the GUI, face inference and STT so OpenCV's and
+PyTorch's thread pools stop oversubscribing the cores
+
+Interactive work (unlock, enrollment, the camera preview) always keeps
+its cores; STT runs niced and, while interactive work is active, only on
+the cores left over.
+"""
+
+import os
+import threading
+
+WORKLOADS = ("gui", "face", "stt")
+
+
+def available_cpus():
+    """CPU ids this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def set_thread_counts(cv2_threads=None, torch_threads=None):
+    """Size OpenCV's and PyTorch's thread pools for this process"""
+    if cv2_threads is not None:
+        import cv2
+        cv2.setNumThreads(cv2_threads)
+    
+    if torch_threads is not None:
+        try:
+            import torch
+        except ImportError:
+            return
+        torch.set_num_threads(torch_threads)
+        try:
+            # Only allowed before the first parallel op
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+
+
+def set_process_affinity(pid, cpus):
+    """Pin every thread of a process (sched_setaffinity alone moves one thread)"""
+    task_dir = f"/proc/{pid}/task"
+    tids = [int(tid) for tid in os.listdir(task_dir)] if os.path.isdir(task_dir) else [pid]
+    for tid in tids:
+        try:
+            os.sched_setaffinity(tid, cpus)
+        except ProcessLookupError:
+            pass  # Thread exited meanwhile
+
+
+class Allocation:
+    """Threads, cores and niceness assigned to one workload"""
+    
+    def __init__(self, threads, cpus, nice=0):
+        self.threads = threads
+        self.cpus = list(cpus)
+        self.nice = nice
+    
+    def as_dict(self):
+        return {"threads": self.threads, "cpus": self.cpus, "nice": self.nice}
+
+
+def apply_allocation(workload, allocation, pin=False):
+    """
+    Apply an allocation to the current process (worker or daemon side)
+    
+    Args:
+        workload: 'gui', 'face' or 'stt'
+        allocation: Allocation or its as_dict() form
+        pin: Restrict the process to the allocation's cores
+    """
+    if isinstance(allocation, dict):
+        allocation = Allocation(**allocation)
+    
+    if workload == "stt":
+        set_thread_counts(cv2_threads=1, torch_threads=allocation.threads)
+    else:
+        # Face and GUI processes never load PyTorch
+        set_thread_counts(cv2_threads=allocation.threads)
+    
+    if pin and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, allocation.cpus)
+    if allocation.nice > 0 and hasattr(os, "nice"):
+        os.nice(allocation.nice)
+
+
+class ResourceGovernor:
+    """Plans and applies the CPU split between MAYA's workloads"""
+    
+    def __init__(self, cpus=None, pin=False, stt_nice=10, max_face_threads=2):
+        """
+        Initialize governor
+        
+        Args:
+            cpus: CPU ids to divide (default: every CPU this process may use)
+            pin: Pin worker processes to their cores from the start; STT is
+                confined to its cores during interactive work either way
+                (Linux only)
+            stt_nice: Niceness added to STT so interactive work preempts it
+            max_face_threads: Upper bound on OpenCV threads for face inference
+        """
+        self.cpus = list(cpus) if cpus is not None else available_cpus()
+        self.pin = pin and hasattr(os, "sched_setaffinity")
+        self.stt_nice = stt_nice
+        self.max_face_threads = max_face_threads
+        self.interactive = False
+        self._interactive_sources = set()
+        self._processes = {}  # workload -> object with a .process attribute
+        self._in_process = False
+        self._torch_threads = None  # PyTorch pool size for in-process STT
+        self._torch_applied = threading.local()  # torch.set_num_threads is per calling thread
+        self._lock = threading.Lock()
+    
+    def allocation(self, workload, interactive=None):
+        """
+        Allocation for one workload
+        
+        The GUI keeps the first core. Face inference gets up to
+        max_face_threads of the rest; STT gets what remains while
+        interactive work runs and every non-GUI core otherwise.
+        """
+        if interactive is None:
+            interactive = self.interactive
+        
+        gui = self.cpus[:1]
+        rest = self.cpus[1:] or self.cpus
+        face = rest[:max(1, min(self.max_face_threads, len(rest) // 3))]
+        
+        if workload == "gui":
+            return Allocation(1, gui)
+        if workload == "face":
+            return Allocation(len(face), face)
+        if workload == "stt":
+            stt = [cpu for cpu in rest if cpu not in face] if interactive else rest
+            stt = stt or rest
+            return Allocation(len(stt), stt, self.stt_nice)
+        raise ValueError(f"Unknown workload '{workload}'")
+    
+    def worker_options(self, workload):
+        """Allocation to ship to a worker process, which applies it on start"""
+        return {"workload": workload, "allocation": self.allocation(workload).as_dict(), "pin": self.pin}
+    
+    def apply_gui(self):
+        """Size this process for GUI work when inference runs in workers"""
+        apply_allocation("gui", self.allocation("gui"))
+        print(f"✓ CPU plan: {self.summary()}")
+    
+    def attach(self, workload, worker):
+        """Track a worker process so interactive changes can re-pin it"""
+        self._processes[workload] = worker
+    
+    def apply_in_process(self):
+        """
+        Size thread pools when every workload shares this process
+        
+        OpenCV only runs face inference and PyTorch only runs Whisper, so
+        each library gets its own workload's share. PyTorch is sized later
+        by apply_stt_threads() so this never imports it.
+        """
+        self._in_process = True
+        set_thread_counts(cv2_threads=self.allocation("face").threads)
+        self._torch_threads = self.allocation("stt").threads
+        print(f"✓ CPU plan: {self.summary()}")
+    
+    def apply_stt_threads(self):
+        """
+        Size PyTorch's thread pool to STT's current share (in-process only)
+        
+        Called by the thread about to load or run Whisper, so importing
+        PyTorch never blocks the GUI thread. The size only holds for the
+        calling thread, so each decode thread applies it once and again
+        after every change.
+        """
+        threads = self._torch_threads
+        if threads is None or getattr(self._torch_applied, "threads", None) == threads:
+            return
+        self._torch_applied.threads = threads
+        set_thread_counts(torch_threads=threads)
+    
+    def set_interactive(self, source, active):
+        """
+        Mark interactive work as running or finished
+        
+        Args:
+            source: Name of the interactive activity ('unlock', 'preview', ...)
+            active: True while it runs
+        """
+        with self._lock:
+            if active:
+                self._interactive_sources.add(source)
+            else:
+                self._interactive_sources.discard(source)
+            interactive = bool(self._interactive_sources)
+            if interactive == self.interactive:
+                return
+            self.interactive = interactive
+        
+        stt = self.allocation("stt")
+        worker = self._processes.get("stt")
+        if worker is not None:
+            # The worker's thread pool is fixed; its cores are not. Unpinned
+            # workers get every core back once interactive work ends
+            cpus = stt.cpus if interactive or self.pin else self.cpus
+            if hasattr(os, "sched_setaffinity") and worker.process.is_alive():
+                try:
+                    set_process_affinity(worker.process.pid, cpus)
+                except OSError as e:
+                    print(f"⚠ Could not re-pin STT worker: {e}")
+        elif self._in_process:
+            self._torch_threads = stt.threads  # Applied by the next decode
+        print(f"✓ CPU plan ({'interactive' if interactive else 'background'}): {self.summary()}")
+    
+    def report(self):
+        """Current allocation of every workload"""
+        return {
+            "cpus": len(self.cpus),
+            "pinned": self.pin,
+            "interactive": sorted(self._interactive_sources),
+            "workloads": {workload: self.allocation(workload).as_dict() for workload in WORKLOADS},
+        }
+    
+    def summary(self):
+        parts = []
+        for workload in WORKLOADS:
+            allocation = self.allocation(workload)
+            nice = f" nice {allocation.nice}" if allocation.nice else ""
+            parts.append(f"{workload} {allocation.threads} threads{nice}")
+        return ", ".join(parts)
@@ -0,0 +1,154 @@
+"""
+Response Backend for MAYA
+Streams assistant replies token by token from an OpenAI-compatible chat
+endpoint (or an offline echo stand-in)
+
+Each reply is a task in the caller's turn scope on the shared asyncio
+loop, so cancelling the turn closes the stream mid-reply. Results reach
+the GUI only through Qt signals.
+"""
+
+import asyncio
+import os
+import threading
+from PyQt6.QtCore import QObject, pyqtSignal
+from .tracing import tracer
+
+
+class ResponseBackend(QObject):
+    """
+    Base class: one streamed reply per turn, identified by its turn id
+    
+    Subclasses define ``async def stream(self, message)``, an async
+    generator yielding the reply in text pieces on the shared loop. (Qt's
+    metaclass rules out abc, so the method is documented, not declared.)
+    """
+    
+    token_received = pyqtSignal(int, str)  # Turn id, text delta
+    response_finished = pyqtSignal(int, str)  # Turn id, full reply
+    error_occurred = pyqtSignal(int, str)  # Turn id, message
+    
+    def __init__(self):
+        super().__init__()
+        self._turn_lock = threading.Lock()
+        self._next_turn = 0
+    
+    def ask(self, message, scope):
+        """
+        Start a reply to message (returns immediately)
+        
+        Args:
+            message: User message
+            scope: TurnScope the reply belongs to; cancelling it stops the reply
+        Returns: turn id carried by this reply's signals
+        """
+        with self._turn_lock:
+            self._next_turn += 1
+            turn = self._next_turn
+        
+        scope.spawn(self._respond(turn, message))
+        return turn
+    
+    async def _respond(self, turn, message):
+        pieces = []
+        tracer.begin("response", turn, cat="response")
+        try:
+            async for token in self.stream(message):
+                if token:
+                    if not pieces:
+                        tracer.instant("first token", cat="response", turn=turn)
+                    pieces.append(token)
+                    self.token_received.emit(turn, token)
+        except asyncio.CancelledError:
+            tracer.end("response", turn, cat="response", tokens=len(pieces), outcome="cancelled")
+            print(f"Reply {turn} cancelled after {len(pieces)} tokens")
+            raise
+        except Exception as e:
+            tracer.end("response", turn, cat="response", tokens=len(pieces), outcome="error")
+            print(f"Response error: {e}")
+            self.error_occurred.emit(turn, str(e))
+            return
+        
+        tracer.end("response", turn, cat="response", tokens=len(pieces), outcome="done")
+        reply = "".join(pieces)
+        self.remember(message, reply)
+        self.response_finished.emit(turn, reply)
+    
+    def remember(self, message, reply):
+        """Record a finished exchange for later context"""
+
+
+class EchoResponseBackend(ResponseBackend):
+    """Offline stand-in that streams the message back word by word"""
+    
+    def __init__(self, token_delay=0.03):
+        super().__init__()
+        self.token_delay = token_delay
+    
+    async def stream(self, message):
+        for i, word in enumerate(f"I received: '{message}'".split(" ")):
+            await asyncio.sleep(self.token_delay)
+            yield word if i == 0 else " " + word
+
+
+class OpenAIResponseBackend(ResponseBackend):
+    """Streaming chat completions with a short rolling conversation context"""
+    
+    def __init__(self, api_key=None, base_url=None, model="gpt-4o-mini",
+                 system_prompt=None, max_history=10, request_deadline=30):
+        """
+        Initialize backend
+        
+        Args:
+            api_key: OpenAI API key (or set OPENAI_API_KEY env variable)
+            base_url: OpenAI-compatible endpoint (default: OPENAI_BASE_URL or api.openai.com)
+            model: Chat model name
+            system_prompt: Instructions sent ahead of every conversation
+            max_history: Past exchanges sent as context
+            request_deadline: Seconds without progress before a reply is abandoned
+        """
+        super().__init__()
+        from openai import AsyncOpenAI
+        
+        self.model = model
+        self.system_prompt = system_prompt
+        self.max_history = max_history
+        self.history = []  # [(user message, reply)]
+        self._history_lock = threading.Lock()
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv('OPENAI_API_KEY') or "unused",
+            base_url=base_url,
+            timeout=request_deadline,
+            max_retries=1
+        )
+    
+    def messages_for(self, message):
+        messages = []
+        if self.system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+        with self._history_lock:
+            history = self.history[-self.max_history:]
+        for asked, answered in history:
+            messages.append({"role": "user", "content": asked})
+            messages.append({"role": "assistant", "content": answered})
+        messages.append({"role": "user", "content": message})
+        return messages
+    
+    async def stream(self, message):
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self.messages_for(message),
+            stream=True
+        )
+        try:
+            async for chunk in response:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content
+        finally:
+            # Also on cancellation: drops the connection instead of draining it
+            await response.close()
+    
+    def remember(self, message, reply):
+        with self._history_lock:
+            self.history.append((message, reply))
+            del self.history[:-self.max_history]
@@ -1,74 +1,208 @@
 """
 Right Panel: Conversation History - Figma Design
-Chat bubbles with avatars matching Figma design
+Chat bubbles with avatars matching Figma design, painted by a delegate
+over a list model so long histories stay cheap
 """
 
+from array import array
+from collections import OrderedDict
+from math import ceil
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QLabel, QFrame, QHBoxLayout
+    QVBoxLayout, QLabel, QFrame, QLineEdit, QListView, QStyledItemDelegate
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, QAbstractListModel, QModelIndex, QPersistentModelIndex, QPointF, QRectF,
+    QSize, QTimer
+)
+from PyQt6.QtGui import QColor, QFont, QPainter, QTextLayout, QTextOption
 from .custom_widgets import COLORS
+from .tracing import tracer
+
+IS_USER_ROLE = Qt.ItemDataRole.UserRole
 
 
-class ChatBubble(QWidget):
-    """Chat message bubble with avatar"""
-    def __init__(self, text="", is_user=False, parent=None):
+class ConversationModel(QAbstractListModel):
+    """Message list with flat per-message storage: text, sender byte, row height"""
+    
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.is_user = is_user
-        self.text = text
-        
-        layout = QHBoxLayout(self)
-        layout.setContentsMargins(0, 4, 0, 4)
-        layout.setSpacing(8)
-        
-        # Avatar
-        avatar = QLabel()
-        avatar.setFixedSize(28, 28)
-        avatar.setStyleSheet(f"""
-            background-color: {COLORS['text_secondary'] if is_user else '#3A5A5F'};
-            border-radius: 14px;
-        """)
+        self._texts = []
+        self._from_user = bytearray()
+        self._heights = array('H')  # Measured row heights, 0 until painted
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._texts)
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._texts[index.row()]
+        if role == IS_USER_ROLE:
+            return bool(self._from_user[index.row()])
+        return None
+    
+    def append(self, text, is_user):
+        """Add a message at the end; returns its row"""
+        row = len(self._texts)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._texts.append(text)
+        self._from_user.append(1 if is_user else 0)
+        self._heights.append(0)
+        self.endInsertRows()
+        return row
+    
+    def append_text(self, row, text):
+        """Extend one message in place (streamed replies); returns the old text"""
+        old = self._texts[row]
+        self._texts[row] = old + text
+        self._heights[row] = 0
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+        return old
+    
+    def text(self, row):
+        return self._texts[row]
+    
+    def row_height(self, row):
+        return self._heights[row]
+    
+    def set_row_height(self, row, height):
+        self._heights[row] = min(height, 0xFFFF)
+    
+    def prepend(self, messages):
+        """Insert older messages [(text, is_user), ...] above the first row"""
+        if not messages:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+        self._texts[:0] = [text for text, _ in messages]
+        self._from_user[:0] = bytes(1 if is_user else 0 for _, is_user in messages)
+        self._heights[:0] = array('H', bytes(2 * len(messages)))
+        self.endInsertRows()
+    
+    def set_messages(self, messages):
+        """Replace every row with [(text, is_user), ...]"""
+        self.beginResetModel()
+        self._texts = [text for text, _ in messages]
+        self._from_user = bytearray(1 if is_user else 0 for _, is_user in messages)
+        self._heights = array('H', bytes(2 * len(messages)))
+        self.endResetModel()
+    
+    def clear(self):
+        self.set_messages([])
+
+
+class ChatBubbleDelegate(QStyledItemDelegate):
+    """Paints chat bubbles with avatars; wrapped text layouts are cached per text"""
+    
+    AVATAR_SIZE = 28
+    GAP = 8
+    PADDING_X = 10
+    PADDING_Y = 8
+    MARGIN_Y = 8
+    MIN_WIDTH = 80
+    MAX_WIDTH = 160
+    RADIUS = 10
+    
+    def __init__(self, parent=None, cache_size=512):
+        """
+        Args:
+            parent: Owning view
+            cache_size: Text layouts kept; only about one screenful is in use
+        """
+        super().__init__(parent)
+        self.font = QFont()
+        self.font.setPixelSize(12)
+        self.cache_size = cache_size
+        self._layouts = OrderedDict()  # text -> (QTextLayout, width, height)
+        self._text_option = QTextOption()
+        self._text_option.setWrapMode(QTextOption.WrapMode.WrapAtWordBoundaryOrAnywhere)
+        self._colors = {
+            'avatar_user': QColor(COLORS['text_secondary']),
+            'avatar_ai': QColor('#3A5A5F'),
+            'chat_user': QColor(COLORS['chat_user']),
+            'chat_ai': QColor(COLORS['chat_ai']),
+            'text': QColor(COLORS['text_primary']),
+        }
+    
+    def text_layout(self, text):
+        """
+        Wrapped layout of one message
+        Returns: (QTextLayout, natural width, height)
+        """
+        entry = self._layouts.get(text)
+        if entry is not None:
+            self._layouts.move_to_end(text)
+            return entry
         
-        # Message bubble with text
-        bubble = QFrame()
-        bubble_layout = QVBoxLayout(bubble)
-        bubble_layout.setContentsMargins(10, 8, 10, 8)
+        layout = QTextLayout(text, self.font)
+        layout.setTextOption(self._text_option)
+        line_width = self.MAX_WIDTH - 2 * self.PADDING_X
+        width = height = 0.0
+        layout.beginLayout()
+        while True:
+            line = layout.createLine()
+            if not line.isValid():
+                break
+            line.setLineWidth(line_width)
+            line.setPosition(QPointF(0, height))
+            height += line.height()
+            width = max(width, line.naturalTextWidth())
+        layout.endLayout()
         
-        message_label = QLabel(text)
-        message_label.setWordWrap(True)
-        message_label.setStyleSheet(f"""
-            color: {COLORS['text_primary']};
-            font-size: 12px;
-            background: transparent;
-            border: none;
-        """)
-        bubble_layout.addWidget(message_label)
+        entry = (layout, width, height)
+        self._layouts[text] = entry
+        if len(self._layouts) > self.cache_size:
+            self._layouts.popitem(last=False)
+        return entry
+    
+    def discard(self, text):
+        """Drop a cached layout whose text will not be shown again"""
+        self._layouts.pop(text, None)
+    
+    def bubble_size(self, text):
+        _, width, height = self.text_layout(text)
+        bubble_width = min(self.MAX_WIDTH, max(self.MIN_WIDTH, ceil(width) + 2 * self.PADDING_X))
+        return bubble_width, ceil(height) + 2 * self.PADDING_Y
+    
+    def sizeHint(self, option, index):
+        # Heights are kept in the model, so relayouts never re-measure text
+        model, row = index.model(), index.row()
+        height = model.row_height(row)
+        if not height:
+            _, bubble_height = self.bubble_size(model.text(row))
+            height = max(self.AVATAR_SIZE, bubble_height) + 2 * self.MARGIN_Y
+            model.set_row_height(row, height)
+        return QSize(option.rect.width(), height)
+    
+    def paint(self, painter, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole) or ""
+        is_user = index.data(IS_USER_ROLE)
+        layout, _, _ = self.text_layout(text)
+        bubble_width, bubble_height = self.bubble_size(text)
         
+        rect = QRectF(option.rect).adjusted(0, self.MARGIN_Y, 0, -self.MARGIN_Y)
         if is_user:
-            bubble.setStyleSheet(f"""
-                QFrame {{
-                    background-color: {COLORS['chat_user']};
-                    border-radius: 10px;
-                }}
-            """)
-            bubble.setMinimumWidth(80)
-            bubble.setMaximumWidth(160)
-            layout.addWidget(bubble)
-            layout.addStretch()
-            layout.addWidget(avatar)
+            # Bubble on the left, avatar pushed to the right edge
+            bubble_x = rect.left()
+            avatar_x = rect.right() - self.AVATAR_SIZE
         else:
-            bubble.setStyleSheet(f"""
-                QFrame {{
-                    background-color: {COLORS['chat_ai']};
-                    border-radius: 10px;
-                }}
-            """)
-            bubble.setMinimumWidth(80)
-            bubble.setMaximumWidth(160)
-            layout.addWidget(avatar)
-            layout.addWidget(bubble)
-            layout.addStretch()
+            avatar_x = rect.left()
+            bubble_x = avatar_x + self.AVATAR_SIZE + self.GAP
+        avatar_y = rect.top() + (rect.height() - self.AVATAR_SIZE) / 2
+        bubble_y = rect.top() + (rect.height() - bubble_height) / 2
+        
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self._colors['avatar_user' if is_user else 'avatar_ai'])
+        painter.drawEllipse(QRectF(avatar_x, avatar_y, self.AVATAR_SIZE, self.AVATAR_SIZE))
+        painter.setBrush(self._colors['chat_user' if is_user else 'chat_ai'])
+        painter.drawRoundedRect(QRectF(bubble_x, bubble_y, bubble_width, bubble_height),
+                                self.RADIUS, self.RADIUS)
+        painter.setPen(self._colors['text'])
+        layout.draw(painter, QPointF(bubble_x + self.PADDING_X, bubble_y + self.PADDING_Y))
+        painter.restore()
 
 
 class RightPanel(QFrame):
@@ -79,8 +213,17 @@ class RightPanel(QFrame):
     voice_button_clicked = pyqtSignal()  # Signal when voice button is clicked
     model_mode_changed = pyqtSignal(str)  # Signal when model mode is changed (local/api)
     
-    def __init__(self):
+    PAGE_SIZE = 50
+    
+    def __init__(self, conversation_log=None):
+        """
+        Args:
+            conversation_log: ConversationLog for persistent, searchable history
+        """
         super().__init__()
+        self.conversation_log = conversation_log
+        self.oldest_loaded_id = None  # Log id of the first row; None once all is loaded
+        self._follow_stream = True
         self.setFixedWidth(280)
         self.setStyleSheet(f"""
             QFrame#rightPanel {{
@@ -102,13 +245,44 @@ class RightPanel(QFrame):
         header.setStyleSheet(f"color: {COLORS['text_secondary']}; font-size: 10px;")
         layout.addWidget(header)
         
-        # Scrollable chat area
-        from PyQt6.QtWidgets import QScrollArea
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
-        scroll.setStyleSheet("""
-            QScrollArea {
+        # History search (only with a conversation log)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search history")
+        self.search_input.setStyleSheet(f"""
+            QLineEdit {{
+                background-color: {COLORS['card_bg']};
+                color: {COLORS['text_primary']};
+                border: none;
+                border-radius: 6px;
+                padding: 6px 8px;
+                font-size: 11px;
+            }}
+        """)
+        self.search_input.setVisible(self.conversation_log is not None)
+        layout.addWidget(self.search_input)
+        
+        # Searching waits for a pause in typing
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        
+        # Chat history: only visible rows are painted, nothing is a widget
+        self.conversation = ConversationModel(self)
+        self.chat_view = QListView()
+        self.chat_view.setModel(self.conversation)
+        self.chat_view.setItemDelegate(ChatBubbleDelegate(self.chat_view))
+        self.chat_view.setVerticalScrollMode(QListView.ScrollMode.ScrollPerPixel)
+        self.chat_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.chat_view.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.chat_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.chat_view.setResizeMode(QListView.ResizeMode.Adjust)
+        # Row heights are measured in batches so huge histories never stall a frame
+        self.chat_view.setLayoutMode(QListView.LayoutMode.Batched)
+        self.chat_view.setBatchSize(200)
+        self.chat_view.setStyleSheet("""
+            QListView {
                 border: none;
                 background: transparent;
             }
@@ -122,30 +296,104 @@ class RightPanel(QFrame):
                 border-radius: 3px;
             }
         """)
+        layout.addWidget(self.chat_view, stretch=1)
         
-        # Chat messages container
-        self.chat_widget = QWidget()
-        self.chat_layout = QVBoxLayout(self.chat_widget)
-        self.chat_layout.setContentsMargins(0, 8, 0, 0)
-        self.chat_layout.setSpacing(8)
-        self.chat_layout.addStretch()
+        self.search_results = ConversationModel(self)
+        self.chat_view.verticalScrollBar().valueChanged.connect(self.on_history_scrolled)
         
-        scroll.setWidget(self.chat_widget)
-        layout.addWidget(scroll, stretch=1)
+        if self.conversation_log is not None:
+            self.load_recent_history()
     
-    def add_message(self, text: str, is_user: bool):
-        """Add a message to the conversation"""
-        # Remove the stretch if it exists
-        if self.chat_layout.count() > 0:
-            item = self.chat_layout.takeAt(self.chat_layout.count() - 1)
-            # Don't call deleteLater on spacer items
+    def load_recent_history(self):
+        """Show only the newest page; older pages load on scroll"""
+        rows = self.conversation_log.recent(self.PAGE_SIZE)
+        self.conversation.set_messages([(text, bool(is_user)) for _, _, is_user, text in rows])
+        self.oldest_loaded_id = rows[0][0] if len(rows) == self.PAGE_SIZE else None
+        self.chat_view.scrollToBottom()
+    
+    def on_history_scrolled(self, value):
+        """Fetch the next older page when the view nears the top"""
+        if value > 50 or self.oldest_loaded_id is None:
+            return
+        if self.chat_view.model() is not self.conversation:
+            return
         
-        # Add new message bubble
-        bubble = ChatBubble(text=text, is_user=is_user)
-        self.chat_layout.addWidget(bubble)
+        rows = self.conversation_log.page_before(self.oldest_loaded_id, self.PAGE_SIZE)
+        self.oldest_loaded_id = rows[0][0] if len(rows) == self.PAGE_SIZE else None
+        if not rows:
+            return
         
-        # Add stretch at the end
-        self.chat_layout.addStretch()
+        # Keep the message under the cursor in place while rows appear above it
+        anchor = self.chat_view.indexAt(self.chat_view.viewport().rect().topLeft())
+        self.conversation.prepend([(text, bool(is_user)) for _, _, is_user, text in rows])
+        if anchor.isValid():
+            self.chat_view.scrollTo(self.conversation.index(anchor.row() + len(rows)),
+                                    QListView.ScrollHint.PositionAtTop)
+    
+    def run_search(self):
+        """Show matching messages, or the conversation again for an empty query"""
+        query = self.search_input.text().strip()
+        if not query or self.conversation_log is None:
+            self.chat_view.setModel(self.conversation)
+            self.chat_view.scrollToBottom()
+            return
+        
+        rows = self.conversation_log.search(query)
+        # Newest match at the bottom, like the conversation itself
+        self.search_results.set_messages(
+            [(text, bool(is_user)) for _, _, is_user, text in reversed(rows)]
+        )
+        self.chat_view.setModel(self.search_results)
+        self.chat_view.scrollToBottom()
+    
+    def add_message(self, text: str, is_user: bool):
+        """Add a message to the conversation"""
+        with tracer.span("add_message", cat="render", is_user=is_user):
+            if self.conversation_log is not None:
+                self.conversation_log.append(text, is_user)
+            
+            scrollbar = self.chat_view.verticalScrollBar()
+            at_bottom = scrollbar.value() >= scrollbar.maximum()
+            
+            self.conversation.append(text, is_user)
+            
+            # Follow new messages unless the user has scrolled back
+            if at_bottom and self.chat_view.model() is self.conversation:
+                self.chat_view.scrollToBottom()
+    
+    def begin_message(self, is_user=False):
+        """
+        Start an empty message that is filled in by append_to_message
+        Returns: QPersistentModelIndex of the message, which follows it
+            when older history is inserted above
+        """
+        scrollbar = self.chat_view.verticalScrollBar()
+        self._follow_stream = scrollbar.value() >= scrollbar.maximum()
+        row = self.conversation.append("", is_user)
+        return QPersistentModelIndex(self.conversation.index(row))
+    
+    def append_to_message(self, message, text):
+        """Add streamed text to a message started with begin_message"""
+        if not message.isValid():
+            return  # Conversation was reset
+        with tracer.span("append_to_message", cat="render", chars=len(text)):
+            row = message.row()
+            old = self.conversation.append_text(row, text)
+            delegate = self.chat_view.itemDelegate()
+            delegate.discard(old)
+            # The bubble may have grown a line
+            delegate.sizeHintChanged.emit(self.conversation.index(row))
+            if self._follow_stream and self.chat_view.model() is self.conversation:
+                self.chat_view.scrollToBottom()
+    
+    def finish_message(self, message, is_user=False):
+        """Save a completed streamed message to the history"""
+        if not message.isValid():
+            return
+        row = message.row()
+        tracer.instant("message finished", cat="render", row=row)
+        if self.conversation_log is not None:
+            self.conversation_log.append(self.conversation.text(row), is_user)
     
     def send_message(self):
         """Handle send button click"""
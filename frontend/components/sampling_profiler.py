@@ -0,0 +1,126 @@
+"""
+Sampling Profiler for MAYA
+Samples the Python stacks of every thread at a fixed rate and writes
+them as folded stacks, which speedscope (speedscope.app) and flamegraph.pl
+open as flame graphs
+
+Started for the first seconds of a run with python maya/main.py --profile,
+or toggled at any time with Ctrl+Shift+P.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+
+def frame_label(code):
+    filename = code.co_filename.replace("\\", "/").rsplit("/", 1)[-1]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class SampledProfiler:
+    """Stack sampler for a chosen time window"""
+    
+    def __init__(self, interval_ms=5, output_dir=None):
+        """
+        Initialize profiler
+        
+        Args:
+            interval_ms: Time between samples
+            output_dir: Where profiles are written (default ~/.maya/profiles)
+        """
+        self.interval = interval_ms / 1000
+        self.output_dir = Path(output_dir) if output_dir else Path.home() / ".maya" / "profiles"
+        self.stacks = Counter()  # Folded stack -> samples
+        self.samples = 0
+        self.started = None
+        self._thread = None
+        self._stop = threading.Event()
+    
+    @property
+    def running(self):
+        return self._thread is not None
+    
+    def start(self, seconds=None):
+        """
+        Start sampling
+        
+        Args:
+            seconds: Stop and write the profile after this long (None: until stop())
+        """
+        if self.running:
+            return
+        self.stacks.clear()
+        self.samples = 0
+        self.started = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample, args=(seconds,),
+                                        name="maya-profiler", daemon=True)
+        self._thread.start()
+        print(f"Profiling{f' for {seconds:g}s' if seconds else ''} (Ctrl+Shift+P stops)...")
+    
+    def stop(self):
+        """
+        Stop sampling and write the profile
+        Returns: path written, or None if nothing was sampled
+        """
+        thread = self._thread
+        if thread is None:
+            return None
+        self._stop.set()
+        thread.join()
+        self._thread = None
+        return self.write()
+    
+    def toggle(self):
+        if self.running:
+            self.stop()
+        else:
+            self.start()
+    
+    def _sample(self, seconds):
+        me = threading.get_ident()
+        deadline = time.monotonic() + seconds if seconds else None
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                labels.append(names.get(ident, f"thread {ident}"))
+                self.stacks[";".join(reversed(labels))] += 1
+            self.samples += 1
+            
+            if deadline is not None and time.monotonic() >= deadline:
+                self._stop.set()
+                self._thread = None
+                self.write()
+                return
+    
+    def write(self):
+        """Write the folded stacks and print the GUI thread's hottest functions"""
+        if not self.stacks:
+            return None
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started))
+        path = self.output_dir / f"profile-{stamp}.folded"
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        
+        # Self time on the GUI thread, where jank comes from
+        gui = threading.main_thread().name + ";"
+        own = Counter()
+        for stack, count in self.stacks.items():
+            if stack.startswith(gui):
+                own[stack.rsplit(";", 1)[-1]] += count
+        seconds = time.time() - self.started
+        print(f"✓ Profile written to {path} ({self.samples} samples, {seconds:.1f}s)")
+        for label, count in own.most_common(10):
+            print(f"  {count / self.samples:>6.0%}  {label}")
+        return path
@@ -4,12 +4,70 @@ Encrypted storage for embeddings and PIN
 """
 
 import os
+import copy
+import hmac
 import json
+import time
 import pickle
 import hashlib
+import threading
 from pathlib import Path
 from cryptography.fernet import Fernet
 
+from .embedding_store import EmbeddingStore
+
+# Parameters of PIN hashes saved before the KDF was configurable
+LEGACY_KDF = ("pbkdf2", {"iterations": 100000})
+
+# Encryption keys already read this session, by key file
+_key_cache = {}
+_key_cache_lock = threading.Lock()
+
+
+def derive_pin_hash(pin, salt, kdf, params):
+    """
+    Hash a PIN with the given KDF
+    Args:
+        kdf: 'pbkdf2' or 'scrypt'
+        params: {'iterations'} for PBKDF2, {'n', 'r', 'p'} for scrypt
+    Returns: bytes
+    """
+    if kdf == "pbkdf2":
+        return hashlib.pbkdf2_hmac('sha256', pin.encode('utf-8'), salt, params["iterations"])
+    if kdf == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(pin.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r + (1 << 20), dklen=32)
+    raise ValueError(f"Unknown KDF '{kdf}'")
+
+
+def calibrate_kdf(kdf="pbkdf2", target_ms=250):
+    """
+    Pick KDF parameters that take about target_ms on this machine
+    
+    Never goes below the legacy 100k PBKDF2 iterations or scrypt N=2^14.
+    Returns: params dict for derive_pin_hash
+    """
+    salt = os.urandom(32)
+    if kdf == "pbkdf2":
+        probe = 20000
+        start = time.perf_counter()
+        derive_pin_hash("0000", salt, kdf, {"iterations": probe})
+        per_iteration = (time.perf_counter() - start) * 1000 / probe
+        iterations = int(target_ms / per_iteration) if per_iteration else probe
+        return {"iterations": max(LEGACY_KDF[1]["iterations"], iterations // 1000 * 1000)}
+    if kdf == "scrypt":
+        params = {"n": 1 << 14, "r": 8, "p": 1}
+        start = time.perf_counter()
+        derive_pin_hash("0000", salt, kdf, params)
+        elapsed = (time.perf_counter() - start) * 1000
+        # Cost is linear in N; double while the next step stays within the target
+        while elapsed * 2 <= target_ms and params["n"] < 1 << 20:
+            params["n"] *= 2
+            elapsed *= 2
+        return params
+    raise ValueError(f"Unknown KDF '{kdf}'")
+
 
 class SecureStorage:
     """Secure storage for face embeddings and PIN"""
@@ -23,52 +81,87 @@ class SecureStorage:
         
         self.key = self._get_or_create_key()
         self.cipher = Fernet(self.key)
+        self._embedding_store = None
+        self._embedding_store_lock = threading.Lock()  # One store, migrated once
+        self._config_lock = threading.Lock()
+        self._config_cache = None  # (mtime_ns, size, config)
     
     def _get_default_path(self):
         """Get default secure storage path"""
         return Path.home() / ".maya" / "secure"
     
     def _get_or_create_key(self):
-        """Get or create encryption key"""
+        """Get or create encryption key (read from disk once per session)"""
         key_file = self.storage_path / ".key"
         
-        if key_file.exists():
-            with open(key_file, 'rb') as f:
-                return f.read()
-        else:
-            # Generate new key
-            key = Fernet.generate_key()
-            
-            with open(key_file, 'wb') as f:
-                f.write(key)
+        with _key_cache_lock:
+            if str(key_file) in _key_cache and key_file.exists():
+                return _key_cache[str(key_file)]
             
-            # Set owner-only permissions
-            os.chmod(key_file, 0o600)
+            if key_file.exists():
+                with open(key_file, 'rb') as f:
+                    key = f.read()
+            else:
+                # Generate new key
+                key = Fernet.generate_key()
+                
+                with open(key_file, 'wb') as f:
+                    f.write(key)
+                
+                # Set owner-only permissions
+                os.chmod(key_file, 0o600)
             
+            _key_cache[str(key_file)] = key
             return key
     
-    def save_embeddings(self, embeddings_dict):
+    def embedding_store(self):
         """
-        Save face embeddings (encrypted)
-        Args:
-            embeddings_dict: {name: embedding_array}
+        Binary embedding store (migrated from the pickled formats on first use)
+        Returns: EmbeddingStore; call load() on it once at startup
+        """
+        with self._embedding_store_lock:
+            if self._embedding_store is None:
+                store = EmbeddingStore(self.storage_path / "embeddings.bin", self.cipher)
+                if not store.exists():
+                    self._migrate_pickled_embeddings(store)
+                self._embedding_store = store
+            return self._embedding_store
+    
+    def _migrate_pickled_embeddings(self, store):
+        """
+        Move embeddings.enc into the store
+        
+        FaceRecognizer's unencrypted face_data/embeddings.pkl duplicated the
+        same data; it is removed once the migration is verified.
         """
-        embeddings_file = self.storage_path / "embeddings.enc"
+        legacy_file = self.storage_path / "embeddings.enc"
+        if not legacy_file.exists():
+            return
         
         try:
-            # Serialize embeddings
-            data = pickle.dumps(embeddings_dict)
+            with open(legacy_file, 'rb') as f:
+                embeddings = pickle.loads(self.cipher.decrypt(f.read()))
             
-            # Encrypt
-            encrypted_data = self.cipher.encrypt(data)
-            
-            # Write to file
-            with open(embeddings_file, 'wb') as f:
-                f.write(encrypted_data)
-            
-            # Set permissions
-            os.chmod(embeddings_file, 0o600)
+            store.replace_all(embeddings)
+            if set(store.load()) != set(embeddings):
+                raise ValueError("migrated store does not match")
             
+            legacy_file.unlink()
+            plain_copy = Path.home() / ".maya" / "face_data" / "embeddings.pkl"
+            if plain_copy.exists():
+                plain_copy.unlink()
+            print(f"✓ Migrated {len(embeddings)} face embeddings to {store.path.name}")
+        except Exception as e:
+            print(f"Error migrating embeddings: {e}")
+    
+    def save_embeddings(self, embeddings_dict):
+        """
+        Replace every stored embedding (rewrites the store)
+        Args:
+            embeddings_dict: {name: embedding_array}
+        """
+        try:
+            self.embedding_store().replace_all(embeddings_dict)
             print(f"✓ Saved {len(embeddings_dict)} face embeddings (encrypted)")
             return True
             
@@ -81,24 +174,8 @@ class SecureStorage:
         Load face embeddings (decrypt)
         Returns: {name: embedding_array} or {}
         """
-        embeddings_file = self.storage_path / "embeddings.enc"
-        
-        if not embeddings_file.exists():
-            return {}
-        
         try:
-            # Read encrypted data
-            with open(embeddings_file, 'rb') as f:
-                encrypted_data = f.read()
-            
-            # Decrypt
-            data = self.cipher.decrypt(encrypted_data)
-            
-            # Deserialize
-            embeddings_dict = pickle.loads(data)
-            
-            print(f"✓ Loaded {len(embeddings_dict)} face embeddings")
-            return embeddings_dict
+            return self.embedding_store().load()
             
         except Exception as e:
             print(f"Error loading embeddings: {e}")
@@ -107,26 +184,30 @@ class SecureStorage:
     def save_pin(self, pin):
         """
         Save PIN (hashed with salt)
+        
+        The KDF ('pin_kdf') is calibrated so one verification takes about
+        'pin_kdf_target_ms' on this machine; its parameters are stored with
+        the hash.
         Args:
             pin: 4-digit PIN string
         Returns: bool
         """
         pin_file = self.storage_path / "pin.json"
+        config = self.load_config()
         
         try:
             # Generate salt
             salt = os.urandom(32)
             
             # Hash PIN
-            pin_hash = hashlib.pbkdf2_hmac(
-                'sha256',
-                pin.encode('utf-8'),
-                salt,
-                100000  # iterations
-            )
+            kdf = config.get('pin_kdf', 'pbkdf2')
+            params = calibrate_kdf(kdf, config.get('pin_kdf_target_ms', 250))
+            pin_hash = derive_pin_hash(pin, salt, kdf, params)
             
-            # Store salt and hash
+            # Store KDF, salt and hash
             data = {
+                'kdf': kdf,
+                'params': params,
                 'salt': salt.hex(),
                 'hash': pin_hash.hex()
             }
@@ -146,7 +227,7 @@ class SecureStorage:
     
     def verify_pin(self, pin):
         """
-        Verify PIN against stored hash
+        Verify PIN against stored hash (slow by design; call off the GUI thread)
         Args:
             pin: 4-digit PIN string
         Returns: bool
@@ -165,16 +246,12 @@ class SecureStorage:
             salt = bytes.fromhex(data['salt'])
             stored_hash = bytes.fromhex(data['hash'])
             
-            # Hash provided PIN
-            pin_hash = hashlib.pbkdf2_hmac(
-                'sha256',
-                pin.encode('utf-8'),
-                salt,
-                100000
-            )
+            # Hash provided PIN with the parameters it was saved with
+            kdf, params = data.get('kdf', LEGACY_KDF[0]), data.get('params', LEGACY_KDF[1])
+            pin_hash = derive_pin_hash(pin, salt, kdf, params)
             
             # Compare
-            return pin_hash == stored_hash
+            return hmac.compare_digest(pin_hash, stored_hash)
             
         except Exception as e:
             print(f"Error verifying PIN: {e}")
@@ -189,10 +266,12 @@ class SecureStorage:
         config_file = self.storage_path / "config.json"
         
         try:
-            with open(config_file, 'w') as f:
-                json.dump(config_dict, f, indent=2)
-            
-            os.chmod(config_file, 0o600)
+            with self._config_lock:
+                with open(config_file, 'w') as f:
+                    json.dump(config_dict, f, indent=2)
+                
+                os.chmod(config_file, 0o600)
+                self._config_cache = None
             print("✓ Configuration saved")
             return True
             
@@ -203,6 +282,9 @@ class SecureStorage:
     def load_config(self):
         """
         Load configuration settings
+        
+        The file is parsed again only when its modification time or size
+        changes; callers get their own copy.
         Returns: dict or default config
         """
         config_file = self.storage_path / "config.json"
@@ -214,27 +296,67 @@ class SecureStorage:
             "timeout_seconds": 30,
             "max_attempts": 5,
             "fallback_to_pin": True,
-            "owner_name": "Afraz"
+            "owner_name": "Afraz",
+            "stt_model_size": "base",
+            "stt_quantize_int8": False,
+            "stt_decoding_profile": "balanced",
+            "stt_code_switching": False,
+            "stt_preload_languages": [],
+            "stt_memory_budget_mb": 2048,
+            "stt_idle_unload_seconds": 900,
+            "stt_adaptive_quality": True,
+            "stt_rtf_downgrade": 0.4,
+            "stt_rtf_upgrade": 0.15,
+            "stt_api_base_url": None,
+            "stt_api_encoding": "flac",
+            "stt_api_deadline_seconds": 10,
+            "stt_api_max_retries": 2,
+            "stt_hybrid_routing": True,
+            "stt_hedge_after_seconds": 1.5,
+            "stt_spool_enabled": True,
+            "stt_spool_max_mb": 50,
+            "stt_spool_batch_size": 4,
+            "inference_workers": True,
+            "cpu_governor": True,
+            "cpu_pin_workers": False,
+            "stt_nice": 10,
+            "pin_kdf": "pbkdf2",
+            "pin_kdf_target_ms": 250,
+            "conversation_log": True,
+            "chat_api_base_url": None,
+            "chat_model": "gpt-4o-mini",
+            "chat_system_prompt": "You are MAYA, a concise desktop assistant.",
+            "chat_deadline_seconds": 30
         }
         
-        if not config_file.exists():
+        try:
+            stat = config_file.stat()
+        except FileNotFoundError:
             return default_config
         
-        try:
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-            
-            # Merge with defaults (for new keys)
-            return {**default_config, **config}
+        with self._config_lock:
+            cached = self._config_cache
+            if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+                return copy.deepcopy(cached[2])
             
-        except Exception as e:
-            print(f"Error loading config: {e}")
-            return default_config
+            try:
+                with open(config_file, 'r') as f:
+                    config = json.load(f)
+                
+                # Merge with defaults (for new keys)
+                config = {**default_config, **config}
+                self._config_cache = (stat.st_mtime_ns, stat.st_size, config)
+                return copy.deepcopy(config)
+                
+            except Exception as e:
+                print(f"Error loading config: {e}")
+                return default_config
     
     def delete_all_data(self):
         """Delete all stored face and PIN data"""
         try:
             files = [
+                self.storage_path / "embeddings.bin",
                 self.storage_path / "embeddings.enc",
                 self.storage_path / "pin.json",
                 self.storage_path / "config.json"
@@ -243,6 +365,9 @@ class SecureStorage:
             for file in files:
                 if file.exists():
                     file.unlink()
+            with self._embedding_store_lock:
+                self._embedding_store = None
+            self._config_cache = None
             
             print("✓ Deleted all face authentication data")
             return True
@@ -256,5 +381,4 @@ class SecureStorage:
         Check if this is first-time setup
         Returns: bool (True if no embeddings exist)
         """
-        embeddings_file = self.storage_path / "embeddings.enc"
-        return not embeddings_file.exists()
+        return not self.embedding_store().exists()
@@ -0,0 +1,175 @@
+"""
+Stall Detector for MAYA
+Measures Qt event-loop latency and reports stalls of the GUI thread with
+the stack of the callback that caused them
+
+A precise timer ticks on the GUI thread; how late each tick fires is the
+event-loop latency and goes into a rolling histogram. A watchdog thread
+checks the tick heartbeat and, once the GUI thread has been busy for longer
+than the threshold, captures its stack while the stall is still happening.
+"""
+
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer, Qt
+from .tracing import tracer
+
+# Upper bounds of the latency histogram buckets, in ms
+BUCKETS_MS = (2, 4, 8, 16, 33, 50, 100, 200, 500, 1000, float("inf"))
+
+
+class Stall:
+    """One stall: when, how long, and where the GUI thread was"""
+    
+    def __init__(self, started, duration_ms, callback, stack):
+        self.started = started
+        self.duration_ms = duration_ms
+        self.callback = callback  # "function (file:line)" of the slot, or None
+        self.stack = stack  # Formatted stack lines, or None if not caught in time
+    
+    def describe(self):
+        where = self.callback or "unknown callback (ended before the watchdog looked)"
+        return f"{self.duration_ms:.0f} ms in {where}"
+
+
+class StallDetector(QObject):
+    """Event-loop latency histogram and stall watchdog (create on the GUI thread)"""
+    
+    def __init__(self, threshold_ms=100, interval_ms=50, window_seconds=300, max_stalls=50,
+                 parent=None):
+        """
+        Initialize detector (call start() once the event loop runs)
+        
+        Args:
+            threshold_ms: GUI-thread busy time reported as a stall
+            interval_ms: Tick interval of the latency probe
+            window_seconds: Span of the rolling latency histogram
+            max_stalls: Recent stalls kept with their stacks
+            parent: Owning QObject
+        """
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.latencies = deque(maxlen=max(1, int(window_seconds / self.interval)))  # ms
+        self.stalls = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self._gui_thread = threading.get_ident()
+        self._callback_depth = None  # Stack depth at which the event loop calls slots
+        self._last_tick = None
+        self._caught = None  # (callback, stack) captured by the watchdog for this stall
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watchdog = None
+        
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+    
+    def start(self):
+        """Start probing (GUI thread, from inside the event loop)"""
+        if self._watchdog is not None:
+            return
+        # This slot runs at the same depth as every other slot the loop calls
+        self._callback_depth = len(traceback.extract_stack()) - 1
+        self._last_tick = time.perf_counter()
+        self._timer.start()
+        self._watchdog = threading.Thread(target=self._watch, name="maya-stall-watchdog", daemon=True)
+        self._watchdog.start()
+    
+    def stop(self):
+        self._timer.stop()
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+    
+    def _tick(self):
+        now = time.perf_counter()
+        busy = now - self._last_tick
+        self._last_tick = now
+        self.latencies.append(max(0.0, busy - self.interval) * 1000)
+        
+        with self._lock:
+            caught, self._caught = self._caught, None
+        if busy - self.interval >= self.threshold:
+            callback, stack = caught or (None, None)
+            self._record(Stall(time.time() - busy, (busy - self.interval) * 1000, callback, stack))
+    
+    def _watch(self):
+        """Watchdog thread: catch the GUI thread's stack while it is stalled"""
+        poll = min(self.threshold / 4, 0.05)
+        stalled_since = None
+        while not self._stop.wait(poll):
+            last_tick = self._last_tick
+            if time.perf_counter() - last_tick < self.interval + self.threshold:
+                stalled_since = None
+                continue
+            if stalled_since == last_tick:
+                continue  # Already captured this stall
+            stalled_since = last_tick
+            frame = sys._current_frames().get(self._gui_thread)
+            if frame is None:
+                continue
+            summary = traceback.extract_stack(frame)
+            del frame
+            with self._lock:
+                self._caught = (self._callback_of(summary), traceback.format_list(summary[-12:]))
+    
+    def _callback_of(self, summary):
+        """The slot the event loop was running, from a GUI-thread stack"""
+        depth = self._callback_depth
+        if depth is None or len(summary) <= depth:
+            return "Qt (no Python frame)"
+        entry = summary[depth]
+        filename = entry.filename.replace("\\", "/").rsplit("/", 1)[-1]
+        return f"{entry.name} ({filename}:{entry.lineno})"
+    
+    def _record(self, stall):
+        self.stall_count += 1
+        self.stalls.append(stall)
+        print(f"⚠ GUI stalled {stall.describe()}")
+        if stall.stack:
+            print("".join(stall.stack).rstrip())
+        tracer.complete("GUI stall", tracer.now() - int(stall.duration_ms * 1000), cat="stall",
+                        callback=stall.callback)
+    
+    def histogram(self):
+        """
+        Event-loop latency over the rolling window
+        Returns: [(bucket upper bound in ms, count)]
+        """
+        counts = [0] * len(BUCKETS_MS)
+        for latency in self.latencies:
+            for i, bound in enumerate(BUCKETS_MS):
+                if latency < bound:
+                    counts[i] += 1
+                    break
+        return list(zip(BUCKETS_MS, counts))
+    
+    def percentile(self, fraction):
+        samples = sorted(self.latencies)
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+    
+    def summary(self):
+        """Latency percentiles, histogram and the worst recent stalls"""
+        lines = [
+            f"Event-loop latency: p50 {self.percentile(0.50):.1f} ms, p99 {self.percentile(0.99):.1f} ms, "
+            f"max {max(self.latencies, default=0.0):.0f} ms over {len(self.latencies)} ticks; "
+            f"{self.stall_count} stalls over {self.threshold * 1000:.0f} ms"
+        ]
+        total = len(self.latencies) or 1
+        lower = 0
+        for bound, count in self.histogram():
+            if count:
+                label = f"≥{lower} ms" if bound == float("inf") else f"{lower}-{bound} ms"
+                lines.append(f"  {label:<12}{count:>7} {'█' * max(1, round(40 * count / total))}")
+            lower = bound
+        for stall in sorted(self.stalls, key=lambda stall: stall.duration_ms, reverse=True)[:5]:
+            lines.append(f"  stall {stall.describe()}")
+        return "\n".join(lines)
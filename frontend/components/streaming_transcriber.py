@@ -0,0 +1,155 @@
+"""
+Streaming Transcriber for MAYA
+Turns a live PCM stream into partial and final transcripts using a
+VoiceListener's Whisper models
+"""
+
+import threading
+from collections import deque
+import numpy as np
+
+from frontend.components.voice_listener import TranscriptionCancelled
+
+
+class StreamingTranscriber:
+    """Incremental transcription of one audio stream"""
+    
+    def __init__(self, listener, on_partial, on_final, on_error=None, sample_rate=16000,
+                 partial_interval=0.8, silence_seconds=0.8, silence_level=0.01,
+                 max_utterance=20.0, language=None):
+        """
+        Initialize streaming transcriber
+        
+        Args:
+            listener: VoiceListener whose transcribe() does the decoding
+            on_partial: Called with the running transcript of the current utterance
+            on_final: Called with the transcript once an utterance ends
+            on_error: Called with an error message
+            sample_rate: Sample rate of the fed audio
+            partial_interval: Seconds of new speech between partial decodes
+            silence_seconds: Trailing silence that ends an utterance
+            silence_level: RMS level below which a chunk counts as silence
+            max_utterance: Utterances are cut at this length
+            language: Language of this stream (default: the listener's);
+                may be changed between utterances
+        """
+        self.listener = listener
+        self.language = language
+        self.on_partial = on_partial
+        self.on_final = on_final
+        self.on_error = on_error or (lambda message: print(f"Streaming STT error: {message}"))
+        self.sample_rate = sample_rate
+        self.partial_samples = int(partial_interval * sample_rate)
+        self.silence_samples = int(silence_seconds * sample_rate)
+        self.silence_level = silence_level
+        self.max_samples = int(max_utterance * sample_rate)
+        
+        self._cond = threading.Condition()
+        self._chunks = []
+        self._samples = 0
+        self._since_partial = 0
+        self._silent = 0
+        self._speech = False
+        self._partial_due = False
+        self._partial_cancel = threading.Event()
+        self._finals = deque()
+        self._closed = False
+        
+        self._worker = threading.Thread(target=self._decode_loop)
+        self._worker.daemon = True
+        self._worker.start()
+    
+    def feed(self, pcm16):
+        """
+        Add audio to the stream
+        
+        Args:
+            pcm16: Little-endian int16 mono PCM bytes
+        """
+        chunk = np.frombuffer(pcm16, dtype="<i2").astype(np.float32) / 32768.0
+        if not chunk.size:
+            return
+        
+        rms = float(np.sqrt(np.mean(chunk * chunk)))
+        with self._cond:
+            self._chunks.append(chunk)
+            self._samples += chunk.size
+            self._since_partial += chunk.size
+            
+            if rms >= self.silence_level:
+                self._speech = True
+                self._silent = 0
+            else:
+                self._silent += chunk.size
+            
+            if not self._speech:
+                # Only leading silence so far; keep a short pre-roll
+                self._trim_preroll()
+            elif self._silent >= self.silence_samples or self._samples >= self.max_samples:
+                self._end_utterance()
+            elif self._since_partial >= self.partial_samples:
+                self._partial_due = True
+                self._cond.notify()
+    
+    def finish(self):
+        """End the current utterance now (e.g. the user released the mic)"""
+        with self._cond:
+            self._end_utterance()
+    
+    def close(self, wait=True):
+        """Finish the current utterance and stop once every final is delivered"""
+        with self._cond:
+            self._end_utterance()
+            self._closed = True
+            self._cond.notify()
+        if wait:
+            self._worker.join()
+    
+    def _trim_preroll(self):
+        while self._chunks and self._samples - self._chunks[0].size >= self.silence_samples:
+            self._samples -= self._chunks.pop(0).size
+        self._since_partial = 0
+    
+    def _end_utterance(self):
+        """Queue the buffered utterance for a final decode (lock held)"""
+        if self._speech and self._chunks:
+            self._finals.append(np.concatenate(self._chunks))
+            self._partial_cancel.set()  # A running partial is now stale
+        self._chunks = []
+        self._samples = 0
+        self._since_partial = 0
+        self._silent = 0
+        self._speech = False
+        self._partial_due = False
+        self._cond.notify()
+    
+    def _decode_loop(self):
+        """Decode finals in order; partials only for the newest audio"""
+        while True:
+            with self._cond:
+                while not self._finals and not self._partial_due and not self._closed:
+                    self._cond.wait()
+                
+                if self._finals:
+                    audio, final = self._finals.popleft(), True
+                    cancel = None
+                elif self._partial_due:
+                    audio, final = np.concatenate(self._chunks), False
+                    self._partial_due = False
+                    self._since_partial = 0
+                    cancel = self._partial_cancel = threading.Event()
+                else:
+                    return
+            
+            try:
+                text = self.listener.transcribe(audio, cancel_event=cancel, language=self.language)
+            except TranscriptionCancelled:
+                continue
+            except Exception as e:
+                self.on_error(str(e))
+                continue
+            
+            if final:
+                self.on_final(text)
+            elif text and not cancel.is_set():
+                self.on_partial(text)
@@ -0,0 +1,259 @@
+"""
+STT Model Manager for MAYA
+Owns every loaded speech-to-text model under a RAM budget
+Unloads idle models and reports load time and resident size
+"""
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+from PyQt6.QtCore import QObject, pyqtSignal
+
+
+def model_resident_bytes(model):
+    """
+    Approximate resident size of a torch model
+    
+    Counts every tensor in the state dict, including the packed weights
+    of dynamically quantized layers, which are not registered parameters.
+    """
+    def tensor_bytes(value):
+        if hasattr(value, "element_size") and hasattr(value, "nelement"):
+            return value.element_size() * value.nelement()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(item) for item in value)
+        return 0
+    
+    try:
+        return sum(tensor_bytes(value) for value in model.state_dict().values())
+    except Exception:
+        return 0
+
+
+class _ManagedModel:
+    """Bookkeeping for one loaded model"""
+    
+    def __init__(self, model, load_seconds, resident_bytes):
+        self.model = model
+        self.load_seconds = load_seconds
+        self.resident_bytes = resident_bytes
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        # Whisper keeps its kv-cache in hooks on the shared modules, so two
+        # decodes on one model at once corrupt each other
+        self.decode_lock = threading.Lock()
+
+
+class STTModelManager(QObject):
+    """Loads, shares and unloads STT models within a memory budget"""
+    
+    # Signals
+    model_loaded = pyqtSignal(str, float, float)  # name, load seconds, resident MB
+    model_unloaded = pyqtSignal(str)
+    
+    def __init__(self, budget_mb=2048, idle_timeout=900, check_interval=30, on_change=None):
+        """
+        Initialize model manager
+        
+        Args:
+            budget_mb: RAM budget for all loaded models (0 disables the budget)
+            idle_timeout: Seconds without use before a model is unloaded
+                (0 disables idle unloading)
+            check_interval: Seconds between idle checks
+            on_change: Called (on the loading or unloading thread) after any
+                model is loaded or unloaded; unlike the signals it needs no
+                Qt event loop, so worker processes can use it
+        """
+        super().__init__()
+        self.on_change = on_change
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.idle_timeout = idle_timeout
+        self.check_interval = check_interval
+        self._entries = {}  # name -> _ManagedModel
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._idle_timer = None
+        
+        if self.idle_timeout > 0:
+            self._schedule_idle_check()
+    
+    def get(self, name):
+        """Return a loaded model (or None) and mark it as recently used"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            entry.last_used = time.monotonic()
+            return entry.model
+    
+    def is_loaded(self, name):
+        """Check if a model is resident"""
+        return name in self._entries
+    
+    def load(self, name, loader):
+        """
+        Return a model, loading it with loader() if needed (blocking)
+        
+        Concurrent callers for the same name wait for a single load.
+        Least-recently-used idle models are evicted to stay within budget.
+        
+        Args:
+            name: Model key
+            loader: Zero-argument callable that returns the model
+        """
+        model = self.get(name)
+        if model is not None:
+            return model
+        
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        
+        with load_lock:
+            model = self.get(name)
+            if model is not None:
+                return model
+            
+            start = time.perf_counter()
+            model = loader()
+            load_seconds = time.perf_counter() - start
+            resident = model_resident_bytes(model)
+            
+            with self._lock:
+                self._entries[name] = _ManagedModel(model, load_seconds, resident)
+            
+            resident_mb = resident / (1024 * 1024)
+            print(f"✓ STT model {name} loaded in {load_seconds:.1f}s ({resident_mb:.0f} MB)")
+            self.model_loaded.emit(name, load_seconds, resident_mb)
+            if self.on_change:
+                self.on_change()
+            
+            self._enforce_budget(keep=name)
+            return model
+    
+    @contextmanager
+    def use(self, name, exclusive=False):
+        """
+        Pin a model while it is in use so it cannot be unloaded
+        
+        Args:
+            name: Model key
+            exclusive: Also wait for, then hold, the model's decode lock;
+                every forward pass through a shared model must set this
+        Yields: the model, or None if it is not loaded
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry.in_use += 1
+                entry.last_used = time.monotonic()
+        
+        locked = False
+        try:
+            if entry is not None and exclusive:
+                entry.decode_lock.acquire()
+                locked = True
+            yield entry.model if entry is not None else None
+        finally:
+            if locked:
+                entry.decode_lock.release()
+            if entry is not None:
+                with self._lock:
+                    entry.in_use -= 1
+                    entry.last_used = time.monotonic()
+    
+    def unload(self, name):
+        """Unload a model unless it is in use; returns True if unloaded"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry.in_use > 0:
+                return False
+            del self._entries[name]
+        
+        del entry
+        gc.collect()
+        print(f"✓ STT model {name} unloaded")
+        self.model_unloaded.emit(name)
+        if self.on_change:
+            self.on_change()
+        return True
+    
+    def unload_all(self):
+        """Unload every model that is not in use"""
+        for name in list(self._entries):
+            self.unload(name)
+    
+    def resident_mb(self):
+        """Total resident size of loaded models in MB"""
+        with self._lock:
+            total = sum(entry.resident_bytes for entry in self._entries.values())
+        return total / (1024 * 1024)
+    
+    def report(self):
+        """
+        Get per-model statistics
+        Returns: {name: {"load_seconds", "resident_mb", "idle_seconds", "in_use"}}
+        """
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "load_seconds": entry.load_seconds,
+                    "resident_mb": entry.resident_bytes / (1024 * 1024),
+                    "idle_seconds": now - entry.last_used,
+                    "in_use": entry.in_use > 0,
+                }
+                for name, entry in self._entries.items()
+            }
+    
+    def _enforce_budget(self, keep=None):
+        """Evict least-recently-used idle models until within budget"""
+        if self.budget_bytes <= 0:
+            return
+        
+        while True:
+            with self._lock:
+                total = sum(entry.resident_bytes for entry in self._entries.values())
+                if total <= self.budget_bytes:
+                    return
+                candidates = [
+                    (entry.last_used, name)
+                    for name, entry in self._entries.items()
+                    if name != keep and entry.in_use == 0
+                ]
+            
+            if not candidates:
+                print(f"⚠ STT models use {total / (1024 * 1024):.0f} MB, over budget")
+                return
+            
+            _, victim = min(candidates)
+            print(f"STT memory budget exceeded, evicting {victim}")
+            self.unload(victim)
+    
+    def _schedule_idle_check(self):
+        """Run the idle check periodically on a timer thread"""
+        self._idle_timer = threading.Timer(self.check_interval, self._check_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+    
+    def _check_idle(self):
+        """Unload models unused for longer than the idle timeout"""
+        now = time.monotonic()
+        with self._lock:
+            idle = [
+                name for name, entry in self._entries.items()
+                if entry.in_use == 0 and now - entry.last_used > self.idle_timeout
+            ]
+        
+        for name in idle:
+            print(f"STT model {name} idle for {self.idle_timeout}s")
+            self.unload(name)
+        
+        if self._idle_timer is not None:
+            self._schedule_idle_check()
+    
+    def shutdown(self):
+        """Stop the idle timer"""
+        if self._idle_timer:
+            self._idle_timer.cancel()
+            self._idle_timer = None
@@ -0,0 +1,127 @@
+"""
+Adaptive STT Quality Controller for MAYA
+Moves local Whisper up and down a ladder of model sizes and decoding
+profiles based on the measured real-time factor (RTF)
+"""
+
+import time
+
+
+# Quality ladder, fastest first: (model size, decoding profile)
+QUALITY_TIERS = (
+    ("tiny", "interactive"),
+    ("base", "interactive"),
+    ("base", "balanced"),
+    ("small", "balanced"),
+    ("small", "accurate"),
+)
+
+# Speed order of model sizes and profiles, used to place a configured tier
+# that is not on the ladder
+MODEL_SIZE_ORDER = ("tiny", "base", "small", "medium", "turbo", "large")
+PROFILE_ORDER = ("interactive", "balanced", "accurate")
+
+
+def tier_rank(model_size, decoding_profile):
+    """Sort key of a tier by decode cost, or None if its speed is unknown"""
+    size = model_size.removesuffix(".en")
+    if "turbo" in size:
+        size = "turbo"
+    elif size.startswith("large"):
+        size = "large"  # large-v2, large-v3, ...
+    if size not in MODEL_SIZE_ORDER or decoding_profile not in PROFILE_ORDER:
+        return None
+    return MODEL_SIZE_ORDER.index(size), PROFILE_ORDER.index(decoding_profile)
+
+
+class AdaptiveQualityController:
+    """Chooses a quality tier from recent real-time factors"""
+    
+    def __init__(self, model_size="base", decoding_profile="balanced", tiers=QUALITY_TIERS,
+                 downgrade_rtf=0.4, upgrade_rtf=0.15, window=3):
+        """
+        Initialize quality controller
+        
+        Args:
+            model_size: Starting Whisper model size
+            decoding_profile: Starting decoding profile
+            tiers: Ordered (model size, profile) ladder, fastest first
+            downgrade_rtf: Step down when RTF stays above this
+            upgrade_rtf: Step up when RTF stays below this
+            window: Consecutive measurements required before changing tier
+        """
+        if upgrade_rtf >= downgrade_rtf:
+            raise ValueError("upgrade_rtf must be lower than downgrade_rtf")
+        
+        self.tiers = tuple(tiers)
+        self.downgrade_rtf = downgrade_rtf
+        self.upgrade_rtf = upgrade_rtf
+        self.window = window
+        self.index = self._place_tier(model_size, decoding_profile)
+        self.recent = []
+        self.decisions = []  # Log of tier changes
+    
+    @property
+    def tier(self):
+        """Current (model size, decoding profile)"""
+        return self.tiers[self.index]
+    
+    def _place_tier(self, model_size, decoding_profile):
+        """
+        Index of the configured tier, inserting it into the ladder by speed
+        if it is not on it (e.g. medium or large)
+        
+        A tier whose speed cannot be ranked becomes the only tier, which
+        keeps the configured model and turns adaptation off.
+        """
+        configured = (model_size, decoding_profile)
+        if configured in self.tiers:
+            return self.tiers.index(configured)
+        
+        rank = tier_rank(*configured)
+        ranks = [tier_rank(*tier) for tier in self.tiers]
+        if rank is None or None in ranks:
+            print(f"⚠ No speed rank for {model_size}/{decoding_profile}, adaptive quality off")
+            self.tiers = (configured,)
+            return 0
+        
+        index = sum(1 for other in ranks if other < rank)
+        self.tiers = self.tiers[:index] + (configured,) + self.tiers[index:]
+        return index
+    
+    def record(self, rtf):
+        """
+        Record one transcription's real-time factor
+        
+        Args:
+            rtf: Decode seconds divided by audio seconds
+        Returns: new (model size, decoding profile) if the tier changed, else None
+        """
+        self.recent = (self.recent + [rtf])[-self.window:]
+        if len(self.recent) < self.window:
+            return None
+        
+        if min(self.recent) > self.downgrade_rtf and self.index > 0:
+            return self._change(self.index - 1, "downgrade")
+        if max(self.recent) < self.upgrade_rtf and self.index < len(self.tiers) - 1:
+            return self._change(self.index + 1, "upgrade")
+        return None
+    
+    def _change(self, index, action):
+        """Move to a new tier and log the decision"""
+        previous = self.tier
+        average = sum(self.recent) / len(self.recent)
+        self.index = index
+        self.recent = []
+        
+        decision = {
+            "time": time.time(),
+            "action": action,
+            "from": previous,
+            "to": self.tier,
+            "rtf": average,
+        }
+        self.decisions.append(decision)
+        print(f"STT quality {action}: {previous[0]}/{previous[1]} -> "
+              f"{self.tier[0]}/{self.tier[1]} (RTF {average:.2f})")
+        return self.tier
@@ -0,0 +1,283 @@
+"""
+Hybrid STT Router for MAYA
+Sends each utterance to the cloud API and hedges with local Whisper
+when the cloud result is late; the first result wins
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+from .audio_capture import ListenError
+from .tracing import tracer
+from .voice_listener import TranscriptionCancelled
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class HybridSTTRouter(QObject):
+    """Voice listener that races cloud and local transcription"""
+    
+    # Signals (same interface as VoiceListener / VoiceListenerAPI)
+    transcription_ready = pyqtSignal(str)  # Emits transcribed text
+    listening_started = pyqtSignal()
+    listening_stopped = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+    path_won = pyqtSignal(str, float)  # 'cloud' or 'local', latency in seconds
+    
+    def __init__(self, local_listener, api_listener, hedge_after=1.5,
+                 failure_threshold=3, unhealthy_cooldown=60.0, history=200):
+        """
+        Initialize hybrid router
+        
+        Args:
+            local_listener: VoiceListener used for recording and the local hedge
+            api_listener: VoiceListenerAPI used for the cloud path
+            hedge_after: Seconds to wait for the cloud before starting local Whisper
+            failure_threshold: Consecutive cloud failures before going local-only
+            unhealthy_cooldown: Seconds to stay local-only before trying the cloud again
+            history: Latency samples kept per path
+        """
+        super().__init__()
+        self.local = local_listener
+        self.api = api_listener
+        self.hedge_after = hedge_after
+        self.failure_threshold = failure_threshold
+        self.unhealthy_cooldown = unhealthy_cooldown
+        self.is_listening = False
+        
+        self._stats_lock = threading.Lock()
+        self.latencies = {"cloud": deque(maxlen=history), "local": deque(maxlen=history)}
+        self.wins = {"cloud": 0, "local": 0}
+        self.hedges_started = 0
+        self.cloud_failures = 0
+        self.unhealthy_until = 0.0
+    
+    def set_language(self, language_code):
+        """Change language on both engines"""
+        self.local.set_language(language_code)
+        self.api.set_language(language_code)
+    
+    def network_healthy(self):
+        """Cloud is usable unless it failed repeatedly within the cooldown"""
+        return time.monotonic() >= self.unhealthy_until
+    
+    def start_listening(self, duration=5):
+        """
+        Start recording audio for specified duration
+        
+        Args:
+            duration: Recording duration in seconds
+        """
+        self.begin_listening()
+        
+        thread = threading.Thread(target=self._record_and_route, args=(duration,))
+        thread.daemon = True
+        thread.start()
+    
+    def begin_listening(self):
+        """Arm the microphone for listen() (GUI thread); returns True"""
+        self.is_listening = True
+        self.local.capture.arm()  # A stop before the thread starts is not lost
+        self.listening_started.emit()
+        return True
+    
+    @property
+    def is_recording(self):
+        return self.local.is_recording
+    
+    def stop_listening(self):
+        """Stop recording"""
+        self.is_listening = False
+        self.local.stop_listening()
+    
+    def listen(self, duration, cancel_event=None):
+        """
+        Record one utterance and transcribe it, hedged (blocking)
+        
+        Args:
+            duration: Recording duration in seconds
+            cancel_event: Optional threading.Event that aborts both paths
+        Returns: transcribed text
+        Raises: ListenError
+        """
+        try:
+            with tracer.span("mic capture", cat="stt", duration=duration):
+                audio = self.local.record(duration)
+        except Exception as e:
+            raise ListenError(f"Recording error: {str(e)}") from e
+        finally:
+            self.listening_stopped.emit()
+        
+        if not audio.size:
+            raise ListenError("No audio recorded")
+        
+        try:
+            with tracer.span("transcribe", cat="stt", path="hedged"):
+                text = self.transcribe(audio, cancel_event)
+        except Exception as e:
+            if cancel_event is not None and cancel_event.is_set():
+                raise ListenError("Transcription cancelled") from e
+            # Both paths failed; keep the utterance for the cloud to pick up later
+            pcm16 = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+            if self.api.spool_utterance(pcm16):
+                raise ListenError("Transcription failed, utterance queued for later") from e
+            raise ListenError(f"Transcription error: {str(e)}") from e
+        print(f"Transcription: {text}")
+        return text
+    
+    def _record_and_route(self, duration):
+        """Record one utterance and transcribe it (runs in separate thread)"""
+        try:
+            self.transcription_ready.emit(self.listen(duration))
+        except ListenError as e:
+            self.error_occurred.emit(str(e))
+    
+    def transcribe(self, audio, cancel_event=None):
+        """
+        Hedged transcription of float32 audio (blocking)
+        
+        The cloud request starts immediately; local Whisper starts if the
+        cloud has not answered within hedge_after seconds, or as soon as it
+        fails. The loser is cancelled.
+        
+        Args:
+            audio: float32 mono audio
+            cancel_event: Optional threading.Event; setting it cancels both paths
+        Returns: transcribed text
+        Raises: TranscriptionCancelled once cancel_event is set
+        """
+        results = queue.Queue()
+        # Shared by both paths: set here once a path wins or the caller
+        # cancels; the caller's own event is only read
+        cancel = threading.Event()
+        start = time.monotonic()
+        running = set()
+        errors = {}
+        
+        def run(path, engine, engine_audio):
+            try:
+                with tracer.span(f"transcribe {path}", cat="stt"):
+                    text = engine.transcribe(engine_audio, cancel_event=cancel)
+                latency = time.monotonic() - start
+                # Losers that still finish count towards their path's distribution
+                self._record_latency(path, latency)
+                results.put((path, text, None, latency))
+            except Exception as e:
+                results.put((path, None, e, time.monotonic() - start))
+        
+        def launch(path):
+            if path == "cloud":
+                pcm16 = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16)
+                args = (path, self.api, pcm16)
+            else:
+                args = (path, self.local, audio)
+            running.add(path)
+            thread = threading.Thread(target=run, args=args)
+            thread.daemon = True
+            thread.start()
+        
+        if self.network_healthy():
+            launch("cloud")
+        else:
+            print("Network unhealthy, transcribing locally")
+            launch("local")
+        
+        while running:
+            if cancel_event is not None and cancel_event.is_set():
+                # Neither a path failure nor a reason to hedge
+                cancel.set()
+                raise TranscriptionCancelled()
+            
+            hedge_pending = "local" not in running and "local" not in errors
+            timeout = 0.1 if cancel_event is not None else None  # Poll the caller's event
+            if hedge_pending:
+                remaining = max(0.0, self.hedge_after - (time.monotonic() - start))
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            
+            try:
+                path, text, error, latency = results.get(timeout=timeout)
+            except queue.Empty:
+                if hedge_pending and time.monotonic() - start >= self.hedge_after:
+                    print(f"Cloud slower than {self.hedge_after}s, starting local hedge")
+                    self._count_hedge()
+                    launch("local")
+                continue
+            
+            running.discard(path)
+            if isinstance(error, TranscriptionCancelled):
+                continue  # Stopped by our own cancel, not a failure of the path
+            self._record_outcome(path, error)
+            
+            if error is None:
+                cancel.set()
+                self._record_win(path, latency)
+                return text
+            
+            errors[path] = error
+            print(f"{path} transcription failed: {error}")
+            if path == "cloud" and "local" not in running and "local" not in errors:
+                self._count_hedge()
+                launch("local")
+        
+        raise RuntimeError("; ".join(f"{path}: {error}" for path, error in errors.items()))
+    
+    def _count_hedge(self):
+        with self._stats_lock:
+            self.hedges_started += 1
+    
+    def _record_outcome(self, path, error):
+        """Track cloud health from consecutive failures"""
+        if path != "cloud":
+            return
+        with self._stats_lock:
+            if error is None:
+                self.cloud_failures = 0
+                return
+            self.cloud_failures += 1
+            if self.cloud_failures >= self.failure_threshold:
+                self.unhealthy_until = time.monotonic() + self.unhealthy_cooldown
+                self.cloud_failures = 0
+                print(f"⚠ Cloud STT unhealthy, local-only for {self.unhealthy_cooldown:.0f}s")
+    
+    def _record_latency(self, path, latency):
+        with self._stats_lock:
+            self.latencies[path].append(latency)
+    
+    def _record_win(self, path, latency):
+        """Record the winning path"""
+        with self._stats_lock:
+            self.wins[path] += 1
+        print(f"✓ {path} won in {latency:.2f}s")
+        self.path_won.emit(path, latency)
+    
+    def stats(self):
+        """
+        Get routing statistics
+        Returns: {"wins", "hedges_started", "cloud_healthy", "latency": {path: {p50, p90, p99}}}
+        """
+        with self._stats_lock:
+            latency = {
+                path: {
+                    "count": len(samples),
+                    "p50": percentile(list(samples), 0.50),
+                    "p90": percentile(list(samples), 0.90),
+                    "p99": percentile(list(samples), 0.99),
+                }
+                for path, samples in self.latencies.items()
+            }
+            return {
+                "wins": dict(self.wins),
+                "hedges_started": self.hedges_started,
+                "cloud_healthy": self.network_healthy(),
+                "latency": latency,
+            }
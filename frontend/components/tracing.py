@@ -0,0 +1,157 @@
+"""
+Tracing for MAYA
+Spans across the voice turn and face auth pipelines, written as Chrome
+trace_event JSON that opens in Perfetto (ui.perfetto.dev) or chrome://tracing
+
+Tracing is off unless enabled (python maya/main.py --trace). While off,
+span() returns one shared no-op context manager, so instrumented code
+pays a single flag check per span.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class _NullSpan:
+    """Shared span used while tracing is off"""
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+    
+    def annotate(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """One complete ("X") event, timed on the thread that entered it"""
+    
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+    
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+    
+    def __enter__(self):
+        self.start = self.tracer.now()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, cat=self.cat, **self.args)
+        return False
+    
+    def annotate(self, **args):
+        """Attach arguments known only inside the span"""
+        self.args.update(args)
+
+
+class Tracer:
+    """Process-wide collector of trace events (timestamps in microseconds)"""
+    
+    def __init__(self, max_events=200000):
+        """
+        Initialize tracer (disabled)
+        
+        Args:
+            max_events: Events kept; the oldest are dropped beyond this
+        """
+        self.enabled = False
+        self.path = None
+        self.pid = os.getpid()
+        self._events = deque(maxlen=max_events)  # Appends are thread-safe
+        self._threads = {}  # Thread id -> name, for the metadata events
+        self._origin = time.perf_counter_ns()
+    
+    def enable(self, path):
+        """Start recording; export() writes to path"""
+        self.path = path
+        self._origin = time.perf_counter_ns()
+        self.enabled = True
+        print(f"✓ Tracing to {path}")
+    
+    def now(self):
+        """Current trace timestamp"""
+        return (time.perf_counter_ns() - self._origin) // 1000
+    
+    def _tid(self):
+        thread = threading.current_thread()
+        tid = thread.ident
+        if tid not in self._threads:
+            self._threads[tid] = thread.name
+        return tid
+    
+    def span(self, name, cat="maya", **args):
+        """Context manager timing a block on the current thread"""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name, cat, args)
+    
+    def complete(self, name, start, end=None, cat="maya", **args):
+        """Record a span measured by hand, e.g. a queue wait that began on another thread"""
+        if not self.enabled:
+            return
+        end = self.now() if end is None else end
+        self._events.append({
+            "name": name, "cat": cat, "ph": "X", "ts": start, "dur": max(0, end - start),
+            "pid": self.pid, "tid": self._tid(), "args": args
+        })
+    
+    def begin(self, name, key, cat="turn", **args):
+        """Open an async span that may end on another thread"""
+        self._async("b", name, key, cat, args)
+    
+    def end(self, name, key, cat="turn", **args):
+        """Close the async span opened with the same name and key"""
+        self._async("e", name, key, cat, args)
+    
+    def _async(self, phase, name, key, cat, args):
+        if not self.enabled:
+            return
+        self._events.append({
+            "name": name, "cat": cat, "ph": phase, "id": str(key), "ts": self.now(),
+            "pid": self.pid, "tid": self._tid(), "args": args
+        })
+    
+    def instant(self, name, cat="maya", **args):
+        """Record a point in time, e.g. the first streamed token"""
+        if not self.enabled:
+            return
+        self._events.append({
+            "name": name, "cat": cat, "ph": "i", "s": "t", "ts": self.now(),
+            "pid": self.pid, "tid": self._tid(), "args": args
+        })
+    
+    def export(self, path=None):
+        """
+        Write the recorded events as a Chrome trace
+        Returns: path written, or None when nothing was recorded
+        """
+        path = path or self.path
+        if path is None or not self._events:
+            return None
+        
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+            for tid, name in list(self._threads.items())
+        ]
+        events.append({"name": "process_name", "ph": "M", "pid": self.pid, "args": {"name": "MAYA"}})
+        events.extend(list(self._events))
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        print(f"✓ Trace written to {path} ({len(events)} events)")
+        return path
+
+
+tracer = Tracer()
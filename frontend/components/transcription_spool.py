@@ -0,0 +1,206 @@
+"""
+Transcription Spool for MAYA
+Durable on-disk queue of utterances that could not be transcribed while
+the API was unreachable; flushed in parallel batches on reconnect
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+class SpoolEntry:
+    """One spooled utterance: <seq>_<captured ms>_<language>.<ext>"""
+    
+    def __init__(self, path):
+        self.path = path
+        seq, captured_ms, language = path.stem.split("_", 2)
+        self.seq = int(seq)
+        self.captured_at = int(captured_ms) / 1000
+        self.language = language
+        self.extension = path.suffix.lstrip(".")
+    
+    @property
+    def result_path(self):
+        """Transcript written once the upload succeeds"""
+        return self.path.with_suffix(".txt")
+
+
+class TranscriptionSpool:
+    """Bounded, ordered, crash-safe spool of pending utterances"""
+    
+    def __init__(self, spool_path=None, max_mb=50, batch_size=4, retry_interval=15.0):
+        """
+        Initialize spool
+        
+        Args:
+            spool_path: Directory for spooled audio (default ~/.maya/spool)
+            max_mb: Size bound; the oldest utterances are dropped beyond it
+            batch_size: Utterances uploaded in parallel per flush batch
+            retry_interval: Seconds between connectivity probes while non-empty
+        """
+        self.spool_path = Path(spool_path) if spool_path else Path.home() / ".maya" / "spool"
+        self.spool_path.mkdir(parents=True, exist_ok=True)
+        os.chmod(self.spool_path, 0o700)
+        
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.batch_size = batch_size
+        self.retry_interval = retry_interval
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher = None
+        self._next_seq = self._highest_seq() + 1
+    
+    def _highest_seq(self):
+        entries = self._entries()
+        return entries[-1].seq if entries else 0
+    
+    def _entries(self):
+        """All spooled utterances (with or without transcript), oldest first"""
+        entries = []
+        for path in self.spool_path.iterdir():
+            if path.suffix == ".txt" or path.name.startswith("."):
+                continue
+            try:
+                entries.append(SpoolEntry(path))
+            except ValueError:
+                continue  # Not a spool file
+        return sorted(entries, key=lambda entry: entry.seq)
+    
+    def pending(self):
+        """Utterances still waiting for a transcript, oldest first"""
+        return [entry for entry in self._entries() if not entry.result_path.exists()]
+    
+    def __len__(self):
+        return len(self._entries())
+    
+    def add(self, payload, extension, language, captured_at=None):
+        """
+        Spool one encoded utterance
+        
+        Args:
+            payload: Encoded audio bytes (FLAC/Opus/WAV)
+            extension: File extension of the encoding
+            language: Language code used for the request
+            captured_at: Capture time (epoch seconds), default now
+        """
+        captured_at = captured_at or time.time()
+        with self._lock:
+            seq = self._next_seq
+            self._next_seq += 1
+            name = f"{seq:012d}_{int(captured_at * 1000)}_{language}.{extension}"
+            
+            # Write to a temp name first so a crash never leaves a partial entry
+            temp_path = self.spool_path / f".{name}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(payload)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.spool_path / name)
+            
+            self._enforce_bound()
+        
+        print(f"✓ Spooled utterance {seq} ({len(payload)} bytes, {len(self)} pending)")
+        self._wake.set()
+        return seq
+    
+    def _enforce_bound(self):
+        """Drop the oldest utterances while the spool exceeds its size bound"""
+        entries = self._entries()
+        total = sum(entry.path.stat().st_size for entry in entries)
+        while entries and total > self.max_bytes:
+            oldest = entries.pop(0)
+            total -= oldest.path.stat().st_size
+            oldest.path.unlink(missing_ok=True)
+            oldest.result_path.unlink(missing_ok=True)
+            print(f"⚠ Spool full, dropped utterance {oldest.seq}")
+    
+    def start_flusher(self, upload, probe, deliver):
+        """
+        Start the background flusher
+        
+        Args:
+            upload: upload(entry, payload) -> text; raises on failure.
+                Raise ConnectionError/TimeoutError for retryable failures;
+                any other exception discards the utterance.
+            probe: probe() -> bool, True when the API is reachable
+            deliver: deliver(text, captured_at) called in capture order
+        """
+        if self._flusher is not None:
+            return
+        
+        def loop():
+            while True:
+                self._wake.wait(self.retry_interval)
+                self._wake.clear()
+                try:
+                    if self.pending() and probe():
+                        self.flush(upload)
+                    self.reconcile(deliver)
+                except Exception as e:
+                    print(f"Spool flush error: {e}")
+        
+        self._flusher = threading.Thread(target=loop)
+        self._flusher.daemon = True
+        self._flusher.start()
+        self._wake.set()  # Deliver anything left from a previous session
+    
+    def notify_online(self):
+        """Hint that the API just answered, so flushing can start now"""
+        if self.pending():
+            self._wake.set()
+    
+    def flush(self, upload):
+        """
+        Upload pending utterances in parallel batches, oldest first
+        
+        Stops at the first batch with a retryable failure.
+        Returns: number of utterances transcribed
+        """
+        transcribed = 0
+        
+        with ThreadPoolExecutor(max_workers=self.batch_size) as pool:
+            while True:
+                batch = self.pending()[:self.batch_size]
+                if not batch:
+                    return transcribed
+                
+                outcomes = list(pool.map(lambda entry: self._upload_entry(upload, entry), batch))
+                transcribed += sum(1 for outcome in outcomes if outcome == "done")
+                if "retry" in outcomes:
+                    print(f"Spool flush paused, {len(self.pending())} still pending")
+                    return transcribed
+    
+    def _upload_entry(self, upload, entry):
+        """Upload one entry and persist its transcript next to the audio"""
+        try:
+            text = upload(entry, entry.path.read_bytes())
+        except (ConnectionError, TimeoutError, OSError):
+            return "retry"
+        except Exception as e:
+            print(f"⚠ Discarding spooled utterance {entry.seq}: {e}")
+            text = None
+        
+        temp_path = entry.result_path.with_name(f".{entry.result_path.name}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write("\0" if text is None else text)  # NUL marks a discarded entry
+        os.replace(temp_path, entry.result_path)
+        return "done" if text is not None else "discarded"
+    
+    def reconcile(self, deliver):
+        """
+        Deliver transcripts strictly in capture order
+        
+        An utterance still pending blocks everything recorded after it, so
+        late results never appear out of order.
+        """
+        with self._lock:
+            for entry in self._entries():
+                if not entry.result_path.exists():
+                    return
+                text = entry.result_path.read_text(encoding='utf-8')
+                if text != "\0":
+                    deliver(text, entry.captured_at)
+                entry.path.unlink(missing_ok=True)
+                entry.result_path.unlink(missing_ok=True)
@@ -0,0 +1,117 @@
+"""
+UI Dispatcher for MAYA
+Marshals UI updates from any thread onto the GUI thread and applies them
+at most once per display frame
+
+Within one frame, state updates to the same key keep only the latest
+value, and text appended to the same key is joined into a single call.
+Plain calls run in order and are never merged.
+"""
+
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+from .tracing import tracer
+
+STATE = "state"
+TEXT = "text"
+CALL = "call"
+
+
+class UIDispatcher(QObject):
+    """Frame-rate coalescing queue of GUI updates (create on the GUI thread)"""
+    
+    _wake = pyqtSignal()  # Queued to the GUI thread when the first update arrives
+    
+    def __init__(self, interval_ms=None, parent=None):
+        """
+        Initialize dispatcher
+        
+        Args:
+            interval_ms: Tick length; defaults to one frame of the primary screen
+            parent: Owning QObject
+        """
+        super().__init__(parent)
+        if interval_ms is None:
+            from PyQt6.QtGui import QGuiApplication
+            screen = QGuiApplication.primaryScreen()
+            rate = screen.refreshRate() if screen else 60.0
+            interval_ms = max(1, int(1000 / (rate or 60.0)))
+        self._lock = threading.Lock()
+        self._pending = OrderedDict()  # key -> [kind, callback, value]
+        self._calls = 0  # Sequence for unique CALL keys
+        self._scheduled = False
+        self.received = {STATE: 0, TEXT: 0, CALL: 0}
+        self.applied = {STATE: 0, TEXT: 0, CALL: 0}
+        self.frames = 0
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.flush)
+        self._wake.connect(self._timer.start)
+    
+    def set_state(self, key, callback, value):
+        """Apply callback(value) next frame; a later value for key replaces this one"""
+        with self._lock:
+            self.received[STATE] += 1
+            self._pending[key] = [STATE, callback, value]
+            self._pending.move_to_end(key)
+            self._schedule()
+    
+    def append_text(self, key, callback, text):
+        """Apply callback(text) next frame, joined with other text queued for key"""
+        with self._lock:
+            self.received[TEXT] += 1
+            entry = self._pending.get(key)
+            if entry is not None and entry[0] == TEXT:
+                entry[2].append(text)
+            else:
+                self._pending[key] = [TEXT, callback, [text]]
+            self._schedule()
+    
+    def call(self, callback, *args):
+        """Run callback(*args) next frame, in order with the other updates"""
+        with self._lock:
+            self.received[CALL] += 1
+            self._calls += 1
+            self._pending[(CALL, self._calls)] = [CALL, callback, args]
+            self._schedule()
+    
+    def _schedule(self):
+        """Wake the GUI thread once per frame (lock held)"""
+        if not self._scheduled:
+            self._scheduled = True
+            self._wake.emit()
+    
+    def flush(self):
+        """Apply everything queued (GUI thread)"""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+            self._scheduled = False
+        if not pending:
+            return
+        
+        self.frames += 1
+        with tracer.span("ui flush", cat="render", updates=len(pending)):
+            for kind, callback, value in pending.values():
+                self.applied[kind] += 1
+                try:
+                    if kind == TEXT:
+                        callback("".join(value))
+                    elif kind == CALL:
+                        callback(*value)
+                    else:
+                        callback(value)
+                except Exception as e:
+                    print(f"UI update failed: {e}")
+    
+    def summary(self):
+        """Received versus applied updates per kind"""
+        received = sum(self.received.values())
+        applied = sum(self.applied.values())
+        parts = [f"{kind} {self.received[kind]}→{self.applied[kind]}" for kind in self.received]
+        saved = 1 - applied / received if received else 0.0
+        return (f"UI updates: {received} received, {applied} applied in {self.frames} frames "
+                f"({saved:.0%} coalesced; {', '.join(parts)})")
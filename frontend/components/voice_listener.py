@@ -2,13 +2,96 @@
 Voice Listener Component for MAYA
 Handles speech-to-text using OpenAI Whisper
 Supports English and Bangla languages
+
+whisper and torch are imported on first model load, so building the
+listener (and the window around it) stays cheap
 """
-import whisper
-import sounddevice as sd
-import numpy as np
-import queue
 import threading
+import time
+from pathlib import Path
 from PyQt6.QtCore import QObject, pyqtSignal
+from .audio_capture import ListenError, MicrophoneCapture
+from .tracing import tracer
+from .stt_model_manager import STTModelManager
+
+
+# Named decoding profiles passed straight through to model.transcribe().
+# "interactive" decodes greedily at a single temperature with a hard token
+# cap, so a noisy window can never trigger fallback re-decodes: its worst
+# case is one pass of at most sample_len tokens.
+DECODING_PROFILES = {
+    "interactive": {
+        "beam_size": None,
+        "best_of": None,
+        "temperature": (0.0,),
+        "without_timestamps": True,
+        "sample_len": 64,
+        "condition_on_previous_text": False,
+    },
+    "balanced": {
+        "beam_size": None,
+        "best_of": 2,
+        "temperature": (0.0, 0.4, 0.8),
+        "without_timestamps": True,
+        "sample_len": 128,
+        "condition_on_previous_text": False,
+    },
+    "accurate": {
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "without_timestamps": False,
+        "sample_len": None,
+        "condition_on_previous_text": True,
+    },
+}
+
+DEFAULT_DECODING_PROFILE = "balanced"
+
+# Languages the assistant supports, and the sizes that ship an English-only
+# (".en") checkpoint; large/turbo are multilingual only
+SUPPORTED_LANGUAGES = ("en", "bn")
+ENGLISH_ONLY_SIZES = ("tiny", "base", "small", "medium")
+
+
+def decoding_options(profile):
+    """
+    Build model.transcribe() keyword arguments for a decoding profile
+    
+    Args:
+        profile: Name from DECODING_PROFILES
+    Returns: dict of options (unset values omitted so Whisper defaults apply)
+    """
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile: {profile}")
+    return {k: v for k, v in DECODING_PROFILES[profile].items() if v is not None}
+
+
+def quantize_whisper_model(model):
+    """
+    Apply PyTorch dynamic int8 quantization to Whisper's linear layers
+    
+    Whisper wraps nn.Linear in its own subclass, which the quantization
+    mappings do not match, so the layers are downcast to plain nn.Linear
+    first (the subclass only adds a dtype cast, a no-op for float32 on CPU).
+    
+    Args:
+        model: Whisper model loaded on CPU
+    Returns: quantized model in eval mode
+    """
+    import torch
+    
+    model = model.cpu().float().eval()
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.ao.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+class TranscriptionCancelled(Exception):
+    """Raised inside a decode that was cancelled by its caller"""
 
 
 class VoiceListener(QObject):
@@ -19,34 +102,177 @@ class VoiceListener(QObject):
     listening_started = pyqtSignal()
     listening_stopped = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    model_ready = pyqtSignal(str)  # Emits model name once loaded
+    rtf_measured = pyqtSignal(float)  # Real-time factor of each transcription
     
-    def __init__(self, model_size="base", language="en"):
+    def __init__(self, model_size="base", language="en", quantize=False, cache_dir=None,
+                 decoding_profile=DEFAULT_DECODING_PROFILE, code_switching=False,
+                 preload_languages=(), model_manager=None, quality_controller=None,
+                 resource_governor=None):
         """
         Initialize voice listener
         
         Args:
             model_size: Whisper model size (tiny, base, small, medium, large)
             language: Language code ('en' for English, 'bn' for Bangla)
+            quantize: Apply dynamic int8 quantization to the linear layers (CPU only)
+            cache_dir: Directory for cached quantized weights (default ~/.maya/models)
+            decoding_profile: 'interactive', 'balanced' or 'accurate'
+            code_switching: Detect the language of each utterance instead of
+                trusting the language toggle (keeps the multilingual model loaded)
+            preload_languages: Languages whose models load alongside the
+                current one, so switching to them is instant
+            model_manager: Shared STTModelManager owning the loaded models
+                (a private, unbudgeted manager is created if omitted)
+            quality_controller: Optional AdaptiveQualityController that picks
+                the model size and decoding profile from the measured RTF
+            resource_governor: Optional ResourceGovernor whose PyTorch thread
+                count is applied before each load and decode
         """
         super().__init__()
         self.model_size = model_size
         self.language = language  # 'en' or 'bn'
-        self.model = None
+        self.quantize = quantize
+        self.cache_dir = Path(cache_dir) if cache_dir else Path.home() / ".maya" / "models"
+        self.code_switching = code_switching
+        self.preload_languages = tuple(preload_languages)
+        self.model_manager = model_manager or STTModelManager(budget_mb=0, idle_timeout=0)
+        self.quality_controller = quality_controller
+        self.resource_governor = resource_governor
+        self.last_rtf = None
+        self._load_requested = False
+        self.decoding_profile = DEFAULT_DECODING_PROFILE
+        self.set_decoding_profile(decoding_profile)
         self.sample_rate = 16000
-        self.audio_queue = queue.Queue()
-        self.is_listening = False
-        self.is_recording = False
-        self.stream = None
+        self.capture = MicrophoneCapture(self.sample_rate)
+        self.is_listening = False  # UI state, only touched from the GUI thread
         
+    @property
+    def is_recording(self):
+        """True while the microphone is (about to be) recording"""
+        return self.capture.is_recording
+    
+    @property
+    def model(self):
+        """Loaded model for the current language, or None while it loads"""
+        return self.model_manager.get(self._model_key(self.model_name_for(self.language)))
+    
+    def _model_key(self, model_name):
+        """Key identifying a model variant in the model manager"""
+        return f"whisper-{model_name}-int8" if self.quantize else f"whisper-{model_name}"
+    
+    def is_model_loaded(self, model_name=None):
+        """Check if a model (default: the one for the current language) is resident"""
+        model_name = model_name or self.model_name_for(self.language)
+        return self.model_manager.is_loaded(self._model_key(model_name))
+    
+    def model_name_for(self, language, model_size=None):
+        """
+        Route a language to a Whisper checkpoint
+        
+        English uses the faster, more accurate English-only variant where
+        one exists; every other language uses the multilingual model.
+        """
+        model_size = model_size or self.model_size
+        if language == "en" and model_size in ENGLISH_ONLY_SIZES:
+            return f"{model_size}.en"
+        return model_size
+    
     def load_model(self):
         """Load Whisper model (call this in a separate thread)"""
+        self._load_requested = True
         try:
-            print(f"Loading Whisper {self.model_size} model...")
-            self.model = whisper.load_model(self.model_size)
+            self._ensure_model(self.model_name_for(self.language))
+            if self.code_switching:
+                # Language detection needs the multilingual model
+                self._ensure_model(self.model_size)
+            for language in self.preload_languages:
+                self._ensure_model(self.model_name_for(language))
             print("Model loaded successfully!")
         except Exception as e:
             self.error_occurred.emit(f"Failed to load model: {str(e)}")
     
+    def warm_up(self):
+        """Reload the current language's model in the background if it was unloaded"""
+        self._load_requested = True
+        self._load_model_in_background(self.model_name_for(self.language))
+        if self.code_switching:
+            self._load_model_in_background(self.model_size)
+    
+    def _ensure_model(self, model_name):
+        """Load a model through the manager; concurrent callers share one load"""
+        key = self._model_key(model_name)
+        if self.model_manager.is_loaded(key):
+            return self.model_manager.get(key)
+        
+        model = self.model_manager.load(key, lambda: self._load_weights(model_name))
+        self.model_ready.emit(model_name)
+        return model
+    
+    def _load_weights(self, model_name):
+        """Load Whisper weights from disk (float32 or cached int8)"""
+        import whisper
+        
+        if self.resource_governor is not None:
+            self.resource_governor.apply_stt_threads()
+        if self.quantize:
+            return self._load_quantized_model(model_name)
+        print(f"Loading Whisper {model_name} model...")
+        return whisper.load_model(model_name)
+    
+    def _load_model_in_background(self, model_name):
+        """Start loading a model without blocking the caller"""
+        if self.is_model_loaded(model_name):
+            return
+        
+        def load():
+            try:
+                self._ensure_model(model_name)
+                print(f"✓ Whisper {model_name} ready")
+            except Exception as e:
+                self.error_occurred.emit(f"Failed to load model: {str(e)}")
+        
+        thread = threading.Thread(target=load)
+        thread.daemon = True
+        thread.start()
+    
+    def _quantized_cache_path(self, model_name):
+        """Cache file for a quantized model, keyed by torch version"""
+        import torch
+        return self.cache_dir / f"whisper-{model_name}-int8-torch{torch.__version__}.pt"
+    
+    def _load_quantized_model(self, model_name):
+        """
+        Load an int8 dynamically quantized Whisper model
+        
+        Reuses the on-disk cache when present, otherwise quantizes the
+        float32 model and writes the result to the cache.
+        """
+        import torch
+        import whisper
+        
+        cache_file = self._quantized_cache_path(model_name)
+        
+        if cache_file.exists():
+            try:
+                model = torch.load(cache_file, map_location="cpu", weights_only=False)
+                print(f"✓ Loaded quantized Whisper {model_name} from {cache_file}")
+                return model
+            except Exception as e:
+                print(f"Quantized cache unreadable, rebuilding: {e}")
+        
+        print(f"Loading Whisper {model_name} model for int8 quantization...")
+        model = quantize_whisper_model(whisper.load_model(model_name, device="cpu"))
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            torch.save(model, cache_file)
+            print(f"✓ Cached quantized model to {cache_file}")
+        except Exception as e:
+            print(f"Failed to cache quantized model: {e}")
+        
+        return model
+    
     def set_language(self, language_code):
         """
         Change language
@@ -55,13 +281,48 @@ class VoiceListener(QObject):
             language_code: 'en' for English, 'bn' for Bangla
         """
         self.language = language_code
+        
+        # Warm the routed model in the background; until it is ready,
+        # _select_model falls back to the multilingual model
+        if self._load_requested:
+            self._load_model_in_background(self.model_name_for(language_code))
     
-    def audio_callback(self, indata, frames, time, status):
-        """Callback for audio stream"""
-        if status:
-            print(f"Audio status: {status}")
-        if self.is_recording:
-            self.audio_queue.put(indata.copy())
+    def set_model_size(self, model_size):
+        """
+        Switch to another Whisper model size
+        
+        The new model loads in the background; the current one keeps
+        serving until it is ready, then the idle manager reclaims it.
+        
+        Args:
+            model_size: Whisper model size (tiny, base, small, medium, large)
+        """
+        if model_size == self.model_size:
+            return
+        
+        def switch():
+            try:
+                self._ensure_model(self.model_name_for(self.language, model_size))
+                self.model_size = model_size
+                print(f"✓ Switched Whisper model to {model_size}")
+            except Exception as e:
+                self.error_occurred.emit(f"Failed to load model: {str(e)}")
+        
+        thread = threading.Thread(target=switch)
+        thread.daemon = True
+        thread.start()
+    
+    def set_decoding_profile(self, profile):
+        """
+        Change decoding profile
+        
+        Args:
+            profile: 'interactive', 'balanced' or 'accurate'
+        """
+        if profile not in DECODING_PROFILES:
+            print(f"⚠ Unknown decoding profile '{profile}', keeping '{self.decoding_profile}'")
+            return
+        self.decoding_profile = profile
     
     def start_listening(self, duration=5):
         """
@@ -70,91 +331,198 @@ class VoiceListener(QObject):
         Args:
             duration: Recording duration in seconds
         """
-        if self.model is None:
-            self.error_occurred.emit("Model not loaded. Please wait...")
+        if not self.begin_listening():
             return
         
-        self.is_listening = True
-        self.is_recording = True
-        self.listening_started.emit()
-        
         # Start recording in a separate thread
         thread = threading.Thread(target=self._record_audio, args=(duration,))
         thread.daemon = True
         thread.start()
     
-    def _record_audio(self, duration):
-        """Record audio (runs in separate thread)"""
-        audio_data = []
+    def begin_listening(self):
+        """
+        Arm the microphone for listen() (GUI thread)
+        Returns: False, after reporting why, if no model is ready
+        """
+        if not (self.is_model_loaded() or self.is_model_loaded(self.model_size)):
+            # Models may have been unloaded while idle: reload and ask to wait
+            self.warm_up()
+            self.error_occurred.emit("Model not loaded. Please wait...")
+            return False
         
+        self.is_listening = True
+        self.capture.arm()
+        self.listening_started.emit()
+        return True
+    
+    def record(self, duration):
+        """
+        Record from the microphone (blocking)
+        
+        Args:
+            duration: Recording duration in seconds
+        Returns: float32 mono audio (empty if nothing was captured)
+        """
+        return self.capture.record(duration)
+    
+    def listen(self, duration, cancel_event=None):
+        """
+        Record one utterance and transcribe it (blocking; call begin_listening first)
+        
+        Args:
+            duration: Recording duration in seconds
+            cancel_event: Optional threading.Event that aborts the decode
+        Returns: transcribed text
+        Raises: ListenError (also when cancelled)
+        """
         try:
-            # Clear queue
-            while not self.audio_queue.empty():
-                self.audio_queue.get()
-            
-            with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype=np.float32,
-                callback=self.audio_callback
-            ):
-                print(f"Recording for {duration} seconds...")
-                # Calculate number of chunks based on blocksize
-                chunks = int(self.sample_rate * duration / 1024)
-                
-                for _ in range(chunks):
-                    if not self.is_recording:
-                        break
-                    try:
-                        data = self.audio_queue.get(timeout=1)
-                        audio_data.append(data)
-                    except queue.Empty:
-                        continue
-            
-            self.is_recording = False
-            self.listening_stopped.emit()
-            
-            if audio_data:
-                # Combine audio chunks
-                audio = np.concatenate(audio_data, axis=0).flatten()
-                
-                # Transcribe in separate thread
-                transcribe_thread = threading.Thread(
-                    target=self._transcribe_audio, 
-                    args=(audio,)
-                )
-                transcribe_thread.daemon = True
-                transcribe_thread.start()
-            else:
-                self.error_occurred.emit("No audio recorded")
-                
+            with tracer.span("mic capture", cat="stt", duration=duration):
+                audio = self.record(duration)
         except Exception as e:
-            self.is_recording = False
+            raise ListenError(f"Recording error: {str(e)}") from e
+        finally:
             self.listening_stopped.emit()
-            self.error_occurred.emit(f"Recording error: {str(e)}")
-    
-    def _transcribe_audio(self, audio):
-        """Transcribe audio to text (runs in separate thread)"""
+        
+        if not audio.size:
+            raise ListenError("No audio recorded")
+        if cancel_event is not None and cancel_event.is_set():
+            raise ListenError("Transcription cancelled")
+        
         try:
             print("Transcribing audio...")
+            with tracer.span("transcribe", cat="stt", path="whisper"):
+                text = self.transcribe(audio, cancel_event)
+        except TranscriptionCancelled as e:
+            raise ListenError("Transcription cancelled") from e
+        except Exception as e:
+            raise ListenError(f"Transcription error: {str(e)}") from e
+        print(f"Transcription: {text}")
+        return text
+    
+    def _record_audio(self, duration):
+        """Record and transcribe one utterance (runs in separate thread)"""
+        try:
+            self.transcription_ready.emit(self.listen(duration))
+        except ListenError as e:
+            self.error_occurred.emit(str(e))
+    
+    def transcribe(self, audio, cancel_event=None, language=None):
+        """
+        Transcribe audio to text (blocking; safe to call from several threads)
+        
+        Decodes on one model run one at a time; callers queue for it.
+        
+        Args:
+            audio: float32 mono audio at self.sample_rate
+            cancel_event: Optional threading.Event; setting it aborts the
+                decode at the next decoder step
+            language: Language of this utterance (default: self.language),
+                so callers sharing the listener need not switch it
+        Returns: transcribed text
+        """
+        model_name, language = self._select_model(audio, language)
+        
+        # Pin the model so the manager cannot unload it mid-decode, and
+        # hold its decode lock
+        with self.model_manager.use(self._model_key(model_name), exclusive=True) as model:
+            if model is None:
+                raise RuntimeError(f"Whisper model {model_name} was unloaded")
+            if cancel_event is not None and cancel_event.is_set():
+                raise TranscriptionCancelled()  # Cancelled while queued for the model
             
-            # Set language for transcription
-            result = self.model.transcribe(
-                audio, 
-                language=self.language,
-                fp16=False
-            )
-            
-            text = result["text"].strip()
-            print(f"Transcription: {text}")
+            hook = None
+            if cancel_event is not None:
+                hook = self._install_cancel_hook(model, cancel_event)
             
-            # Emit result
-            self.transcription_ready.emit(text)
+            if self.resource_governor is not None:
+                self.resource_governor.apply_stt_threads()
             
-        except Exception as e:
-            self.error_occurred.emit(f"Transcription error: {str(e)}")
+            try:
+                # Set language and decoding profile for transcription
+                start = time.perf_counter()
+                result = model.transcribe(
+                    audio, 
+                    language=language,
+                    fp16=False,
+                    **decoding_options(self.decoding_profile)
+                )
+                decode_seconds = time.perf_counter() - start
+            finally:
+                if hook is not None:
+                    hook.remove()
+        
+        self._record_rtf(decode_seconds, len(audio) / self.sample_rate)
+        return result["text"].strip()
+    
+    def _install_cancel_hook(self, model, cancel_event):
+        """
+        Abort this thread's decode when cancel_event is set
+        
+        The hook is shared by every user of the model, so it only fires on
+        the thread that installed it.
+        """
+        owner = threading.get_ident()
+        
+        def check_cancelled(module, args):
+            if cancel_event.is_set() and threading.get_ident() == owner:
+                raise TranscriptionCancelled()
+        
+        return model.decoder.register_forward_pre_hook(check_cancelled)
+    
+    def _record_rtf(self, decode_seconds, audio_seconds):
+        """Publish the real-time factor and let the quality controller react"""
+        if audio_seconds <= 0:
+            return
+        
+        self.last_rtf = decode_seconds / audio_seconds
+        print(f"STT RTF: {self.last_rtf:.2f} ({decode_seconds:.2f}s for {audio_seconds:.1f}s)")
+        self.rtf_measured.emit(self.last_rtf)
+        
+        if self.quality_controller is None:
+            return
+        
+        new_tier = self.quality_controller.record(self.last_rtf)
+        if new_tier is not None:
+            model_size, profile = new_tier
+            self.set_decoding_profile(profile)
+            self.set_model_size(model_size)
+    
+    def _select_model(self, audio, language=None):
+        """
+        Pick the model and language for one utterance
+        Returns: (model name, language code)
+        """
+        language = language or self.language
+        
+        if self.code_switching:
+            with self.model_manager.use(self._model_key(self.model_size), exclusive=True) as multilingual:
+                if multilingual is not None:
+                    language = self._detect_language(multilingual, audio)
+        
+        model_name = self.model_name_for(language)
+        if self.is_model_loaded(model_name):
+            return model_name, language
+        
+        # Routed model still loading: the multilingual model covers every language
+        self._load_model_in_background(model_name)
+        if self.is_model_loaded(self.model_size):
+            return self.model_size, language
+        
+        raise RuntimeError(f"Whisper model for '{language}' is still loading")
+    
+    def _detect_language(self, model, audio):
+        """Detect the spoken language, restricted to the supported languages"""
+        import whisper
+        
+        mel = whisper.log_mel_spectrogram(
+            whisper.pad_or_trim(audio), model.dims.n_mels
+        ).to(model.device)
+        _, probs = model.detect_language(mel)
+        language = max(SUPPORTED_LANGUAGES, key=lambda code: probs.get(code, 0.0))
+        print(f"Detected language: {language}")
+        return language
     
     def stop_listening(self):
         """Stop recording"""
-        self.is_recording = False
+        self.capture.stop()
         self.is_listening = False
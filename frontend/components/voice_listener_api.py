@@ -4,14 +4,35 @@ Handles speech-to-text using OpenAI Whisper API
 Supports English and Bangla languages
 """
 import os
-import sounddevice as sd
+import io
+import time
+import random
 import numpy as np
-import queue
 import threading
-import tempfile
 import wave
+import httpx
 from PyQt6.QtCore import QObject, pyqtSignal
-from openai import OpenAI
+from openai import OpenAI, NOT_GIVEN
+from openai import APIConnectionError, RateLimitError, InternalServerError
+from .audio_capture import ListenError, MicrophoneCapture
+from .tracing import tracer
+from .voice_listener import TranscriptionCancelled
+
+try:
+    import soundfile as sf
+except ImportError:  # FLAC/Opus encoding is optional
+    sf = None
+
+
+# Transient failures worth retrying (timeouts are APIConnectionErrors)
+RETRYABLE_ERRORS = (APIConnectionError, RateLimitError, InternalServerError)
+
+# Upload encodings: (soundfile format, subtype, file extension, MIME type)
+AUDIO_ENCODINGS = {
+    "flac": ("FLAC", "PCM_16", "flac", "audio/flac"),
+    "opus": ("OGG", "OPUS", "ogg", "audio/ogg"),
+}
+SPOOL_MIME_TYPES = {"flac": "audio/flac", "ogg": "audio/ogg", "wav": "audio/wav"}
 
 
 class VoiceListenerAPI(QObject):
@@ -22,30 +43,82 @@ class VoiceListenerAPI(QObject):
     listening_started = pyqtSignal()
     listening_stopped = pyqtSignal()
     error_occurred = pyqtSignal(str)
+    late_transcription_ready = pyqtSignal(str, float)  # Spooled text, capture time
     
-    def __init__(self, api_key=None, language="en"):
+    def __init__(self, api_key=None, language="en", base_url=None, encoding="flac",
+                 request_deadline=10.0, max_retries=2, max_concurrent_uploads=2):
         """
         Initialize voice listener with API
         
         Args:
             api_key: OpenAI API key (or set OPENAI_API_KEY env variable)
             language: Language code ('en' for English, 'bn' for Bangla)
+            base_url: OpenAI-compatible endpoint (default: OPENAI_BASE_URL or api.openai.com)
+            encoding: Upload encoding: 'flac', 'opus' or 'wav' (FLAC/Opus need soundfile)
+            request_deadline: Seconds allowed per utterance, across all retries
+            max_retries: Retries after the first attempt for transient failures
+            max_concurrent_uploads: Uploads allowed in flight at once
         """
         super().__init__()
         self.language = language  # 'en' or 'bn'
         self.sample_rate = 16000
-        self.audio_queue = queue.Queue()
-        self.is_listening = False
-        self.is_recording = False
+        self.capture = MicrophoneCapture(self.sample_rate, dtype=np.int16)  # API prefers int16
+        self.is_listening = False  # UI state, only touched from the GUI thread
+        self.encoding = encoding
+        self.request_deadline = request_deadline
+        self.max_retries = max_retries
+        self.backoff_base = 0.25  # seconds
+        self.backoff_cap = 2.0  # seconds
+        self._upload_slots = threading.BoundedSemaphore(max_concurrent_uploads)
+        self.spool = None
         
-        # Initialize OpenAI client
+        if encoding in AUDIO_ENCODINGS and sf is None:
+            print(f"⚠ soundfile not installed, uploading WAV instead of {encoding}")
+            self.encoding = "wav"
+        
+        # Initialize OpenAI client on a keep-alive connection pool; retries
+        # are handled here so they share the per-utterance deadline
         try:
-            self.client = OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=max_concurrent_uploads,
+                    max_keepalive_connections=max_concurrent_uploads,
+                    keepalive_expiry=120
+                ),
+                timeout=httpx.Timeout(request_deadline, connect=3.0)
+            )
+            self.client = OpenAI(
+                api_key=api_key or os.getenv('OPENAI_API_KEY'),
+                base_url=base_url,
+                http_client=self.http_client,
+                max_retries=0
+            )
             print("OpenAI API client initialized successfully!")
         except Exception as e:
             self.error_occurred.emit(f"Failed to initialize OpenAI client: {str(e)}")
             self.client = None
     
+    def warm_connection(self):
+        """
+        Open a pooled connection ahead of the first upload
+        
+        Pays DNS and TLS setup up front instead of on the first utterance.
+        Any HTTP response counts; only connection errors are reported.
+        """
+        if self.client is None:
+            return
+        
+        def connect():
+            try:
+                self.http_client.head(str(self.client.base_url), timeout=5.0)
+                print("✓ API connection warmed")
+            except httpx.HTTPError as e:
+                print(f"API warm-up failed: {e}")
+        
+        thread = threading.Thread(target=connect)
+        thread.daemon = True
+        thread.start()
+    
     def set_language(self, language_code):
         """
         Change language
@@ -55,12 +128,9 @@ class VoiceListenerAPI(QObject):
         """
         self.language = language_code
     
-    def audio_callback(self, indata, frames, time, status):
-        """Callback for audio stream"""
-        if status:
-            print(f"Audio status: {status}")
-        if self.is_recording:
-            self.audio_queue.put(indata.copy())
+    @property
+    def is_recording(self):
+        return self.capture.is_recording
     
     def start_listening(self, duration=5):
         """
@@ -69,115 +139,201 @@ class VoiceListenerAPI(QObject):
         Args:
             duration: Recording duration in seconds
         """
-        if self.client is None:
-            self.error_occurred.emit("OpenAI API not initialized. Check your API key.")
+        if not self.begin_listening():
             return
         
-        self.is_listening = True
-        self.is_recording = True
-        self.listening_started.emit()
-        
         # Start recording in a separate thread
         thread = threading.Thread(target=self._record_audio, args=(duration,))
         thread.daemon = True
         thread.start()
     
+    def begin_listening(self):
+        """
+        Arm the microphone for listen() (GUI thread)
+        Returns: False, after reporting why, if the API client is missing
+        """
+        if self.client is None:
+            self.error_occurred.emit("OpenAI API not initialized. Check your API key.")
+            return False
+        
+        self.is_listening = True
+        self.capture.arm()
+        self.listening_started.emit()
+        return True
+    
+    def listen(self, duration, cancel_event=None):
+        """
+        Record one utterance and transcribe it with the API (blocking)
+        
+        Utterances that fail while the API is unreachable are spooled.
+        
+        Args:
+            duration: Recording duration in seconds
+            cancel_event: Optional threading.Event; once set, no further
+                upload attempts are made
+        Returns: transcribed text
+        Raises: ListenError (also when cancelled)
+        """
+        try:
+            with tracer.span("mic capture", cat="stt", duration=duration):
+                audio = self.capture.record(duration)
+        except Exception as e:
+            raise ListenError(f"Recording error: {str(e)}") from e
+        finally:
+            self.listening_stopped.emit()
+        
+        if not audio.size:
+            raise ListenError("No audio recorded")
+        
+        try:
+            print("Transcribing audio with OpenAI API...")
+            with tracer.span("transcribe", cat="stt", path="api"):
+                text = self.transcribe(audio, cancel_event)
+        except TranscriptionCancelled as e:
+            raise ListenError("Transcription cancelled") from e
+        except (*RETRYABLE_ERRORS, TimeoutError) as e:
+            if self.spool_utterance(audio):
+                raise ListenError("API unreachable, utterance queued for later") from e
+            raise ListenError(f"API transcription error: {str(e)}") from e
+        except Exception as e:
+            raise ListenError(f"API transcription error: {str(e)}") from e
+        print(f"Transcription: {text}")
+        return text
+    
     def _record_audio(self, duration):
-        """Record audio (runs in separate thread)"""
-        audio_data = []
+        """Record and transcribe one utterance (runs in separate thread)"""
+        try:
+            self.transcription_ready.emit(self.listen(duration))
+        except ListenError as e:
+            self.error_occurred.emit(str(e))
+    
+    def _encode_audio(self, audio):
+        """
+        Encode int16 PCM in memory for upload
+        Returns: (filename, encoded bytes, MIME type)
+        """
+        buffer = io.BytesIO()
+        
+        if self.encoding in AUDIO_ENCODINGS:
+            file_format, subtype, extension, mime_type = AUDIO_ENCODINGS[self.encoding]
+            sf.write(buffer, audio, self.sample_rate, format=file_format, subtype=subtype)
+            return f"speech.{extension}", buffer.getvalue(), mime_type
+        
+        with wave.open(buffer, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)  # 16-bit
+            wav_file.setframerate(self.sample_rate)
+            wav_file.writeframes(audio.tobytes())
+        return "speech.wav", buffer.getvalue(), "audio/wav"
+    
+    def transcribe(self, audio, cancel_event=None):
+        """
+        Transcribe int16 audio with the API (blocking)
+        
+        Transient failures are retried with jittered exponential backoff,
+        all within request_deadline seconds.
+        
+        Args:
+            audio: int16 numpy array at self.sample_rate
+            cancel_event: Optional threading.Event; once set, no further
+                attempts are made (an upload already in flight is abandoned)
+        Returns: transcribed text
+        """
+        filename, payload, mime_type = self._encode_audio(audio)
+        text = self._upload(filename, payload, mime_type, self.language, cancel_event)
+        if self.spool is not None:
+            self.spool.notify_online()
+        return text
+    
+    def _upload(self, filename, payload, mime_type, language, cancel_event=None):
+        """Send encoded audio with retries; returns the transcript"""
+        deadline = time.monotonic() + self.request_deadline
+        attempt = 0
+        
+        if not self._upload_slots.acquire(timeout=self.request_deadline):
+            raise TimeoutError("Too many uploads in flight")
         
         try:
-            # Clear queue
-            while not self.audio_queue.empty():
-                self.audio_queue.get()
-            
-            with sd.InputStream(
-                samplerate=self.sample_rate,
-                channels=1,
-                dtype=np.int16,  # API prefers int16
-                callback=self.audio_callback
-            ):
-                print(f"Recording for {duration} seconds...")
-                # Calculate number of chunks based on blocksize
-                chunks = int(self.sample_rate * duration / 1024)
+            while True:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise TranscriptionCancelled()
                 
-                for _ in range(chunks):
-                    if not self.is_recording:
-                        break
-                    try:
-                        data = self.audio_queue.get(timeout=1)
-                        audio_data.append(data)
-                    except queue.Empty:
-                        continue
-            
-            self.is_recording = False
-            self.listening_stopped.emit()
-            
-            if audio_data:
-                # Combine audio chunks
-                audio = np.concatenate(audio_data, axis=0)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No transcription within {self.request_deadline}s")
                 
-                # Transcribe in separate thread
-                transcribe_thread = threading.Thread(
-                    target=self._transcribe_audio_api, 
-                    args=(audio,)
-                )
-                transcribe_thread.daemon = True
-                transcribe_thread.start()
-            else:
-                self.error_occurred.emit("No audio recorded")
+                try:
+                    client = self.client.with_options(timeout=remaining)
+                    transcript = client.audio.transcriptions.create(
+                        model="whisper-1",
+                        file=(filename, payload, mime_type),
+                        # API uses 'en', 'es', etc.; Bangla is auto-detected
+                        language=language if language != 'bn' else NOT_GIVEN
+                    )
+                    return transcript.text.strip()
                 
-        except Exception as e:
-            self.is_recording = False
-            self.listening_stopped.emit()
-            self.error_occurred.emit(f"Recording error: {str(e)}")
+                except RETRYABLE_ERRORS as e:
+                    attempt += 1
+                    # Full jitter keeps retries from many clients from synchronizing
+                    ceiling = min(self.backoff_cap, self.backoff_base * 2 ** attempt)
+                    backoff = random.uniform(0, ceiling)
+                    if attempt > self.max_retries or time.monotonic() + backoff >= deadline:
+                        raise
+                    print(f"API attempt {attempt} failed ({e.__class__.__name__}), "
+                          f"retrying in {backoff:.2f}s")
+                    if cancel_event is not None:
+                        cancel_event.wait(backoff)
+                    else:
+                        time.sleep(backoff)
+        finally:
+            self._upload_slots.release()
+    
+    def enable_spool(self, spool):
+        """
+        Keep utterances that fail while offline and transcribe them later
+        
+        Args:
+            spool: TranscriptionSpool; late results arrive via
+                late_transcription_ready in capture order
+        """
+        self.spool = spool
+        spool.start_flusher(self._upload_spooled, self._probe, self._deliver_late)
     
-    def _transcribe_audio_api(self, audio):
-        """Transcribe audio to text using OpenAI API (runs in separate thread)"""
+    def spool_utterance(self, audio, captured_at=None):
+        """Spool int16 audio for a later upload; returns True if spooled"""
+        if self.spool is None:
+            return False
         try:
-            print("Transcribing audio with OpenAI API...")
-            
-            # Save audio to temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_audio:
-                temp_path = temp_audio.name
-                
-                # Write WAV file
-                with wave.open(temp_path, 'wb') as wav_file:
-                    wav_file.setnchannels(1)
-                    wav_file.setsampwidth(2)  # 16-bit
-                    wav_file.setframerate(self.sample_rate)
-                    wav_file.writeframes(audio.tobytes())
-            
-            # Call OpenAI API
-            with open(temp_path, 'rb') as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model="whisper-1",
-                    file=audio_file,
-                    language=self.language if self.language != 'bn' else None  # API uses 'en', 'es', etc.
-                )
-            
-            # Clean up temp file
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-            
-            text = transcript.text.strip()
-            print(f"Transcription: {text}")
-            
-            # Emit result
-            self.transcription_ready.emit(text)
-            
+            filename, payload, _ = self._encode_audio(audio)
+            self.spool.add(payload, filename.rsplit('.', 1)[-1], self.language, captured_at)
+            return True
         except Exception as e:
-            self.error_occurred.emit(f"API transcription error: {str(e)}")
-            # Clean up temp file on error
-            try:
-                if 'temp_path' in locals():
-                    os.unlink(temp_path)
-            except:
-                pass
+            print(f"Failed to spool utterance: {e}")
+            return False
+    
+    def _upload_spooled(self, entry, payload):
+        """Upload callback for the spool flusher"""
+        mime_type = SPOOL_MIME_TYPES.get(entry.extension, "application/octet-stream")
+        try:
+            return self._upload(f"speech.{entry.extension}", payload, mime_type, entry.language)
+        except RETRYABLE_ERRORS as e:
+            raise ConnectionError(str(e)) from e
+    
+    def _probe(self):
+        """Check that the API endpoint answers at all"""
+        if self.client is None:
+            return False
+        try:
+            self.http_client.head(str(self.client.base_url), timeout=3.0)
+            return True
+        except httpx.HTTPError:
+            return False
+    
+    def _deliver_late(self, text, captured_at):
+        print(f"Late transcription ({time.strftime('%H:%M:%S', time.localtime(captured_at))}): {text}")
+        self.late_transcription_ready.emit(text, captured_at)
     
     def stop_listening(self):
         """Stop recording"""
-        self.is_recording = False
+        self.capture.stop()
         self.is_listening = False
@@ -0,0 +1,140 @@
+"""
+Async Runtime for MAYA
+One asyncio event loop for the window: on the Qt thread through qasync
+when it is installed, otherwise on a dedicated loop thread
+
+Work for one user turn (recording, transcription, the streamed reply) runs
+as tasks of a TurnScope. Cancelling the scope cancels every task at its
+next await; blocking steps run via asyncio.to_thread get their cancel
+events set by the task that awaits them.
+"""
+
+import asyncio
+import threading
+import weakref
+
+from frontend.components.tracing import tracer
+
+try:
+    import qasync
+except ImportError:  # Falls back to a loop thread
+    qasync = None
+
+
+class TurnScope:
+    """Tasks belonging to one user turn, cancelled together"""
+    
+    def __init__(self, runtime, name):
+        self.runtime = runtime
+        self.name = name
+        self.cancelled = False
+        self._tasks = set()
+        self._lock = threading.Lock()
+        self._finished = False
+        tracer.begin("turn", name)
+    
+    def spawn(self, coro):
+        """
+        Run coro as a task of this turn (callable from any thread)
+        Returns: concurrent.futures.Future; a cancelled scope starts nothing
+        """
+        async def run():
+            with self._lock:
+                if self.cancelled:
+                    coro.close()
+                    raise asyncio.CancelledError()
+                task = asyncio.current_task()
+                self._tasks.add(task)
+            try:
+                return await coro
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠ Task in {self.name} failed: {e}")
+                raise
+            finally:
+                with self._lock:
+                    self._tasks.discard(task)
+        
+        return self.runtime.submit(run())
+    
+    def cancel(self):
+        """Cancel every task of this turn, including ones not started yet"""
+        with self._lock:
+            self.cancelled = True
+            tasks = list(self._tasks)
+        for task in tasks:
+            self.runtime.loop.call_soon_threadsafe(task.cancel)
+        self.finish("cancelled" if tasks else "done")
+    
+    def finish(self, outcome="done"):
+        """Close the turn's trace span (first call wins)"""
+        with self._lock:
+            if self._finished:
+                return
+            self._finished = True
+        tracer.end("turn", self.name, outcome=outcome)
+    
+    @property
+    def active(self):
+        with self._lock:
+            return len(self._tasks)
+
+
+class AsyncRuntime:
+    """The shared event loop and the turn scopes created on it"""
+    
+    def __init__(self, app=None):
+        """
+        Start the loop
+        
+        Args:
+            app: QApplication; with qasync installed the loop runs on its
+                thread and exec() must be used instead of app.exec()
+        """
+        self.app = app
+        self.thread = None
+        self._scopes = weakref.WeakSet()
+        self._turns = 0
+        if qasync is not None and app is not None:
+            self.loop = qasync.QEventLoop(app)
+            asyncio.set_event_loop(self.loop)
+        else:
+            self.loop = asyncio.new_event_loop()
+            self.thread = threading.Thread(target=self._run_loop, name="maya-asyncio", daemon=True)
+            self.thread.start()
+    
+    @property
+    def mode(self):
+        return "qasync" if self.thread is None else "thread"
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def submit(self, coro):
+        """Schedule coro on the loop from any thread; returns a concurrent Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def new_turn(self, name=None):
+        """Create the scope for the next turn"""
+        self._turns += 1
+        scope = TurnScope(self, name or f"turn {self._turns}")
+        self._scopes.add(scope)
+        return scope
+    
+    def exec(self):
+        """Run the Qt event loop until the application quits; returns its exit code"""
+        if self.thread is None:
+            with self.loop:
+                exit_code = self.loop.run_forever()  # qasync returns app.exec()'s code
+            return exit_code or 0
+        return self.app.exec()
+    
+    def shutdown(self, timeout=2.0):
+        """Cancel every scope and stop the loop"""
+        for scope in list(self._scopes):
+            scope.cancel()
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
@@ -0,0 +1,184 @@
+"""
+MAYA Inference Daemon
+Long-running local process that keeps the face models and Whisper warm
+and serves every MAYA window over a Unix-domain socket
+
+Usage:
+    python -m maya.daemon
+    python maya/main.py --daemon
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maya.protocol import (
+    FRAME_DETECT, FRAME_ENROLL, FRAME_PING, FRAME_RECOGNIZE, FRAME_RESULT, FRAME_TRANSCRIBE,
+    SAMPLE_RATE, decode_enrollment, decode_image, encode_json,
+)
+from maya.stt_server import STTStreamHandler
+
+DEFAULT_SOCKET_PATH = Path.home() / ".maya" / "maya.sock"
+
+
+class InferenceHandler(STTStreamHandler):
+    """Request/response endpoints on top of the streaming session"""
+    
+    daemon = None  # MayaDaemon, set by MayaDaemon.serve()
+    
+    def reply(self, result):
+        with self._send_lock:
+            self.request.sendall(encode_json(FRAME_RESULT, result))
+    
+    def image(self, payload):
+        """Decode a frame; 4-channel frames are RGBA from a browser canvas"""
+        frame = decode_image(payload)
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+        return frame
+    
+    def dispatch(self, frame_type, payload):
+        daemon = self.daemon
+        if frame_type == FRAME_RECOGNIZE:
+            self.reply(daemon.recognize(self.image(payload)))
+        elif frame_type == FRAME_DETECT:
+            self.reply(daemon.detect(self.image(payload)))
+        elif frame_type == FRAME_ENROLL:
+            name, frames = decode_enrollment(payload)
+            self.reply(daemon.enroll(name, frames))
+        elif frame_type == FRAME_TRANSCRIBE:
+            language = payload[:2].decode("ascii")
+            audio = np.frombuffer(payload, dtype="<i2", offset=2).astype(np.float32) / 32768.0
+            self.reply(daemon.transcribe(audio, language))
+        elif frame_type == FRAME_PING:
+            self.reply(daemon.status())
+        else:
+            super().dispatch(frame_type, payload)
+
+
+class MayaDaemon:
+    """Owns the warm models shared by all clients"""
+    
+    def __init__(self, socket_path=None):
+        """
+        Initialize daemon and load every model up front
+        
+        Args:
+            socket_path: Unix socket path (default ~/.maya/maya.sock)
+        """
+        from frontend.components.face_recognizer import FaceRecognizer
+        from frontend.components.resource_governor import ResourceGovernor
+        from frontend.components.secure_storage import SecureStorage
+        from frontend.components.stt_model_manager import STTModelManager
+        from frontend.components.voice_listener import VoiceListener
+        
+        self.socket_path = Path(socket_path) if socket_path else DEFAULT_SOCKET_PATH
+        self.started = time.time()
+        self.secure_storage = SecureStorage()
+        config = self.secure_storage.load_config()
+        
+        # OpenCV and PyTorch share this process: give each its own cores
+        self.resource_governor = ResourceGovernor(stt_nice=config.get('stt_nice', 10))
+        if config.get('cpu_governor', True):
+            self.resource_governor.apply_in_process()
+        
+        start = time.perf_counter()
+        self.face_recognizer = FaceRecognizer(store=self.secure_storage.embedding_store())
+        # OpenCV DNN nets are not safe to run from several threads at once
+        self.face_lock = threading.Lock()
+        
+        # No idle unloading: staying warm is the point of the daemon
+        self.stt_model_manager = STTModelManager(
+            budget_mb=config.get('stt_memory_budget_mb', 2048),
+            idle_timeout=0
+        )
+        self.voice_listener = VoiceListener(
+            model_size=config.get('stt_model_size', 'base'),
+            language="en",
+            quantize=config.get('stt_quantize_int8', False),
+            decoding_profile=config.get('stt_decoding_profile', 'balanced'),
+            code_switching=config.get('stt_code_switching', False),
+            preload_languages=config.get('stt_preload_languages', []),
+            model_manager=self.stt_model_manager,
+            resource_governor=self.resource_governor
+        )
+        self.voice_listener.error_occurred.connect(lambda message: print(f"Error: {message}"))
+        self.voice_listener.load_model()
+        print(f"✓ Models warm in {time.perf_counter() - start:.1f}s")
+    
+    def recognize(self, frame):
+        with self.face_lock:
+            return self.face_recognizer.recognize(frame)
+    
+    def detect(self, frame):
+        with self.face_lock:
+            box = self.face_recognizer.detect_face(frame)
+        return {"box": [int(value) for value in box] if box is not None else None}
+    
+    def enroll(self, name, frames):
+        with self.face_lock:
+            success = self.face_recognizer.enroll_face(name, frames)
+        return {"success": success}
+    
+    def transcribe(self, audio, language):
+        # Language is per request; the listener serializes decodes per model,
+        # including those of streaming sessions
+        text = self.voice_listener.transcribe(audio, language=language)
+        return {"text": text, "audio_seconds": len(audio) / SAMPLE_RATE}
+    
+    def status(self):
+        return {
+            "status": "ok",
+            "pid": os.getpid(),
+            "uptime": time.time() - self.started,
+            "faces": len(self.face_recognizer.known_embeddings),
+            "stt_models": self.stt_model_manager.report(),
+            "resources": self.resource_governor.report(),
+        }
+    
+    def serve(self):
+        """Serve clients until interrupted"""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()  # Stale socket from a previous run
+        
+        InferenceHandler.daemon = self
+        InferenceHandler.listener = self.voice_listener
+        server = socketserver.ThreadingUnixStreamServer(str(self.socket_path), InferenceHandler)
+        server.daemon_threads = True
+        os.chmod(self.socket_path, 0o600)  # Owner only: the socket unlocks the app
+        
+        print(f"MAYA daemon listening on {self.socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.socket_path.unlink(missing_ok=True)
+            print(json.dumps(self.status(), indent=2, default=str))
+
+
+def main():
+    """Daemon entry point"""
+    parser = argparse.ArgumentParser(description='MAYA warm inference daemon')
+    parser.add_argument('--socket', default=None,
+                        help=f'Unix socket path (default {DEFAULT_SOCKET_PATH})')
+    args = parser.parse_args()
+    
+    MayaDaemon(args.socket).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+MAYA Daemon Client
+Thin clients for the warm inference daemon: the PyQt app uses these in
+place of FaceRecognizer and VoiceListener when started with --daemon
+"""
+
+import json
+import socket
+import threading
+import numpy as np
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from frontend.components.audio_capture import ListenError, MicrophoneCapture
+from frontend.components.tracing import tracer
+
+from maya.daemon import DEFAULT_SOCKET_PATH
+from maya.protocol import (
+    FRAME_DETECT, FRAME_ENROLL, FRAME_ERROR, FRAME_PING, FRAME_RECOGNIZE, FRAME_RESULT,
+    FRAME_TRANSCRIBE, encode_enrollment, encode_frame, encode_image, read_frame,
+)
+
+
+class DaemonError(Exception):
+    """The daemon is unreachable or rejected a request"""
+
+
+class DaemonClient:
+    """Request/response connection to the MAYA daemon (one socket per thread)"""
+    
+    def __init__(self, socket_path=None, timeout=30.0):
+        """
+        Initialize client
+        
+        Args:
+            socket_path: Daemon socket (default ~/.maya/maya.sock)
+            timeout: Seconds to wait for any single reply
+        """
+        self.socket_path = str(socket_path or DEFAULT_SOCKET_PATH)
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+    
+    def _drop_connection(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+    
+    def request(self, frame_type, payload=b""):
+        """
+        Send one request and wait for its reply
+        
+        Reconnects once if the daemon was restarted since the last call.
+        Returns: decoded JSON result
+        """
+        message = encode_frame(frame_type, payload)
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                sock.sendall(message)
+                frame = read_frame(sock)
+                if frame is None:
+                    raise ConnectionError("daemon closed the connection")
+            except OSError as e:
+                self._drop_connection()
+                if attempt:
+                    raise DaemonError(f"MAYA daemon unavailable: {e}") from e
+                continue
+            
+            reply_type, reply = frame
+            if reply_type == FRAME_ERROR:
+                raise DaemonError(reply.decode("utf-8", "replace"))
+            if reply_type != FRAME_RESULT:
+                self._drop_connection()
+                raise DaemonError(f"Unexpected reply frame {reply_type:#x}")
+            return json.loads(reply)
+    
+    def ping(self):
+        """Daemon status, or None if it is not running"""
+        try:
+            return self.request(FRAME_PING)
+        except DaemonError:
+            return None
+    
+    def recognize(self, frame):
+        return self.request(FRAME_RECOGNIZE, encode_image(frame))
+    
+    def detect_face(self, frame):
+        box = self.request(FRAME_DETECT, encode_image(frame))["box"]
+        return tuple(box) if box is not None else None
+    
+    def enroll(self, name, frames):
+        return self.request(FRAME_ENROLL, encode_enrollment(name, frames))["success"]
+    
+    def transcribe(self, audio, language="en"):
+        """Transcribe float32 16 kHz audio with the daemon's Whisper"""
+        pcm16 = (np.clip(audio, -1.0, 1.0) * 32767).astype("<i2")
+        return self.request(FRAME_TRANSCRIBE, language.encode("ascii") + pcm16.tobytes())["text"]
+
+
+class RemoteFaceRecognizer:
+    """FaceRecognizer stand-in backed by the daemon"""
+    
+    def __init__(self, client):
+        self.client = client
+    
+    def recognize(self, frame):
+        """
+        Recognize face in frame
+        Returns: {"match": bool, "name": str, "confidence": float}
+        """
+        try:
+            return self.client.recognize(frame)
+        except DaemonError as e:
+            print(f"Face recognition error: {e}")
+            return {"match": False, "name": None, "confidence": 0.0}
+    
+    def detect_face(self, frame):
+        """
+        Detect face in frame
+        Returns: (x, y, w, h) or None
+        """
+        try:
+            return self.client.detect_face(frame)
+        except DaemonError as e:
+            print(f"Face detection error: {e}")
+            return None
+    
+    def enroll_face(self, name, frames):
+        """Enroll a face; the daemon stores the embedding. Returns: bool"""
+        try:
+            return self.client.enroll(name, frames)
+        except DaemonError as e:
+            print(f"Failed to enroll {name}: {e}")
+            return False
+
+
+class DaemonVoiceListener(QObject):
+    """Voice listener that records locally and transcribes in the daemon"""
+    
+    # Signals (same interface as VoiceListener)
+    transcription_ready = pyqtSignal(str)  # Emits transcribed text
+    listening_started = pyqtSignal()
+    listening_stopped = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+    model_ready = pyqtSignal(str)  # Daemon reachable, its Whisper is warm
+    
+    def __init__(self, client, language="en"):
+        """
+        Initialize daemon voice listener
+        
+        Args:
+            client: DaemonClient
+            language: Language code ('en' for English, 'bn' for Bangla)
+        """
+        super().__init__()
+        self.client = client
+        self.language = language
+        self.sample_rate = 16000
+        self.capture = MicrophoneCapture(self.sample_rate)
+        self.is_listening = False  # UI state, only touched from the GUI thread
+        self._daemon_ready = threading.Event()
+    
+    def load_model(self):
+        """Check the daemon is up (its models are already loaded)"""
+        if self.client.ping() is not None:
+            self._daemon_ready.set()
+            self.model_ready.emit("daemon")
+        else:
+            self._daemon_ready.clear()
+            self.error_occurred.emit("MAYA daemon is not running")
+    
+    def warm_up(self):
+        """Re-check the daemon in the background"""
+        thread = threading.Thread(target=self.load_model)
+        thread.daemon = True
+        thread.start()
+    
+    def is_model_loaded(self, model_name=None):
+        return self._daemon_ready.is_set()
+    
+    @property
+    def is_recording(self):
+        return self.capture.is_recording
+    
+    def set_language(self, language_code):
+        """
+        Change language
+        
+        Args:
+            language_code: 'en' for English, 'bn' for Bangla
+        """
+        self.language = language_code
+    
+    def start_listening(self, duration=5):
+        """
+        Start recording audio for specified duration
+        
+        Args:
+            duration: Recording duration in seconds
+        """
+        self.begin_listening()
+        
+        thread = threading.Thread(target=self._record_audio, args=(duration,))
+        thread.daemon = True
+        thread.start()
+    
+    def begin_listening(self):
+        """Arm the microphone for listen() (GUI thread); returns True"""
+        self.is_listening = True
+        self.capture.arm()
+        self.listening_started.emit()
+        return True
+    
+    def record(self, duration):
+        """
+        Record from the microphone (blocking)
+        Returns: float32 mono audio (empty if nothing was captured)
+        """
+        return self.capture.record(duration)
+    
+    def listen(self, duration, cancel_event=None):
+        """
+        Record one utterance and transcribe it in the daemon (blocking)
+        
+        cancel_event only prevents the request from being sent; one already
+        in the daemon runs to completion.
+        Returns: transcribed text
+        Raises: ListenError
+        """
+        try:
+            with tracer.span("mic capture", cat="stt", duration=duration):
+                audio = self.record(duration)
+        except Exception as e:
+            raise ListenError(f"Recording error: {str(e)}") from e
+        finally:
+            self.listening_stopped.emit()
+        
+        if not audio.size:
+            raise ListenError("No audio recorded")
+        if cancel_event is not None and cancel_event.is_set():
+            raise ListenError("Transcription cancelled")
+        
+        try:
+            with tracer.span("transcribe", cat="stt", path="daemon"):
+                text = self.transcribe(audio)
+        except Exception as e:
+            raise ListenError(f"Transcription error: {str(e)}") from e
+        print(f"Transcription: {text}")
+        return text
+    
+    def _record_audio(self, duration):
+        """Record and transcribe one utterance (runs in separate thread)"""
+        try:
+            self.transcription_ready.emit(self.listen(duration))
+        except ListenError as e:
+            self.error_occurred.emit(str(e))
+    
+    def transcribe(self, audio, cancel_event=None):
+        """
+        Transcribe float32 audio in the daemon (blocking)
+        
+        cancel_event is accepted for interface compatibility; a request
+        already sent to the daemon runs to completion.
+        """
+        return self.client.transcribe(audio, self.language)
+    
+    def stop_listening(self):
+        """Stop recording"""
+        self.capture.stop()
+        self.is_listening = False
@@ -5,23 +5,47 @@ Main entry point for the three-panel interface with face authentication
 
 import sys
 import os
+import asyncio
 import threading
+import time
+
+STARTED = time.perf_counter()  # Before the Qt import, for --startup-profile
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QHBoxLayout, 
     QVBoxLayout, QStackedWidget, QSplashScreen
 )
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QPalette, QColor, QPixmap, QFont
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QPalette, QColor, QPixmap, QFont, QKeySequence, QShortcut
+from frontend.components.tracing import tracer
 
 
 class MAYAMainWindow(QMainWindow):
     """Main application window with three-panel layout"""
 
-    def __init__(self, skip_auth=False):
+    face_recognizer_ready = pyqtSignal(object)  # Built off the GUI thread
+    
+    def __init__(self, skip_auth=False, daemon_client=None, startup=None, runtime=None):
         super().__init__()
         self.setWindowTitle("MAYA - AI Assistant")
         self.setMinimumSize(1200, 800)
         self.skip_auth = skip_auth
+        self.daemon_client = daemon_client  # Models live in the daemon when set
+        if startup is None:
+            from maya.startup import StartupProfiler
+            startup = StartupProfiler(time.perf_counter())
+        self.startup = startup
+        if runtime is None:
+            from maya.async_runtime import AsyncRuntime
+            runtime = AsyncRuntime()
+        self.runtime = runtime  # asyncio loop for per-turn tasks
+        self.turn = None  # TurnScope of the current turn
+        self.listen_pending = False  # A listen task of the current turn has not reported yet
+        self.listen_listener = None  # Listener recording for that task
+        
+        # Every UI update from streams and listeners lands here, once per frame
+        from frontend.components.ui_dispatcher import UIDispatcher
+        self.ui = UIDispatcher(parent=self)
         
         # Set dark theme
         self.setup_theme()
@@ -31,31 +55,81 @@ class MAYAMainWindow(QMainWindow):
         self.setCentralWidget(self.stack)
         
         # Initialize face recognizer
-        from frontend.components.face_recognizer import FaceRecognizer
-        from frontend.components.secure_storage import SecureStorage
-        
-        self.secure_storage = SecureStorage()
-        self.face_recognizer = FaceRecognizer()
-        
-        # Load embeddings from secure storage
-        embeddings = self.secure_storage.load_embeddings()
-        if embeddings:
-            self.face_recognizer.known_embeddings = embeddings
+        with self.startup.stage("Loading settings"):
+            from frontend.components.secure_storage import SecureStorage
+            
+            self.secure_storage = SecureStorage()
+            config = self.secure_storage.load_config()
+        use_workers = self.daemon_client is None and config.get('inference_workers', True)
+        
+        # Split the cores between GUI, face inference and STT
+        self.resource_governor = None
+        if config.get('cpu_governor', True):
+            from frontend.components.resource_governor import ResourceGovernor
+            self.resource_governor = ResourceGovernor(
+                pin=config.get('cpu_pin_workers', False),
+                stt_nice=config.get('stt_nice', 10)
+            )
+            if self.daemon_client is not None or use_workers:
+                self.resource_governor.apply_gui()
+            else:
+                self.resource_governor.apply_in_process()
+        
+        self.face_recognizer = None  # Screens show the camera until it is set
+        self.face_recognizer_ready.connect(self.on_face_recognizer_ready)
+        with self.startup.stage("Starting face engine"):
+            if self.daemon_client is not None:
+                # The daemon holds the warm models and the enrolled embeddings
+                from maya.daemon_client import RemoteFaceRecognizer
+                self.face_recognizer = RemoteFaceRecognizer(self.daemon_client)
+            elif use_workers:
+                # Face models run in a child process fed through shared memory
+                from frontend.components.inference_workers import WorkerFaceRecognizer, start_face_worker
+                self.face_worker = start_face_worker(self.resource_governor)
+                self.face_recognizer = WorkerFaceRecognizer(self.face_worker)
+            else:
+                # Model loading stays off the GUI thread
+                thread = threading.Thread(target=self._load_face_recognizer)
+                thread.daemon = True
+                thread.start()
         
         # Check if first-time setup
-        if self.secure_storage.check_first_time_setup() and not skip_auth:
-            self.show_enrollment_screen()
-        elif skip_auth:
-            self.create_main_interface()
-            self.stack.addWidget(self.main_widget)
-            self.stack.setCurrentWidget(self.main_widget)
-        else:
-            self.show_auth_screen()
+        with self.startup.stage("Building first screen"):
+            if self.secure_storage.check_first_time_setup() and not skip_auth:
+                self.show_enrollment_screen()
+            elif skip_auth:
+                self.create_main_interface()
+                self.stack.addWidget(self.main_widget)
+                self.stack.setCurrentWidget(self.main_widget)
+            else:
+                self.show_auth_screen()
+    
+    def _load_face_recognizer(self):
+        """Build the in-process FaceRecognizer (runs in a separate thread)"""
+        from frontend.components.face_recognizer import FaceRecognizer
+        
+        # Enrolled faces are loaded once, from the encrypted embedding store
+        face_recognizer = FaceRecognizer(store=self.secure_storage.embedding_store())
+        self.face_recognizer_ready.emit(face_recognizer)
+    
+    def on_face_recognizer_ready(self, face_recognizer):
+        """Hand the loaded recognizer to whichever screen is waiting for it"""
+        self.face_recognizer = face_recognizer
+        for screen in ('auth_screen', 'enrollment_screen'):
+            if hasattr(self, screen):
+                getattr(self, screen).face_recognizer = face_recognizer
+        print("✓ Face engine ready")
+    
+    def set_interactive(self, source, active):
+        """Give interactive work (unlock, enrollment, preview) priority over STT"""
+        if self.resource_governor is not None:
+            self.resource_governor.set_interactive(source, active)
     
     def show_enrollment_screen(self):
         """Show face enrollment screen for first-time setup"""
         from frontend.components.face_enrollment import FaceEnrollmentScreen
         
+        self.set_interactive('enrollment', True)
         self.enrollment_screen = FaceEnrollmentScreen(self.face_recognizer)
         self.enrollment_screen.enrollment_complete.connect(self.on_enrollment_complete)
         self.enrollment_screen.enrollment_cancelled.connect(self.close)
@@ -67,36 +141,26 @@ class MAYAMainWindow(QMainWindow):
         """Show face authentication screen"""
         from frontend.components.face_auth_screen import FaceAuthScreen
         
-        self.auth_screen = FaceAuthScreen(self.face_recognizer)
+        self.set_interactive('unlock', True)
+        self.auth_screen = FaceAuthScreen(self.face_recognizer, pin_verifier=self.check_pin)
         self.auth_screen.auth_success.connect(self.on_auth_success)
+        self.auth_screen.auth_failed.connect(self.discard_main_interface)
         self.auth_screen.auth_failed.connect(self.close)
         
-        # Update PIN verification to use secure storage
-        self.auth_screen.pin_screen.findChild(QWidget, 'verify_pin_btn')
-        original_verify = self.auth_screen.verify_pin
-        
-        def secure_verify_pin():
-            pin = self.auth_screen.pin_input.text()
-            if self.secure_storage.verify_pin(pin):
-                self.auth_screen.auth_success.emit(
-                    self.secure_storage.load_config().get('owner_name', 'User')
-                )
-            else:
-                self.auth_screen.pin_error.setText("Incorrect PIN")
-                self.auth_screen.pin_input.clear()
-        
-        self.auth_screen.verify_pin = secure_verify_pin
-        
         self.stack.addWidget(self.auth_screen)
         self.stack.setCurrentWidget(self.auth_screen)
         
         # Start authentication after brief delay
         QTimer.singleShot(500, self.auth_screen.start_authentication)
+        
+        # Use the unlock time to get the assistant ready behind the auth screen
+        QTimer.singleShot(800, self.prepare_main_interface)
     
     def on_enrollment_complete(self, username):
         """Handle successful enrollment"""
-        # Save embeddings to secure storage
-        self.secure_storage.save_embeddings(self.face_recognizer.known_embeddings)
+        self.set_interactive('enrollment', False)
+        
+        # Enrollment already appended the embedding to the store
         
         # Save config with username
         config = self.secure_storage.load_config()
@@ -108,8 +172,76 @@ class MAYAMainWindow(QMainWindow):
         self.stack.addWidget(self.main_widget)
         self.stack.setCurrentWidget(self.main_widget)
     
+    def check_pin(self, pin):
+        """
+        Verify a PIN against secure storage (runs on the auth screen's worker thread)
+        Returns: owner name, or None if the PIN is wrong
+        """
+        if self.secure_storage.verify_pin(pin):
+            return self.secure_storage.load_config().get('owner_name', 'User')
+        return None
+    
+    def get_conversation_log(self):
+        """Persistent chat history, opened once (None when disabled in settings)"""
+        if not hasattr(self, 'conversation_log'):
+            self.conversation_log = None
+            if self.secure_storage.load_config().get('conversation_log', True):
+                from frontend.components.conversation_log import ConversationLog
+                try:
+                    self.conversation_log = ConversationLog()
+                except Exception as e:
+                    print(f"⚠ Conversation history unavailable: {e}")
+        return self.conversation_log
+    
+    def prepare_main_interface(self):
+        """
+        Build the main interface hidden while face unlock runs
+        
+        Starts the Whisper load and readies the audio input, so the
+        assistant is usable the moment the success animation ends.
+        """
+        if hasattr(self, 'main_widget'):
+            return
+        self.create_main_interface()
+        self.stack.addWidget(self.main_widget)  # Not current: stays hidden
+        
+        thread = threading.Thread(target=self._prepare_audio_input)
+        thread.daemon = True
+        thread.start()
+    
+    def _prepare_audio_input(self):
+        """Initialize the audio device ahead of the first recording (runs in separate thread)"""
+        capture = getattr(self.voice_listener_local, 'capture', None)
+        if capture is None:
+            return
+        try:
+            capture.prepare()
+            print("✓ Audio input ready")
+        except Exception as e:
+            print(f"⚠ Audio input not ready: {e}")
+    
+    def discard_main_interface(self):
+        """Throw away the speculatively built interface after a failed unlock"""
+        if not hasattr(self, 'main_widget'):
+            return
+        self.stack.removeWidget(self.main_widget)
+        self.main_widget.deleteLater()
+        del self.main_widget
+        
+        # Release the models the speculative build started loading
+        if hasattr(self, 'speech_worker'):
+            self.speech_worker.close()
+            del self.speech_worker
+        if hasattr(self, 'stt_model_manager'):
+            self.stt_model_manager.shutdown()
+            self.stt_model_manager.unload_all()
+        self.voice_listener_local = self.voice_listener = None
+        print("Discarded prepared interface")
+    
     def on_auth_success(self, username):
         """Handle successful authentication"""
+        self.set_interactive('unlock', False)
+        
         # Create main interface if not exists
         if not hasattr(self, 'main_widget'):
             self.create_main_interface()
@@ -142,20 +274,27 @@ class MAYAMainWindow(QMainWindow):
         from frontend.components.left_panel import LeftPanel
         from frontend.components.center_panel import CenterPanel
         from frontend.components.right_panel import RightPanel
-        from frontend.components.voice_listener import VoiceListener
-        from frontend.components.voice_listener_api import VoiceListenerAPI
         
         self.left_panel = LeftPanel()
         self.center_panel = CenterPanel()
-        self.right_panel = RightPanel()
+        self.right_panel = RightPanel(conversation_log=self.get_conversation_log())
         
-        # Initialize both voice listeners
-        self.voice_listener_local = VoiceListener(model_size="base", language="en")
-        self.voice_listener_api = VoiceListenerAPI(language="en")
+        # Local listener is the default; the API listener is built on first use
+        if self.daemon_client is not None:
+            # Whisper stays warm in the daemon; this window only records
+            from maya.daemon_client import DaemonVoiceListener
+            self.voice_listener_local = DaemonVoiceListener(self.daemon_client, language="en")
+        else:
+            self.voice_listener_local = self._create_local_listener()
+        self.voice_listener_api = None
+        self.stt_router = None
         self.current_language = "en"  # Default language
         self.model_mode = "local"  # Default to local model
         self.voice_listener = self.voice_listener_local  # Active listener
         self.is_listening = False  # Track listening state
+        self.awaiting_voice_model = False  # Unmuted while the model reloads
+        self.response_backend = None  # Chat backend, built on first message
+        self.response_turns = {}  # Streaming replies: turn -> {'message', 'started', 'scope'}
         
         # Load Whisper model in background (for local)
         model_thread = threading.Thread(target=self.voice_listener_local.load_model)
@@ -178,9 +317,9 @@ class MAYAMainWindow(QMainWindow):
         self.top_navbar.model_mode_changed.connect(self.on_model_mode_changed)
         self.top_navbar.language_changed.connect(self.on_language_changed_ui)
         
-        # Connect voice listener signals for both modes
+        # Connect voice listener signals (API listener connects when created)
         self._connect_voice_signals(self.voice_listener_local)
-        self._connect_voice_signals(self.voice_listener_api)
+        self.voice_listener_local.model_ready.connect(self.on_voice_model_ready)
         
         # Panels already have fixed widths set in their __init__ methods
         # Left: 190px, Right: 200px, Center: stretch
@@ -193,6 +332,61 @@ class MAYAMainWindow(QMainWindow):
         # Add content widget to main container
         main_container_layout.addWidget(content_widget)
     
+    def _create_local_listener(self):
+        """Create the in-process Whisper listener from config"""
+        from frontend.components.voice_listener import VoiceListener
+        from frontend.components.stt_model_manager import STTModelManager
+        
+        config = self.secure_storage.load_config()
+        
+        # Model size and profile come from config; the quality controller
+        # then adapts them to this machine's measured real-time factor
+        model_size = config.get('stt_model_size', 'base')
+        decoding_profile = config.get('stt_decoding_profile', 'balanced')
+        quality_controller = None
+        if config.get('stt_adaptive_quality', True):
+            from frontend.components.stt_quality import AdaptiveQualityController
+            quality_controller = AdaptiveQualityController(
+                model_size=model_size,
+                decoding_profile=decoding_profile,
+                downgrade_rtf=config.get('stt_rtf_downgrade', 0.4),
+                upgrade_rtf=config.get('stt_rtf_upgrade', 0.15)
+            )
+        
+        listener_options = dict(
+            model_size=model_size,
+            language="en",
+            quantize=config.get('stt_quantize_int8', False),
+            decoding_profile=decoding_profile,
+            code_switching=config.get('stt_code_switching', False),
+            preload_languages=config.get('stt_preload_languages', [])
+        )
+        if config.get('inference_workers', True):
+            # Whisper decodes in a child process; this one only records
+            from frontend.components.inference_workers import ProcessVoiceListener, start_speech_worker
+            self.speech_worker = start_speech_worker(
+                listener_options,
+                manager_options={
+                    'budget_mb': config.get('stt_memory_budget_mb', 2048),
+                    'idle_timeout': config.get('stt_idle_unload_seconds', 900)
+                },
+                quality_controller=quality_controller,
+                governor=self.resource_governor
+            )
+            return ProcessVoiceListener(self.speech_worker, language="en")
+        
+        # One manager owns every loaded STT model under the RAM budget
+        self.stt_model_manager = STTModelManager(
+            budget_mb=config.get('stt_memory_budget_mb', 2048),
+            idle_timeout=config.get('stt_idle_unload_seconds', 900)
+        )
+        return VoiceListener(
+            model_manager=self.stt_model_manager,
+            quality_controller=quality_controller,
+            resource_governor=self.resource_governor,
+            **listener_options
+        )
+    
     def setup_theme(self):
         """Configure dark theme for the application - Figma colors"""
         palette = QPalette()
@@ -227,12 +421,57 @@ class MAYAMainWindow(QMainWindow):
             if not api_key:
                 print("⚠️ OpenAI API key not found")
                 return
-            self.voice_listener = self.voice_listener_api
+            self.voice_listener = self._get_cloud_listener()
         
         # Update language for new listener
         self.voice_listener.set_language(self.current_language)
         print(f"Model mode changed to: {mode}")
     
+    def _get_cloud_listener(self):
+        """
+        Listener for API mode: the hybrid router (cloud hedged by local
+        Whisper) unless hybrid routing is disabled in config
+        """
+        config = self.secure_storage.load_config()
+        if not config.get('stt_hybrid_routing', True):
+            return self._get_api_listener()
+        
+        if self.stt_router is None:
+            from frontend.components.stt_router import HybridSTTRouter
+            self.stt_router = HybridSTTRouter(
+                self.voice_listener_local,
+                self._get_api_listener(),
+                hedge_after=config.get('stt_hedge_after_seconds', 1.5)
+            )
+            self._connect_voice_signals(self.stt_router)
+        return self.stt_router
+    
+    def _get_api_listener(self):
+        """Create the API voice listener on first use"""
+        if self.voice_listener_api is None:
+            from frontend.components.voice_listener_api import VoiceListenerAPI
+            config = self.secure_storage.load_config()
+            self.voice_listener_api = VoiceListenerAPI(
+                language=self.current_language,
+                base_url=config.get('stt_api_base_url'),
+                encoding=config.get('stt_api_encoding', 'flac'),
+                request_deadline=config.get('stt_api_deadline_seconds', 10),
+                max_retries=config.get('stt_api_max_retries', 2)
+            )
+            self.voice_listener_api.warm_connection()
+            self._connect_voice_signals(self.voice_listener_api)
+            
+            if config.get('stt_spool_enabled', True):
+                from frontend.components.transcription_spool import TranscriptionSpool
+                self.voice_listener_api.late_transcription_ready.connect(
+                    self.on_late_transcription_ready
+                )
+                self.voice_listener_api.enable_spool(TranscriptionSpool(
+                    max_mb=config.get('stt_spool_max_mb', 50),
+                    batch_size=config.get('stt_spool_batch_size', 4)
+                ))
+        return self.voice_listener_api
+    
     def on_project_selected(self, project_name: str):
         """Handle project selection from left panel"""
         print(f"Project selected: {project_name}")
@@ -252,32 +491,119 @@ class MAYAMainWindow(QMainWindow):
             self.start_voice_listening()
             return
         
-        # Simulate AI processing
-        self.center_panel.set_state('processing')
-        
-        # TODO: Integrate with actual AI backend
-        # For now, simulate a response
-        def simulate_response():
-            import time
-            time.sleep(1)
-            self.center_panel.set_state('speaking')
-            time.sleep(1.5)
-            
-            # Add AI response
-            response = f"I received: '{message}'"
-            self.right_panel.add_message(response, is_user=False)
-            
-            # Return to listening if mic is unmuted
-            if self.is_listening:
-                self.center_panel.set_state('listening')
-            else:
-                self.center_panel.set_state('idle')
+        # A new message supersedes everything still running for the last one
+        scope = self.new_turn()
         
-        thread = threading.Thread(target=simulate_response)
-        thread.daemon = True
-        thread.start()
-
-
+        # Stream the reply; its bubble appears with the first token
+        self.show_state('processing')
+        turn = self.get_response_backend().ask(message, scope)
+        self.response_turns[turn] = {'message': None, 'started': time.perf_counter(), 'scope': scope}
+    
+    def new_turn(self):
+        """Cancel the current turn and start the next; listening carries over"""
+        resume_listening = self.listen_pending and self.is_listening
+        self.cancel_turn()
+        self.turn = self.runtime.new_turn()
+        if resume_listening:
+            self.start_voice_listening(duration=5)
+        return self.turn
+    
+    def cancel_turn(self):
+        """Stop recording, transcription and the reply of the current turn"""
+        if self.listen_pending:
+            # Stop here, before a caller re-arms: a stop issued later by the
+            # cancelled task could land on the next recording
+            self.listen_listener.stop_listening()
+        if self.turn is not None:
+            self.turn.cancel()
+            self.turn = None
+        self.listen_pending = False
+        
+        # Interrupted replies keep what was already shown
+        for state in self.response_turns.values():
+            if state['message'] is not None:
+                self.ui.call(self.right_panel.finish_message, state['message'], False)
+        self.response_turns.clear()
+    
+    def get_response_backend(self):
+        """Chat backend, built on first use (offline echo without an API)"""
+        if self.response_backend is None:
+            from frontend.components import response_backend
+            config = self.secure_storage.load_config()
+            base_url = config.get('chat_api_base_url')
+            backend = None
+            if base_url or os.getenv('OPENAI_API_KEY'):
+                try:
+                    backend = response_backend.OpenAIResponseBackend(
+                        base_url=base_url,
+                        model=config.get('chat_model', 'gpt-4o-mini'),
+                        system_prompt=config.get('chat_system_prompt'),
+                        request_deadline=config.get('chat_deadline_seconds', 30)
+                    )
+                except Exception as e:
+                    print(f"⚠ Chat API unavailable, echoing replies: {e}")
+            if backend is None:
+                backend = response_backend.EchoResponseBackend()
+            backend.token_received.connect(self.on_response_token)
+            backend.response_finished.connect(self.on_response_finished)
+            backend.error_occurred.connect(self.on_response_error)
+            self.response_backend = backend
+        return self.response_backend
+    
+    def on_response_token(self, turn, text):
+        """Show a streamed token (GUI thread)"""
+        state = self.response_turns.get(turn)
+        if state is None:
+            return
+        if state['message'] is None:
+            # The first token is shown at once; later ones are batched per frame
+            state['message'] = self.right_panel.begin_message(is_user=False)
+            self.right_panel.append_to_message(state['message'], text)
+            first_token_ms = (time.perf_counter() - state['started']) * 1000
+            print(f"First token in {first_token_ms:.0f} ms")
+            self.show_state('speaking')
+            return
+        self.ui.append_text(
+            ('reply', turn),
+            lambda batch, message=state['message']: self.right_panel.append_to_message(message, batch),
+            text
+        )
+    
+    def on_response_finished(self, turn, reply):
+        """Finish a streamed reply"""
+        state = self.response_turns.pop(turn, None)
+        if state is None:
+            return
+        if state['message'] is not None:
+            # Queued behind the reply's last batched tokens
+            self.ui.call(self.right_panel.finish_message, state['message'], False)
+        state['scope'].finish()
+        self.end_response()
+    
+    def on_response_error(self, turn, message):
+        """Show a failed reply"""
+        state = self.response_turns.pop(turn, None)
+        if state is None:
+            return
+        if state['message'] is not None:
+            self.ui.call(self.right_panel.finish_message, state['message'], False)
+        self.ui.call(self.right_panel.add_message, f"⚠ No response: {message}", False)
+        state['scope'].finish("error")
+        self.end_response()
+    
+    def end_response(self):
+        """Return the waveform to listening or idle once no reply is streaming"""
+        if self.response_turns:
+            return
+        if self.is_listening:
+            self.show_state('listening')
+        else:
+            self.show_state('idle')
+    
+    def show_state(self, state):
+        """Set the waveform state on the next frame (latest state in a frame wins)"""
+        self.ui.set_state('waveform', self.center_panel.set_state, state)
+    
     def change_language(self, language_code: str):
         """Change voice recognition language"""
         self.current_language = language_code
@@ -296,42 +622,110 @@ class MAYAMainWindow(QMainWindow):
         self.start_voice_listening()
     
     def start_voice_listening(self, duration=5):
-        """Start listening for voice input"""
+        """Start listening for voice input, as a task of the current turn"""
         print("Starting voice listening...")
-        self.center_panel.set_state('listening')
-        self.voice_listener.start_listening(duration=duration)
+        listener = self.voice_listener
+        self.show_state('listening')
+        if not listener.begin_listening():
+            return
+        
+        if self.turn is None:
+            self.turn = self.runtime.new_turn()
+        self.listen_pending = True
+        self.listen_listener = listener
+        self.turn.spawn(self.listen_task(self.turn, listener, duration))
+    
+    async def listen_task(self, scope, listener, duration):
+        """Record and transcribe one utterance on a worker thread; cancellable"""
+        from frontend.components.audio_capture import ListenError
+        
+        cancel = threading.Event()
+        queued = tracer.now()
+        
+        def listen():
+            tracer.complete("queue wait", queued, cat="stt")
+            return listener.listen(duration, cancel)
+        
+        try:
+            text = await asyncio.to_thread(listen)
+        except asyncio.CancelledError:
+            # Abort the decode or upload; cancel_turn() already stopped the microphone
+            cancel.set()
+            raise
+        except ListenError as e:
+            self.ui.call(self.on_listen_result, scope, None, str(e))
+            return
+        self.ui.call(self.on_listen_result, scope, text, None)
+    
+    def on_listen_result(self, scope, text, error):
+        """Deliver a listen task's outcome unless its turn has been superseded"""
+        if scope is not self.turn or scope.cancelled:
+            return
+        self.listen_pending = False
+        if error is not None:
+            self.on_voice_error(error)
+        else:
+            self.on_transcription_ready(text)
     
     def on_transcription_ready(self, text: str):
         """Handle transcription result"""
         print(f"Transcription received: {text}")
         if text:
-            # Add transcribed text as user message
-            self.right_panel.add_message(text, is_user=True)
-            # Process it as if user typed it
-            self.on_message_sent(text)
+            with tracer.span("on_transcription_ready", cat="stt", chars=len(text)):
+                # Add transcribed text as user message
+                self.right_panel.add_message(text, is_user=True)
+                # Process it as if user typed it
+                self.on_message_sent(text)
         
         # Continue listening if mic is still unmuted
         if self.is_listening:
             self.start_voice_listening(duration=5)
     
+    def on_late_transcription_ready(self, text: str, captured_at: float):
+        """Show an utterance transcribed after reconnecting"""
+        if text:
+            # Only shown, not answered: the conversation has moved on since
+            captured = time.strftime('%H:%M', time.localtime(captured_at))
+            self.right_panel.add_message(f"[{captured}] {text}", is_user=True)
+    
     def on_listening_started(self):
         """Handle listening started"""
         print("Listening started...")
-        self.center_panel.set_state('listening')
+        self.show_state('listening')
     
     def on_listening_stopped(self):
         """Handle listening stopped"""
         print("Listening stopped")
-        self.center_panel.set_state('processing')
+        self.show_state('processing')
+    
+    def on_voice_model_ready(self, model_name: str):
+        """Resume listening once a reloaded model is ready"""
+        listener = self.voice_listener_local
+        if not self.awaiting_voice_model or not listener.is_model_loaded():
+            return
+        
+        self.awaiting_voice_model = False
+        if self.is_listening and self.voice_listener is listener:
+            self.start_voice_listening(duration=5)
     
     def on_voice_error(self, error_message: str):
         """Handle voice listener errors"""
         print(f"Voice error: {error_message}")
-        self.center_panel.set_state('idle')
+        self.show_state('idle')
     
     def close_application(self):
         """Close the application"""
         print("Closing application...")
+        if hasattr(self, 'stt_model_manager'):
+            self.stt_model_manager.shutdown()
+        for worker in ('face_worker', 'speech_worker'):
+            if hasattr(self, worker):
+                getattr(self, worker).close()
+        if getattr(self, 'conversation_log', None) is not None:
+            self.conversation_log.close()
+        print(self.ui.summary())
+        self.cancel_turn()  # Stops the microphone too
+        self.runtime.shutdown()
         self.close()
         QApplication.quit()
     
@@ -342,6 +736,7 @@ class MAYAMainWindow(QMainWindow):
         # Toggle the left panel's camera feed
         if hasattr(self, 'left_panel') and hasattr(self.left_panel, 'camera'):
             self.left_panel.camera.toggle_camera()
+            self.set_interactive('preview', self.left_panel.camera.is_camera_on)
     
     def on_mic_toggled(self, is_unmuted: bool):
         """Handle microphone toggle"""
@@ -351,11 +746,20 @@ class MAYAMainWindow(QMainWindow):
         if is_unmuted:
             # Start continuous voice listening
             self.is_listening = True
+            local = self.voice_listener_local
+            if self.voice_listener is local and not local.is_model_loaded():
+                # Model was unloaded while idle: reload, listening starts on model_ready
+                self.awaiting_voice_model = True
+                self.show_state('processing')
+                local.warm_up()
+                return
             self.start_voice_listening(duration=5)
         else:
-            # Stop voice listening
+            # Stop voice listening and drop the turn's transcription and reply
             self.is_listening = False
-            self.center_panel.set_state('idle')
+            self.awaiting_voice_model = False
+            self.cancel_turn()
+            self.show_state('idle')
 
 
 def main():
@@ -365,8 +769,35 @@ def main():
     parser = argparse.ArgumentParser(description='MAYA AI Assistant')
     parser.add_argument('--skip-auth', action='store_true', 
                        help='Skip face authentication (for development)')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Use the warm models of a running MAYA daemon (python -m maya.daemon)')
+    parser.add_argument('--startup-profile', action='store_true',
+                       help='Report import and init time per stage and module')
+    parser.add_argument('--startup-budget-ms', type=float, default=300,
+                       help='First-interactive-frame budget for --startup-profile')
+    parser.add_argument('--trace', nargs='?', const='maya_trace.json', metavar='PATH',
+                       help='Record voice turn and face auth spans to a Chrome trace (Perfetto)')
+    parser.add_argument('--profile', nargs='?', type=float, const=10, metavar='SECONDS',
+                       help='Write a sampled profile of the first SECONDS (Ctrl+Shift+P toggles one any time)')
+    parser.add_argument('--stall-ms', type=float, default=100,
+                       help='GUI-thread busy time reported as a stall, with its stack')
     args = parser.parse_args()
     
+    if args.trace:
+        tracer.enable(args.trace)
+    
+    from maya.startup import StartupProfiler
+    startup = StartupProfiler(STARTED, budget_ms=args.startup_budget_ms, enabled=args.startup_profile)
+    startup.install()
+    
+    daemon_client = None
+    if args.daemon:
+        from maya.daemon_client import DaemonClient
+        daemon_client = DaemonClient()
+        if daemon_client.ping() is None:
+            print("⚠ MAYA daemon not running, loading models in-process")
+            daemon_client = None
+    
     app = QApplication(sys.argv)
     app.setStyle("Fusion")  # Use Fusion style for better dark theme support
     
@@ -388,14 +819,44 @@ def main():
     splash.show()
     app.processEvents()
     
-    # Initialize window
-    window = MAYAMainWindow(skip_auth=args.skip_auth)
+    def show_progress(stage):
+        splash.showMessage(
+            f"{stage}...",
+            Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter,
+            QColor(160, 160, 170)
+        )
+        app.processEvents()
+    startup.on_stage = show_progress
+    
+    # One asyncio loop for per-turn work (on the Qt thread when qasync is installed)
+    from maya.async_runtime import AsyncRuntime
+    runtime = AsyncRuntime(app)
+    
+    # Initialize window (models keep loading in the background)
+    window = MAYAMainWindow(skip_auth=args.skip_auth, daemon_client=daemon_client, startup=startup,
+                            runtime=runtime)
     
     # Close splash and show window
     splash.finish(window)
     window.show()
+    QTimer.singleShot(0, startup.first_frame)  # Runs once the first frame is painted
+    
+    # Event-loop watchdog, and a sampled profile on demand
+    from frontend.components.stall_detector import StallDetector
+    from frontend.components.sampling_profiler import SampledProfiler
+    stall_detector = StallDetector(threshold_ms=args.stall_ms, parent=window)
+    QTimer.singleShot(0, stall_detector.start)
+    profiler = SampledProfiler()
+    QShortcut(QKeySequence("Ctrl+Shift+P"), window).activated.connect(profiler.toggle)
+    if args.profile:
+        profiler.start(seconds=args.profile)
     
-    sys.exit(app.exec())
+    exit_code = runtime.exec()
+    stall_detector.stop()
+    print(stall_detector.summary())
+    profiler.stop()
+    tracer.export()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
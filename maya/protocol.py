@@ -0,0 +1,125 @@
+"""
+MAYA Stream Protocol
+Length-prefixed binary frames shared by the streaming STT server, the
+inference daemon and their clients (Tauri shell, PyQt app)
+
+Frame layout (big-endian):
+    1 byte   frame type
+    4 bytes  payload length
+    N bytes  payload
+"""
+
+import json
+import struct
+import numpy as np
+
+# Client -> server
+FRAME_CONFIG = 0x01  # JSON: {"language": "en"}
+FRAME_AUDIO = 0x02   # PCM16 little-endian, mono, 16 kHz
+FRAME_END = 0x03     # Finish the current utterance (empty payload)
+FRAME_RECOGNIZE = 0x04   # Image -> RESULT {"match", "name", "confidence"}
+FRAME_DETECT = 0x05      # Image -> RESULT {"box": [x, y, w, h] or null}
+FRAME_ENROLL = 0x06      # Enrollment -> RESULT {"success"}
+FRAME_TRANSCRIBE = 0x07  # 2-byte language code + PCM16 -> RESULT {"text"}
+FRAME_PING = 0x08        # -> RESULT {"status", ...}
+
+# Server -> client
+FRAME_PARTIAL = 0x11  # UTF-8 partial transcript
+FRAME_FINAL = 0x12    # UTF-8 final transcript
+FRAME_ERROR = 0x13    # UTF-8 error message
+FRAME_RESULT = 0x14   # JSON reply to a request frame
+
+HEADER = struct.Struct(">BI")
+IMAGE_HEADER = struct.Struct(">HHB")  # height, width, channels
+MAX_PAYLOAD = 32 * 1024 * 1024  # Room for a batch of enrollment frames
+SAMPLE_RATE = 16000
+
+
+class ProtocolError(Exception):
+    """Malformed or oversized frame"""
+
+
+def encode_frame(frame_type, payload=b""):
+    """Build one frame"""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return HEADER.pack(frame_type, len(payload)) + payload
+
+
+def encode_json(frame_type, obj):
+    """Build one frame with a JSON payload"""
+    return encode_frame(frame_type, json.dumps(obj))
+
+
+def encode_image(frame):
+    """Pack a uint8 image (H x W or H x W x C, BGR) without any compression"""
+    frame = np.ascontiguousarray(frame, dtype=np.uint8)
+    channels = frame.shape[2] if frame.ndim == 3 else 1
+    return IMAGE_HEADER.pack(frame.shape[0], frame.shape[1], channels) + frame.tobytes()
+
+
+def decode_image(payload):
+    """Unpack an image packed by encode_image"""
+    height, width, channels = IMAGE_HEADER.unpack_from(payload)
+    pixels = np.frombuffer(payload, dtype=np.uint8, offset=IMAGE_HEADER.size)
+    if pixels.size != height * width * channels:
+        raise ProtocolError(f"Image of {pixels.size} bytes does not match {height}x{width}x{channels}")
+    shape = (height, width, channels) if channels > 1 else (height, width)
+    return pixels.reshape(shape)
+
+
+def encode_enrollment(name, frames):
+    """Pack a name and its enrollment frames"""
+    name_bytes = name.encode("utf-8")
+    parts = [struct.pack(">H", len(name_bytes)), name_bytes, struct.pack(">H", len(frames))]
+    for frame in frames:
+        image = encode_image(frame)
+        parts.append(struct.pack(">I", len(image)))
+        parts.append(image)
+    return b"".join(parts)
+
+
+def decode_enrollment(payload):
+    """Unpack an enrollment; returns (name, [frames])"""
+    (name_length,) = struct.unpack_from(">H", payload)
+    offset = 2 + name_length
+    name = payload[2:offset].decode("utf-8")
+    (count,) = struct.unpack_from(">H", payload, offset)
+    offset += 2
+
+    frames = []
+    for _ in range(count):
+        (length,) = struct.unpack_from(">I", payload, offset)
+        offset += 4
+        frames.append(decode_image(payload[offset:offset + length]))
+        offset += length
+    return name, frames
+
+
+def _read_exact(sock, size):
+    """Read exactly size bytes; returns None if the peer closed first"""
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock):
+    """
+    Read one frame from a socket (blocking)
+    Returns: (frame type, payload bytes), or None when the connection closed
+    """
+    header = _read_exact(sock, HEADER.size)
+    if header is None:
+        return None
+    frame_type, length = HEADER.unpack(header)
+    if length > MAX_PAYLOAD:
+        raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_PAYLOAD}")
+    payload = _read_exact(sock, length) if length else b""
+    if payload is None:
+        return None
+    return frame_type, payload
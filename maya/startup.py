@@ -0,0 +1,117 @@
+"""
+Startup Profiler for MAYA
+Times startup stages and the modules they import against a
+first-interactive-frame budget (python maya/main.py --startup-profile)
+"""
+
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupProfiler:
+    """Stage and import timings from process start to the first frame"""
+    
+    def __init__(self, started, budget_ms=300, enabled=False, on_stage=None):
+        """
+        Initialize profiler
+        
+        Args:
+            started: time.perf_counter() taken as early as possible in main.py
+            budget_ms: Target time to the first interactive frame
+            enabled: Record timings (stages still reach on_stage when disabled)
+            on_stage: Called with each stage name, e.g. to update the splash
+        """
+        self.started = started
+        self.budget_ms = budget_ms
+        self.enabled = enabled
+        self.on_stage = on_stage
+        self.stages = []  # (name, ms)
+        self.imports = {}  # top-level module -> [inclusive ms, self ms]
+        self.first_frame_ms = None
+        self._original_import = None
+        self._local = threading.local()
+    
+    def install(self):
+        """Start timing imports (no-op unless enabled)"""
+        if not self.enabled or self._original_import is not None:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        self.stages.append(("interpreter + Qt import", self.elapsed_ms()))
+    
+    def uninstall(self):
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+    
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+    
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original_import(name, globals, locals, fromlist, level)
+        
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            else:
+                # Only imports made directly by MAYA code are reported
+                entry = self.imports.setdefault(name.split(".")[0], [0.0, 0.0])
+                entry[0] += elapsed
+                entry[1] += elapsed - children
+    
+    @contextmanager
+    def stage(self, name):
+        """Time one startup stage"""
+        if self.on_stage:
+            self.on_stage(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                self.stages.append((name, (time.perf_counter() - start) * 1000))
+    
+    def first_frame(self):
+        """Record the first interactive frame and print the report"""
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = self.elapsed_ms()
+        self.on_stage = None  # The splash is gone
+        if self.enabled:
+            self.uninstall()
+            self.report()
+    
+    def report(self, top=12):
+        """Print stages and the slowest imports against the budget"""
+        budget = self.budget_ms
+        print("\n" + "=" * 62)
+        print(f"  Startup profile (budget {budget:.0f} ms to first frame)")
+        print("=" * 62)
+        for name, ms in self.stages:
+            print(f"  {name:<36}{ms:>9.1f} ms{ms / budget:>9.0%}")
+        
+        if self.imports:
+            print("-" * 62)
+            print(f"  {'import (inclusive / self)':<36}")
+            slowest = sorted(self.imports.items(), key=lambda item: item[1][0], reverse=True)
+            for name, (inclusive, own) in slowest[:top]:
+                print(f"  {name:<28}{inclusive:>9.1f}{own:>9.1f} ms{inclusive / budget:>7.0%}")
+        
+        print("-" * 62)
+        if self.first_frame_ms is not None:
+            mark = "✓" if self.first_frame_ms <= budget else "⚠"
+            print(f"  {mark} first interactive frame at {self.first_frame_ms:.0f} ms")
+        print("=" * 62 + "\n")
@@ -0,0 +1,141 @@
+"""
+MAYA Streaming STT Server
+Local socket server that gives the Tauri shell the same Whisper pipeline
+as the PyQt app: PCM chunks in, partial and final transcripts out
+
+Usage:
+    python -m maya.stt_server --port 8765 --model base
+"""
+
+import argparse
+import json
+import socket
+import socketserver
+import sys
+import threading
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from maya.protocol import (
+    FRAME_AUDIO, FRAME_CONFIG, FRAME_END, FRAME_ERROR, FRAME_FINAL, FRAME_PARTIAL,
+    ProtocolError, encode_frame, read_frame,
+)
+
+DEFAULT_PORT = 8765
+
+
+class STTStreamHandler(socketserver.BaseRequestHandler):
+    """One streaming session per connection"""
+    
+    listener = None  # Shared VoiceListener, set by serve(); decodes per model are serialized
+    
+    def setup(self):
+        if self.request.family in (socket.AF_INET, socket.AF_INET6):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+    
+    def send(self, frame_type, text):
+        try:
+            with self._send_lock:
+                self.request.sendall(encode_frame(frame_type, text))
+        except OSError:
+            pass  # Client went away; the read loop ends the session
+    
+    def handle(self):
+        peer = "%s:%s" % self.client_address[:2] if self.client_address else "local client"
+        print(f"Connection opened from {peer}")
+        self.transcriber = None
+        self.language = None  # This connection's language (default: the listener's)
+        
+        try:
+            while True:
+                frame = read_frame(self.request)
+                if frame is None:
+                    break
+                self.dispatch(*frame)
+        except (ProtocolError, ValueError) as e:
+            self.send(FRAME_ERROR, f"Protocol error: {e}")
+        except OSError:
+            pass
+        finally:
+            if self.transcriber is not None:
+                # Deliver the final transcript of whatever was still buffered
+                self.transcriber.close()
+            print(f"Connection closed from {peer}")
+    
+    def dispatch(self, frame_type, payload):
+        """Handle one frame from the client"""
+        if frame_type == FRAME_AUDIO:
+            self.stream().feed(payload)
+        elif frame_type == FRAME_END:
+            self.stream().finish()
+        elif frame_type == FRAME_CONFIG:
+            config = json.loads(payload or b"{}")
+            if "language" in config:
+                # Per connection: other clients keep their own language
+                self.language = config["language"]
+                if self.transcriber is not None:
+                    self.transcriber.language = self.language
+        else:
+            self.send(FRAME_ERROR, f"Unknown frame type {frame_type:#x}")
+    
+    def stream(self):
+        """Streaming transcriber for this connection, created on first audio"""
+        if self.transcriber is None:
+            from frontend.components.streaming_transcriber import StreamingTranscriber
+            self.transcriber = StreamingTranscriber(
+                self.listener,
+                on_partial=lambda text: self.send(FRAME_PARTIAL, text),
+                on_final=lambda text: self.send(FRAME_FINAL, text),
+                on_error=lambda message: self.send(FRAME_ERROR, message),
+                language=self.language,
+            )
+        return self.transcriber
+
+
+class STTServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def serve(listener, host="127.0.0.1", port=DEFAULT_PORT):
+    """Serve streaming transcription until interrupted"""
+    STTStreamHandler.listener = listener
+    with STTServer((host, port), STTStreamHandler) as server:
+        print(f"Streaming STT server on {host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    """Server entry point"""
+    from frontend.components.voice_listener import DECODING_PROFILES, VoiceListener
+    
+    parser = argparse.ArgumentParser(description='MAYA streaming STT server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model', default='base', help='Whisper model size')
+    parser.add_argument('--language', default='en', choices=['en', 'bn'])
+    parser.add_argument('--profile', default='interactive', choices=list(DECODING_PROFILES),
+                        help='Decoding profile (interactive keeps partials fast)')
+    parser.add_argument('--quantize', action='store_true', help='Use int8 Whisper weights')
+    args = parser.parse_args()
+    
+    listener = VoiceListener(
+        model_size=args.model,
+        language=args.language,
+        quantize=args.quantize,
+        decoding_profile=args.profile
+    )
+    listener.error_occurred.connect(lambda message: print(f"Error: {message}"))
+    listener.load_model()
+    
+    serve(listener, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+STT Benchmark for MAYA
+Compares float32 and int8-quantized local Whisper on real-time factor,
+word error rate and resident memory
+
+Usage:
+    python scripts/benchmark_stt.py <audio_dir> [--models base small]
+
+<audio_dir> holds audio clips (any format ffmpeg reads) with a reference
+transcript next to each one: clip.wav + clip.txt
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import whisper
+
+from frontend.components.voice_listener import VoiceListener, DECODING_PROFILES, decoding_options
+
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = {'.wav', '.flac', '.mp3', '.ogg', '.m4a', '.webm'}
+
+
+def resident_memory_mb():
+    """Current resident set size of this process in MB (Linux/macOS)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        import resource
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes on Linux
+        return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def normalize_words(text):
+    """Lowercase and strip punctuation for WER scoring"""
+    cleaned = ''.join(c if c.isalnum() or c.isspace() else ' ' for c in text.lower())
+    return cleaned.split()
+
+
+def word_error_rate(reference, hypothesis):
+    """
+    Word error rate via Levenshtein distance over words
+    Returns: (edits, reference word count)
+    """
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            cost = 0 if ref_word == hyp_word else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        previous = current
+    
+    return previous[-1], len(ref)
+
+
+def load_dataset(audio_dir):
+    """Load (name, audio, reference) triples from a directory"""
+    samples = []
+    for path in sorted(Path(audio_dir).iterdir()):
+        if path.suffix.lower() not in AUDIO_EXTENSIONS:
+            continue
+        reference_file = path.with_suffix('.txt')
+        if not reference_file.exists():
+            print(f"⚠ Skipping {path.name}: no reference transcript")
+            continue
+        samples.append((
+            path.name,
+            whisper.load_audio(str(path)),
+            reference_file.read_text(encoding='utf-8').strip()
+        ))
+    return samples
+
+
+def benchmark(model_size, quantize, samples, language, profile):
+    """Run one model variant over the dataset"""
+    gc.collect()
+    rss_before = resident_memory_mb()
+    
+    listener = VoiceListener(model_size=model_size, language=language, quantize=quantize)
+    start = time.perf_counter()
+    listener.load_model()
+    load_time = time.perf_counter() - start
+    if listener.model is None:
+        raise RuntimeError(f"Failed to load {model_size}")
+    
+    rss_model = resident_memory_mb() - rss_before
+    
+    options = decoding_options(profile)
+    
+    # Warm-up pass so one-off allocations don't skew the first clip
+    listener.model.transcribe(samples[0][1], language=language, fp16=False, **options)
+    
+    audio_seconds = 0.0
+    decode_seconds = 0.0
+    edits = 0
+    words = 0
+    for name, audio, reference in samples:
+        start = time.perf_counter()
+        result = listener.model.transcribe(audio, language=language, fp16=False, **options)
+        decode_seconds += time.perf_counter() - start
+        audio_seconds += len(audio) / SAMPLE_RATE
+        
+        clip_edits, clip_words = word_error_rate(reference, result["text"])
+        edits += clip_edits
+        words += clip_words
+    
+    stats = {
+        "variant": f"{listener.model_name_for(language)} {'int8' if quantize else 'fp32'}",
+        "load_s": load_time,
+        "rss_mb": rss_model,
+        "rtf": decode_seconds / audio_seconds if audio_seconds else 0.0,
+        "wer": edits / words if words else 0.0,
+    }
+    
+    del listener
+    gc.collect()
+    return stats
+
+
+def main():
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(description='Benchmark local Whisper fp32 vs int8')
+    parser.add_argument('audio_dir', help='Directory of clips with .txt references')
+    parser.add_argument('--models', nargs='+', default=['base', 'small'],
+                        help='Whisper model sizes to benchmark')
+    parser.add_argument('--language', default='en', help="Language code ('en' or 'bn')")
+    parser.add_argument('--profile', default='balanced', choices=sorted(DECODING_PROFILES),
+                        help='Decoding profile to benchmark')
+    args = parser.parse_args()
+    
+    samples = load_dataset(args.audio_dir)
+    if not samples:
+        print("❌ No audio clips with reference transcripts found")
+        sys.exit(1)
+    
+    total_audio = sum(len(audio) for _, audio, _ in samples) / SAMPLE_RATE
+    print(f"\nBenchmarking {len(samples)} clips ({total_audio:.1f}s of audio), "
+          f"profile '{args.profile}'\n")
+    
+    results = []
+    for model_size in args.models:
+        for quantize in (False, True):
+            stats = benchmark(model_size, quantize, samples, args.language, args.profile)
+            results.append(stats)
+            print(f"✓ {stats['variant']} done")
+    
+    print("\n" + "=" * 62)
+    print(f"  {'variant':<14}{'load (s)':>10}{'RSS (MB)':>10}{'RTF':>10}{'WER':>10}")
+    print("=" * 62)
+    for stats in results:
+        print(f"  {stats['variant']:<14}{stats['load_s']:>10.2f}{stats['rss_mb']:>10.0f}"
+              f"{stats['rtf']:>10.3f}{stats['wer']:>10.1%}")
+    print("=" * 62 + "\n")
+
+
+if __name__ == "__main__":
+    main()
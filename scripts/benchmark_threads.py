@@ -0,0 +1,268 @@
+"""
+Thread Scaling Benchmark for MAYA
+Measures how the capture, face and speech workloads scale with threads
+in one process, to compare the free-threaded (no-GIL) CPython build
+against the standard one
+
+Usage:
+    python3.13t scripts/benchmark_threads.py --frames recordings/face.mp4 --json ft.json
+    python3.13 scripts/benchmark_threads.py --frames recordings/face.mp4 --compare ft.json
+
+Each workload runs with 1, 2, 4, ... threads for --duration seconds;
+speedup is throughput relative to one thread. A final mixed run starts
+one thread per workload at once and reports how much of its solo
+throughput each keeps.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from frontend.components.face_recognizer import EmbeddingGallery, FaceRecognizer
+from frontend.components.resource_governor import available_cpus, set_thread_counts
+from scripts.loadgen import load_clips, load_frames
+
+
+def gil_enabled():
+    """False only on a free-threaded build running with the GIL disabled"""
+    check = getattr(sys, "_is_gil_enabled", None)
+    return check() if check else True
+
+
+class CaptureWork:
+    """Preview path: mirror, convert and downscale each frame"""
+    
+    name = "capture"
+    
+    def __init__(self, frames, args):
+        self.frames = frames
+    
+    def make_state(self):
+        return None
+    
+    def step(self, state, index):
+        frame = cv2.flip(self.frames[index % len(self.frames)], 1)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        cv2.resize(rgb, (320, 240))
+
+
+class FaceWork:
+    """Detection and embedding with one FaceRecognizer per thread"""
+    
+    name = "face"
+    
+    def __init__(self, frames, args):
+        self.frames = frames
+    
+    def make_state(self):
+        return FaceRecognizer()
+    
+    def step(self, recognizer, index):
+        recognizer.recognize(self.frames[index % len(self.frames)])
+
+
+class MatchWork:
+    """Gallery matching and result bookkeeping: small numpy ops, mostly Python"""
+    
+    name = "match"
+    
+    def __init__(self, frames, args):
+        rng = np.random.default_rng(0)
+        self.gallery = EmbeddingGallery(
+            {f"user{i}": rng.standard_normal(128).astype(np.float32) for i in range(args.gallery)}
+        )
+        self.probes = rng.standard_normal((64, 128)).astype(np.float32)
+    
+    def make_state(self):
+        return None
+    
+    def step(self, state, index):
+        name, similarity = self.gallery.best_match(self.probes[index % len(self.probes)])
+        return {"match": similarity >= 0.6, "name": name, "confidence": similarity}
+
+
+class SpeechWork:
+    """Whisper decodes with one model per thread, one PyTorch thread per caller"""
+    
+    name = "stt"
+    
+    def __init__(self, frames, args):
+        from frontend.components.voice_listener import decoding_options
+        
+        self.model_name = args.model
+        self.clips = load_clips(args.audio)
+        self.options = decoding_options("interactive")
+        self.language = args.language
+    
+    def make_state(self):
+        # A Whisper model keeps its kv-cache in hooks on its own modules,
+        # so concurrent decodes need a model each
+        import whisper
+        return whisper.load_model(self.model_name)
+    
+    def step(self, model, index):
+        model.transcribe(self.clips[index % len(self.clips)], language=self.language,
+                         fp16=False, **self.options)
+
+
+def run_threads(workloads, threads, duration):
+    """
+    Run each workload on `threads` threads at once for `duration` seconds
+    Returns: {workload name: operations per second}
+    """
+    counts = {work.name: [0] * threads for work in workloads}
+    barrier = threading.Barrier(len(workloads) * threads + 1)
+    stop = threading.Event()
+    errors = []
+    
+    def worker(work, slot):
+        try:
+            state = work.make_state()
+            work.step(state, slot)  # Warm up outside the timed window
+        except Exception as e:
+            errors.append(f"{work.name}: {e}")
+            barrier.abort()
+            return
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            return
+        index = slot
+        try:
+            while not stop.is_set():
+                work.step(state, index)
+                counts[work.name][slot] += 1
+                index += threads
+        except Exception as e:
+            errors.append(f"{work.name} thread {slot}: {e}")
+    
+    pool = [
+        threading.Thread(target=worker, args=(work, slot), daemon=True)
+        for work in workloads for slot in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    try:
+        barrier.wait()
+    except threading.BrokenBarrierError:
+        raise SystemExit(f"❌ Workload failed to start: {'; '.join(errors)}")
+    
+    start = time.perf_counter()
+    time.sleep(duration)
+    stop.set()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        # A thread that died would quietly lower the measured throughput
+        raise SystemExit(f"❌ Workload failed during the run: {'; '.join(errors)}")
+    return {name: sum(slots) / elapsed for name, slots in counts.items()}
+
+
+def scaling(work, thread_counts, duration):
+    """Throughput and speedup of one workload per thread count"""
+    rows = []
+    base = None
+    for threads in thread_counts:
+        rate = run_threads([work], threads, duration)[work.name]
+        base = base or rate
+        rows.append({
+            "threads": threads,
+            "ops_per_s": rate,
+            "speedup": rate / base if base else 0.0,
+        })
+        print(f"  {work.name:<8}{threads:>4} threads {rate:>10.1f} ops/s  x{rows[-1]['speedup']:.2f}")
+    return rows
+
+
+def print_comparison(results, other):
+    """Side-by-side speedups against a saved run of the other build"""
+    label = "no-GIL" if not results["gil_enabled"] else "GIL"
+    other_label = "no-GIL" if not other["gil_enabled"] else "GIL"
+    print("\n" + "=" * 62)
+    print(f"  {'workload':<10}{'threads':>8}{label + ' x':>14}{other_label + ' x':>14}")
+    print("=" * 62)
+    for name, rows in results["scaling"].items():
+        theirs = {row["threads"]: row for row in other["scaling"].get(name, [])}
+        for row in rows:
+            match = theirs.get(row["threads"])
+            other_speedup = f"{match['speedup']:.2f}" if match else "-"
+            print(f"  {name:<10}{row['threads']:>8}{row['speedup']:>14.2f}{other_speedup:>14}")
+    print("=" * 62 + "\n")
+
+
+def main():
+    """Benchmark entry point"""
+    parser = argparse.ArgumentParser(description='Thread scaling of the MAYA inference pipeline')
+    parser.add_argument('--frames', default=None, help='Video file or image directory')
+    parser.add_argument('--audio', default=None, help='Directory of speech clips (with --model)')
+    parser.add_argument('--model', default=None,
+                        help='Whisper model size; adds the STT workload (e.g. tiny)')
+    parser.add_argument('--language', default='en', help="Language code ('en' or 'bn')")
+    parser.add_argument('--workloads', nargs='+', default=['capture', 'face', 'match', 'stt'],
+                        help='Workloads to run')
+    parser.add_argument('--threads', nargs='+', type=int, default=None,
+                        help='Thread counts (default: powers of two up to the core count)')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per measurement')
+    parser.add_argument('--gallery', type=int, default=50, help='Enrolled faces for the match workload')
+    parser.add_argument('--json', default=None, help='Write results to this file')
+    parser.add_argument('--compare', default=None, help='Results file from the other build')
+    args = parser.parse_args()
+    
+    cores = len(available_cpus())
+    thread_counts = args.threads or sorted({1 << i for i in range(cores.bit_length()) if 1 << i <= cores} | {cores})
+    
+    # Library pools stay at one thread so any scaling comes from Python threads
+    set_thread_counts(cv2_threads=1, torch_threads=1 if args.model else None)
+    
+    print(f"\nPython {sys.version.split()[0]}, GIL {'enabled' if gil_enabled() else 'disabled'}, "
+          f"{cores} cores\n")
+    
+    frames = load_frames(args.frames, limit=120)
+    kinds = {work.name: work for work in (CaptureWork, FaceWork, MatchWork, SpeechWork)}
+    workloads = []
+    for name in args.workloads:
+        if name == "stt" and not args.model:
+            continue
+        workloads.append(kinds[name](frames, args))
+    
+    results = {
+        "python": sys.version.split()[0],
+        "gil_enabled": gil_enabled(),
+        "cores": cores,
+        "scaling": {},
+        "mixed": {},
+    }
+    for work in workloads:
+        results["scaling"][work.name] = scaling(work, thread_counts, args.duration)
+    
+    if len(workloads) > 1:
+        mixed = run_threads(workloads, 1, args.duration)
+        print("\nMixed (one thread per workload):")
+        for work in workloads:
+            solo = results["scaling"][work.name][0]["ops_per_s"]
+            kept = mixed[work.name] / solo if solo else 0.0
+            results["mixed"][work.name] = {"ops_per_s": mixed[work.name], "of_solo": kept}
+            print(f"  {work.name:<8}{mixed[work.name]:>10.1f} ops/s  {kept:.0%} of solo")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Results written to {args.json}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
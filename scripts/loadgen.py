@@ -0,0 +1,377 @@
+"""
+Load Generator for MAYA
+Drives N simulated kiosk sessions, each replaying recorded camera frames
+through its own FaceRecognizer and recorded utterances through its own
+VoiceListener, and finds the concurrency at which one machine saturates
+
+Usage:
+    python scripts/loadgen.py --frames recordings/face.mp4 --audio recordings/speech \\
+        --sessions 1 2 4 8 --duration 60
+
+--frames is a video file or a directory of images; --audio is a directory
+of clips (any format ffmpeg reads). No camera or microphone is needed.
+Arrivals are open-loop: each session asks for a recognition every 1/fps
+seconds and a transcription every --utterance-interval seconds whether or
+not the previous one finished, so queueing delay shows up as it would at a
+real kiosk.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+SAMPLE_RATE = 16000
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp'}
+AUDIO_EXTENSIONS = {'.wav', '.flac', '.mp3', '.ogg', '.m4a', '.webm'}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers (None if empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+def resident_memory_mb():
+    """Current resident set size of this process in MB (Linux)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError):
+        return 0.0
+
+
+def load_frames(source, limit=300):
+    """Load BGR frames from a video file or an image directory"""
+    if source is None:
+        print("⚠ No --frames given, replaying synthetic frames (no faces, so "
+              "recognition stops after detection)")
+        rng = np.random.default_rng(0)
+        return [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(30)]
+    
+    path = Path(source)
+    frames = []
+    if path.is_dir():
+        for image_path in sorted(path.iterdir()):
+            if image_path.suffix.lower() in IMAGE_EXTENSIONS:
+                frame = cv2.imread(str(image_path))
+                if frame is not None:
+                    frames.append(frame)
+            if len(frames) >= limit:
+                break
+    else:
+        capture = cv2.VideoCapture(str(path))
+        while len(frames) < limit:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame)
+        capture.release()
+    
+    if not frames:
+        raise SystemExit(f"❌ No frames found in {source}")
+    return frames
+
+
+def load_clips(audio_dir):
+    """Load float32 16 kHz clips from a directory"""
+    if audio_dir is None:
+        print("⚠ No --audio given, replaying 3 s of synthetic noise")
+        rng = np.random.default_rng(0)
+        return [(rng.standard_normal(3 * SAMPLE_RATE) * 0.05).astype(np.float32)]
+    
+    import whisper
+    clips = [
+        whisper.load_audio(str(path))
+        for path in sorted(Path(audio_dir).iterdir())
+        if path.suffix.lower() in AUDIO_EXTENSIONS
+    ]
+    if not clips:
+        raise SystemExit(f"❌ No audio clips found in {audio_dir}")
+    return clips
+
+
+class Session:
+    """One simulated kiosk: its own recognizer and listener"""
+    
+    def __init__(self, index, frames, clips, args, model_manager=None):
+        from frontend.components.face_recognizer import FaceRecognizer
+        from frontend.components.secure_storage import SecureStorage
+        from frontend.components.voice_listener import VoiceListener
+        
+        self.index = index
+        self.frames = frames
+        self.clips = clips
+        self.args = args
+        self.samples = []  # (kind, scheduled, started, finished, ok)
+        self.backlog = {"face": 0, "speech": 0}
+        self._lock = threading.Lock()
+        
+        # Enrolled faces are read once; the load generator never enrolls
+        self.face_recognizer = FaceRecognizer(store=SecureStorage().embedding_store())
+        self.voice_listener = VoiceListener(
+            model_size=args.model,
+            language=args.language,
+            quantize=args.quantize,
+            decoding_profile=args.profile,
+            model_manager=model_manager
+        )
+        self.voice_listener.load_model()
+    
+    def warm_up(self):
+        """One call down each path so first-call costs stay out of the numbers"""
+        self.face_recognizer.recognize(self.frames[0])
+        self.voice_listener.transcribe(self.clips[0])
+    
+    def run(self, start, duration):
+        """Replay both streams from start for duration seconds (blocking)"""
+        end = start + duration
+        # Stagger sessions so their arrivals do not line up artificially
+        offset = (self.index * 0.137) % 1.0
+        streams = [
+            threading.Thread(target=self._replay, args=(
+                "face", start + offset / self.args.fps, 1.0 / self.args.fps, end,
+                lambda i: self.face_recognizer.recognize(self.frames[i % len(self.frames)])
+            )),
+            threading.Thread(target=self._replay, args=(
+                "speech", start + offset * self.args.utterance_interval,
+                self.args.utterance_interval, end,
+                lambda i: self.voice_listener.transcribe(self.clips[i % len(self.clips)])
+            )),
+        ]
+        for thread in streams:
+            thread.start()
+        for thread in streams:
+            thread.join()
+        return self.samples, self.backlog
+    
+    def _replay(self, kind, first, interval, end, call):
+        """Serve arrivals in order; lateness becomes queueing delay"""
+        i = 0
+        while True:
+            scheduled = first + i * interval
+            if scheduled >= end:
+                return
+            
+            now = time.monotonic()
+            if now >= end:
+                # Arrivals that never got served before the run ended
+                with self._lock:
+                    self.backlog[kind] += int((end - scheduled) / interval) + 1
+                return
+            if now < scheduled:
+                time.sleep(scheduled - now)
+            
+            started = time.monotonic()
+            try:
+                call(i)
+                ok = True
+            except Exception as e:
+                print(f"Session {self.index} {kind} error: {e}")
+                ok = False
+            finished = time.monotonic()
+            
+            with self._lock:
+                self.samples.append((kind, scheduled, started, finished, ok))
+            i += 1
+
+
+def _process_session(index, frames, clips, args, barrier, start_value, results):
+    """Entry point of one session process"""
+    session = Session(index, frames, clips, args)
+    session.warm_up()
+    barrier.wait()
+    while start_value.value == 0.0:
+        time.sleep(0.001)
+    samples, backlog = session.run(start_value.value, args.duration)
+    results.put((samples, backlog, resident_memory_mb()))
+
+
+def run_level(count, frames, clips, args):
+    """Run count sessions concurrently; returns (samples, backlog, rss MB)"""
+    if args.mode == "processes":
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(count + 1)
+        start_value = context.Value('d', 0.0)
+        results = context.Queue()
+        workers = [
+            context.Process(target=_process_session,
+                            args=(i, frames, clips, args, barrier, start_value, results))
+            for i in range(count)
+        ]
+        for worker in workers:
+            worker.start()
+        barrier.wait()  # Every session loaded and warm
+        # CLOCK_MONOTONIC is system-wide on Linux, so children share this start time
+        start_value.value = time.monotonic() + 0.5
+        
+        collected = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        samples = [sample for result in collected for sample in result[0]]
+        backlog = {kind: sum(result[1][kind] for result in collected) for kind in ("face", "speech")}
+        return samples, backlog, sum(result[2] for result in collected)
+    
+    manager = None
+    if args.shared_models:
+        # VoiceListener.transcribe holds the model's decode lock: a Whisper
+        # model cannot run two decodes at once without corrupting its kv-cache
+        from frontend.components.stt_model_manager import STTModelManager
+        manager = STTModelManager(budget_mb=0, idle_timeout=0)
+    
+    sessions = [Session(i, frames, clips, args, manager) for i in range(count)]
+    for session in sessions:
+        session.warm_up()
+    
+    start = time.monotonic() + 0.5
+    outcomes = [None] * count
+    
+    def run(i):
+        outcomes[i] = sessions[i].run(start, args.duration)
+    
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    samples = [sample for outcome in outcomes for sample in outcome[0]]
+    backlog = {kind: sum(outcome[1][kind] for outcome in outcomes) for kind in ("face", "speech")}
+    return samples, backlog, resident_memory_mb()
+
+
+def summarize(count, samples, backlog, rss_mb, args):
+    """Per-kind throughput and latency for one concurrency level"""
+    offered = {
+        "face": count * args.fps * args.duration,
+        "speech": count * args.duration / args.utterance_interval,
+    }
+    level = {"sessions": count, "rss_mb": rss_mb}
+    
+    for kind in ("face", "speech"):
+        done = [s for s in samples if s[0] == kind and s[4]]
+        queue_delay = [started - scheduled for _, scheduled, started, _, _ in done]
+        latency = [finished - scheduled for _, scheduled, _, finished, _ in done]
+        service = [finished - started for _, _, started, finished, _ in done]
+        level[kind] = {
+            "offered": offered[kind],
+            "completed": len(done),
+            "errors": sum(1 for s in samples if s[0] == kind and not s[4]),
+            "backlog": backlog[kind],
+            "throughput": len(done) / args.duration,
+            "served_fraction": len(done) / offered[kind] if offered[kind] else 1.0,
+            "queue_p50": percentile(queue_delay, 0.50),
+            "queue_p99": percentile(queue_delay, 0.99),
+            "latency_p50": percentile(latency, 0.50),
+            "latency_p99": percentile(latency, 0.99),
+            "service_p50": percentile(service, 0.50),
+        }
+    
+    # Saturated once either stream falls behind its arrivals
+    level["saturated"] = any(
+        level[kind]["served_fraction"] < args.min_served
+        or (level[kind]["queue_p99"] or 0.0) > args.max_queue_delay
+        for kind in ("face", "speech")
+    )
+    return level
+
+
+def print_report(levels, args):
+    """Print the capacity table and the saturation point"""
+    def ms(value):
+        return f"{value * 1000:.0f}" if value is not None else "-"
+    
+    print("\n" + "=" * 100)
+    print(f"  {'sessions':>8} | {'face/s':>7}{'queue p99':>11}{'lat p50':>9}{'lat p99':>9} | "
+          f"{'utt/s':>6}{'queue p99':>11}{'lat p50':>9}{'lat p99':>9} | {'RSS MB':>7}")
+    print("=" * 100)
+    for level in levels:
+        face, speech = level["face"], level["speech"]
+        flag = "  ← saturated" if level["saturated"] else ""
+        print(f"  {level['sessions']:>8} | {face['throughput']:>7.1f}{ms(face['queue_p99']):>11}"
+              f"{ms(face['latency_p50']):>9}{ms(face['latency_p99']):>9} | "
+              f"{speech['throughput']:>6.2f}{ms(speech['queue_p99']):>11}"
+              f"{ms(speech['latency_p50']):>9}{ms(speech['latency_p99']):>9} | "
+              f"{level['rss_mb']:>7.0f}{flag}")
+    print("=" * 100)
+    print("  latencies in ms, measured from each request's scheduled arrival\n")
+    
+    saturated = [level["sessions"] for level in levels if level["saturated"]]
+    healthy = [level["sessions"] for level in levels if not level["saturated"]]
+    if saturated:
+        capacity = max((n for n in healthy if n < saturated[0]), default=0)
+        print(f"Saturation point: {saturated[0]} sessions "
+              f"(capacity ≈ {capacity} sessions at {args.fps:g} fps and one utterance "
+              f"every {args.utterance_interval:g}s)")
+    else:
+        print(f"No saturation up to {levels[-1]['sessions']} sessions; try higher --sessions")
+
+
+def main():
+    """Load generator entry point"""
+    parser = argparse.ArgumentParser(description='MAYA multi-session capacity benchmark')
+    parser.add_argument('--frames', help='Video file or image directory to replay')
+    parser.add_argument('--audio', help='Directory of utterance clips to replay')
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help='Concurrency levels to run, in order')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds per level')
+    parser.add_argument('--fps', type=float, default=10, help='Recognitions per second per session')
+    parser.add_argument('--utterance-interval', type=float, default=6,
+                        help='Seconds between utterances per session')
+    parser.add_argument('--mode', choices=['threads', 'processes'], default='threads',
+                        help='Run sessions as threads of one process or as separate processes')
+    parser.add_argument('--shared-models', action='store_true',
+                        help='Threads mode: sessions share one set of Whisper weights; '
+                             'decodes on it run one at a time, so the wait shows up as queueing')
+    parser.add_argument('--model', default='base', help='Whisper model size')
+    parser.add_argument('--language', default='en', choices=['en', 'bn'])
+    parser.add_argument('--profile', default='interactive', help='Decoding profile')
+    parser.add_argument('--quantize', action='store_true', help='Use int8 Whisper weights')
+    parser.add_argument('--min-served', type=float, default=0.95,
+                        help='Saturated when less than this fraction of arrivals is served')
+    parser.add_argument('--max-queue-delay', type=float, default=1.0,
+                        help='Saturated when p99 queueing delay exceeds this many seconds')
+    parser.add_argument('--stop-at-saturation', action='store_true',
+                        help='Skip higher levels once one saturates')
+    parser.add_argument('--json', help='Write the per-level results to this file')
+    args = parser.parse_args()
+    
+    frames = load_frames(args.frames)
+    clips = load_clips(args.audio)
+    print(f"\nReplaying {len(frames)} frames and {len(clips)} clips on {os.cpu_count()} CPUs, "
+          f"{args.duration:g}s per level ({args.mode})\n")
+    
+    levels = []
+    for count in args.sessions:
+        print(f"→ {count} session(s)...")
+        samples, backlog, rss_mb = run_level(count, frames, clips, args)
+        level = summarize(count, samples, backlog, rss_mb, args)
+        levels.append(level)
+        print(f"✓ {count} session(s): {level['face']['throughput']:.1f} recognitions/s, "
+              f"{level['speech']['throughput']:.2f} transcriptions/s")
+        if level["saturated"] and args.stop_at_saturation:
+            break
+    
+    print_report(levels, args)
+    
+    if args.json:
+        Path(args.json).write_text(json.dumps({"args": vars(args), "levels": levels}, indent=2))
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
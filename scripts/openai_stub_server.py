@@ -0,0 +1,312 @@
+"""
+OpenAI-compatible Stub Server for MAYA
+Local stand-in for the cloud transcription and chat APIs, so upload
+latency, reply streaming and failure handling can be tested offline
+
+Usage:
+    python scripts/openai_stub_server.py --port 8089 --latency-ms 300 --failure-rate 0.2
+    python scripts/openai_stub_server.py --outage-every 60 --outage-duration 20
+
+Outages can also be triggered by hand:
+    curl -X POST "http://127.0.0.1:8089/control/outage?seconds=30"
+    curl -X POST http://127.0.0.1:8089/control/recover
+
+Then point MAYA at it with "stt_api_base_url": "http://127.0.0.1:8089/v1"
+(transcription) and "chat_api_base_url": "http://127.0.0.1:8089/v1"
+(streamed replies) in ~/.maya/secure/config.json (any API key works).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubState:
+    """Runtime behaviour and counters shared by all handler threads"""
+    
+    def __init__(self, args):
+        self.text = args.text
+        self.reply = args.reply
+        self.token_delay = args.token_ms / 1000
+        self.latency = args.latency_ms / 1000
+        self.jitter = args.jitter_ms / 1000
+        self.failure_rate = args.failure_rate
+        self.hang_rate = args.hang_rate
+        self.drop_rate = args.drop_rate
+        self.outage_mode = args.outage_mode
+        self.outage_every = args.outage_every
+        self.outage_duration = args.outage_duration
+        self.outage_until = 0.0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "chat_requests": 0,
+            "failures": 0,
+            "hangs": 0,
+            "drops": 0,
+            "outage_rejections": 0,
+            "bytes_received": 0,
+            "formats": {},
+        }
+    
+    def count(self, key, amount=1):
+        with self.lock:
+            self.stats[key] += amount
+    
+    def start_outage(self, seconds):
+        with self.lock:
+            self.outage_until = time.monotonic() + seconds
+        print(f"⚠ outage for {seconds:.0f}s ({self.outage_mode})")
+    
+    def recover(self):
+        with self.lock:
+            self.outage_until = 0.0
+            self.started = time.monotonic()  # Restart the schedule from now
+        print("✓ recovered")
+    
+    def in_outage(self):
+        """Manual outage, or inside the scheduled outage window"""
+        now = time.monotonic()
+        if now < self.outage_until:
+            return True
+        if self.outage_every > 0:
+            return (now - self.started) % self.outage_every >= self.outage_every - self.outage_duration
+        return False
+    
+    def count_format(self, content_type):
+        with self.lock:
+            formats = self.stats["formats"]
+            formats[content_type] = formats.get(content_type, 0) + 1
+
+
+def parse_multipart(content_type, body):
+    """
+    Parse a multipart/form-data body
+    Returns: {field name: (filename, content type, bytes)}
+    """
+    message = BytesParser(policy=default_policy).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = (part.get_filename(), part.get_content_type(), part.get_payload(decode=True))
+    return fields
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Handles OpenAI-style audio transcription and chat completion requests"""
+    
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+    state = None
+    
+    def log_message(self, format, *args):
+        pass  # Keep the console for the summary lines below
+    
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_event(self, data):
+        """Write one server-sent event as an HTTP chunk"""
+        payload = f"data: {data}\n\n".encode()
+        self.wfile.write(f"{len(payload):x}\r\n".encode() + payload + b"\r\n")
+        self.wfile.flush()
+    
+    def send_chat(self, request):
+        """Answer a chat completion, streamed word by word when asked"""
+        state = self.state
+        state.count("chat_requests")
+        model = request.get("model", "stub")
+        created = int(time.time())
+        
+        if not request.get("stream"):
+            self.send_json(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": state.reply},
+                    "finish_reason": "stop",
+                }],
+            })
+            print("✓ chat reply")
+            return
+        
+        def chunk(delta, finish_reason=None):
+            return json.dumps({
+                "id": "chatcmpl-stub",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            })
+        
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        
+        words = state.reply.split(" ")
+        try:
+            self.send_event(chunk({"role": "assistant", "content": ""}))
+            for i, word in enumerate(words):
+                self.send_event(chunk({"content": word if i == 0 else " " + word}))
+                time.sleep(state.token_delay)
+            self.send_event(chunk({}, "stop"))
+            self.send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+            print(f"✓ chat reply streamed ({len(words)} tokens)")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            print("✗ client left mid-stream")
+    
+    def reject_for_outage(self):
+        """Fail the request the way the configured outage does"""
+        self.state.count("outage_rejections")
+        if self.state.outage_mode == "503":
+            self.send_json(503, {"error": {"message": "Simulated outage", "type": "server_error"}})
+        else:
+            self.close_connection = True
+            self.connection.close()
+    
+    def do_HEAD(self):
+        if self.state.in_outage():
+            self.reject_for_outage()
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/health", "/v1/health"):
+            self.send_json(200, {"status": "ok"})
+        elif self.path.rstrip("/") == "/stats":
+            with self.state.lock:
+                self.send_json(200, self.state.stats)
+        else:
+            self.send_json(404, {"error": {"message": "Not found"}})
+    
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        state = self.state
+        
+        url = urlparse(self.path)
+        if url.path == "/control/outage":
+            seconds = float(parse_qs(url.query).get("seconds", ["30"])[0])
+            state.start_outage(seconds)
+            self.send_json(200, {"outage_seconds": seconds})
+            return
+        if url.path == "/control/recover":
+            state.recover()
+            self.send_json(200, {"status": "ok"})
+            return
+        
+        state.count("requests")
+        state.count("bytes_received", len(body))
+        
+        path = self.path.rstrip("/")
+        if path not in ("/v1/audio/transcriptions", "/v1/chat/completions"):
+            self.send_json(404, {"error": {"message": "Not found"}})
+            return
+        
+        if state.in_outage():
+            print("✗ rejected during outage")
+            self.reject_for_outage()
+            return
+        
+        roll = random.random()
+        if roll < state.drop_rate:
+            # Connection reset without a response
+            state.count("drops")
+            self.close_connection = True
+            self.connection.close()
+            print("✗ dropped connection")
+            return
+        roll -= state.drop_rate
+        
+        if roll < state.hang_rate:
+            # Longer than any sane client deadline
+            state.count("hangs")
+            print("… hanging request")
+            time.sleep(60)
+            return
+        roll -= state.hang_rate
+        
+        time.sleep(max(0.0, state.latency + random.uniform(-state.jitter, state.jitter)))
+        
+        if roll < state.failure_rate:
+            state.count("failures")
+            print("✗ simulated 503")
+            self.send_json(503, {"error": {"message": "Simulated outage", "type": "server_error"}})
+            return
+        
+        if path == "/v1/chat/completions":
+            self.send_chat(json.loads(body or b"{}"))
+            return
+        
+        fields = parse_multipart(self.headers.get("Content-Type", ""), body)
+        filename, content_type, audio = fields.get("file", (None, None, b""))
+        state.count_format(content_type or "unknown")
+        print(f"✓ {filename} ({content_type}, {len(audio or b'')} bytes)")
+        self.send_json(200, {"text": state.text})
+
+
+def main():
+    """Server entry point"""
+    parser = argparse.ArgumentParser(description='Local OpenAI-compatible STT and chat stub server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--text', default='Hello from the stub server',
+                        help='Transcript returned for every request')
+    parser.add_argument('--reply', default='Hello! This reply was streamed by the stub server.',
+                        help='Chat reply streamed for every request')
+    parser.add_argument('--token-ms', type=float, default=40,
+                        help='Delay between streamed reply tokens')
+    parser.add_argument('--latency-ms', type=float, default=200, help='Base response latency')
+    parser.add_argument('--jitter-ms', type=float, default=50, help='Uniform latency jitter')
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='Fraction of requests answered with HTTP 503')
+    parser.add_argument('--hang-rate', type=float, default=0.0,
+                        help='Fraction of requests that never answer')
+    parser.add_argument('--drop-rate', type=float, default=0.0,
+                        help='Fraction of connections closed without a response')
+    parser.add_argument('--outage-every', type=float, default=0,
+                        help='Seconds per outage cycle (0 disables scheduled outages)')
+    parser.add_argument('--outage-duration', type=float, default=20,
+                        help='Seconds at the end of each cycle the API is down')
+    parser.add_argument('--outage-mode', choices=['drop', '503'], default='drop',
+                        help='Close connections or answer 503 during outages')
+    args = parser.parse_args()
+    
+    StubHandler.state = StubState(args)
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    server.daemon_threads = True
+    
+    print(f"Stub OpenAI server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(StubHandler.state.stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
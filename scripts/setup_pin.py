@@ -46,7 +46,8 @@ def setup_pin():
             print("❌ PINs don't match. Try again.")
             continue
         
-        # Save PIN
+        # Save PIN (the KDF is calibrated to this machine first)
+        print("Calibrating PIN hashing...")
         if storage.save_pin(pin):
             print("\n✅ PIN saved successfully!")
             print("   You can now use this PIN as a backup for face authentication.")
@@ -1,6 +1,97 @@
 // Prevents additional console window on Windows in release, DO NOT REMOVE!!
 #![cfg_attr(not(debug_assertions), windows_subsystem = "windows")]
 
+use std::io::{Read, Write};
+use std::net::{Shutdown, TcpStream};
+#[cfg(unix)]
+use std::os::unix::net::UnixStream;
+#[cfg(unix)]
+use std::path::PathBuf;
+use std::sync::Mutex;
+use tauri::ipc::{InvokeBody, Request};
+use tauri::{AppHandle, Emitter, State};
+
+// Frame types of the MAYA stream protocol (see maya/protocol.py)
+const FRAME_CONFIG: u8 = 0x01;
+const FRAME_AUDIO: u8 = 0x02;
+const FRAME_END: u8 = 0x03;
+const FRAME_RECOGNIZE: u8 = 0x04;
+const FRAME_PARTIAL: u8 = 0x11;
+const FRAME_FINAL: u8 = 0x12;
+const FRAME_ERROR: u8 = 0x13;
+const FRAME_RESULT: u8 = 0x14;
+
+const DEFAULT_STT_ADDR: &str = "127.0.0.1:8765";
+
+/// Byte stream to the Python backend (daemon socket or TCP server)
+trait Transport: Read + Write + Send {
+    fn try_clone_box(&self) -> std::io::Result<Box<dyn Transport>>;
+    fn close(&self, how: Shutdown) -> std::io::Result<()>;
+}
+
+impl Transport for TcpStream {
+    fn try_clone_box(&self) -> std::io::Result<Box<dyn Transport>> {
+        Ok(Box::new(self.try_clone()?))
+    }
+
+    fn close(&self, how: Shutdown) -> std::io::Result<()> {
+        self.shutdown(how)
+    }
+}
+
+#[cfg(unix)]
+impl Transport for UnixStream {
+    fn try_clone_box(&self) -> std::io::Result<Box<dyn Transport>> {
+        Ok(Box::new(self.try_clone()?))
+    }
+
+    fn close(&self, how: Shutdown) -> std::io::Result<()> {
+        self.shutdown(how)
+    }
+}
+
+/// Prefer the warm MAYA daemon (python -m maya.daemon); fall back to the
+/// TCP streaming server (python -m maya.stt_server)
+fn connect_backend() -> Result<Box<dyn Transport>, String> {
+    #[cfg(unix)]
+    {
+        let socket = std::env::var_os("MAYA_DAEMON_SOCKET")
+            .map(PathBuf::from)
+            .or_else(|| std::env::var_os("HOME").map(|home| PathBuf::from(home).join(".maya/maya.sock")));
+        if let Some(path) = socket.filter(|path| path.exists()) {
+            if let Ok(stream) = UnixStream::connect(&path) {
+                return Ok(Box::new(stream));
+            }
+        }
+    }
+
+    let addr = std::env::var("MAYA_STT_ADDR").unwrap_or_else(|_| DEFAULT_STT_ADDR.to_string());
+    let stream = TcpStream::connect(&addr)
+        .map_err(|e| format!("MAYA backend not reachable at {}: {}", addr, e))?;
+    stream.set_nodelay(true).map_err(|e| e.to_string())?;
+    Ok(Box::new(stream))
+}
+
+/// Streaming session with the Python backend
+struct SttStream(Mutex<Option<Box<dyn Transport>>>);
+
+fn write_frame<W: Write + ?Sized>(stream: &mut W, frame_type: u8, payload: &[u8]) -> std::io::Result<()> {
+    let mut header = [0u8; 5];
+    header[0] = frame_type;
+    header[1..].copy_from_slice(&(payload.len() as u32).to_be_bytes());
+    stream.write_all(&header)?;
+    stream.write_all(payload)
+}
+
+fn read_frame<R: Read + ?Sized>(stream: &mut R) -> std::io::Result<(u8, Vec<u8>)> {
+    let mut header = [0u8; 5];
+    stream.read_exact(&mut header)?;
+    let length = u32::from_be_bytes([header[1], header[2], header[3], header[4]]) as usize;
+    let mut payload = vec![0u8; length];
+    stream.read_exact(&mut payload)?;
+    Ok((header[0], payload))
+}
+
 #[tauri::command]
 fn greet(name: &str) -> String {
     format!("Hello, {}! Welcome to MAYA!", name)
@@ -11,9 +102,82 @@ fn exit_app() {
     std::process::exit(0);
 }
 
+/// Open a streaming session; transcripts arrive as stt-partial / stt-final events
+#[tauri::command]
+fn stt_start(app: AppHandle, state: State<SttStream>, language: String) -> Result<(), String> {
+    let mut stream = connect_backend()?;
+
+    let config = serde_json::json!({ "language": language }).to_string();
+    write_frame(&mut *stream, FRAME_CONFIG, config.as_bytes()).map_err(|e| e.to_string())?;
+
+    let mut reader = stream.try_clone_box().map_err(|e| e.to_string())?;
+    std::thread::spawn(move || {
+        while let Ok((frame_type, payload)) = read_frame(&mut *reader) {
+            let event = match frame_type {
+                FRAME_PARTIAL => "stt-partial",
+                FRAME_FINAL => "stt-final",
+                FRAME_ERROR => "stt-error",
+                _ => continue,
+            };
+            let _ = app.emit(event, String::from_utf8_lossy(&payload).into_owned());
+        }
+        let _ = app.emit("stt-closed", ());
+    });
+
+    if let Some(previous) = state.0.lock().unwrap().replace(stream) {
+        let _ = previous.close(Shutdown::Both);
+    }
+    Ok(())
+}
+
+/// Forward one chunk of 16 kHz mono PCM16 (raw invoke body)
+#[tauri::command]
+fn stt_push(request: Request<'_>, state: State<SttStream>) -> Result<(), String> {
+    let InvokeBody::Raw(pcm) = request.body() else {
+        return Err("expected raw PCM16 bytes".to_string());
+    };
+    let mut guard = state.0.lock().unwrap();
+    let stream = guard.as_mut().ok_or("STT stream not started")?;
+    write_frame(&mut **stream, FRAME_AUDIO, pcm).map_err(|e| e.to_string())
+}
+
+/// End the session; the final transcript still arrives before stt-closed
+#[tauri::command]
+fn stt_stop(state: State<SttStream>) -> Result<(), String> {
+    if let Some(mut stream) = state.0.lock().unwrap().take() {
+        write_frame(&mut *stream, FRAME_END, &[]).map_err(|e| e.to_string())?;
+        let _ = stream.close(Shutdown::Write);
+    }
+    Ok(())
+}
+
+/// Recognize the face in one camera frame (raw body: 5-byte header of
+/// height u16, width u16, channels u8, then BGR or RGBA pixels)
+#[tauri::command]
+fn face_recognize(request: Request<'_>) -> Result<serde_json::Value, String> {
+    let InvokeBody::Raw(image) = request.body() else {
+        return Err("expected raw image bytes".to_string());
+    };
+    let mut stream = connect_backend()?;
+    write_frame(&mut *stream, FRAME_RECOGNIZE, image).map_err(|e| e.to_string())?;
+    let (frame_type, payload) = read_frame(&mut *stream).map_err(|e| e.to_string())?;
+    match frame_type {
+        FRAME_RESULT => serde_json::from_slice(&payload).map_err(|e| e.to_string()),
+        _ => Err(String::from_utf8_lossy(&payload).into_owned()),
+    }
+}
+
 fn main() {
     tauri::Builder::default()
-        .invoke_handler(tauri::generate_handler![greet, exit_app])
+        .manage(SttStream(Mutex::new(None)))
+        .invoke_handler(tauri::generate_handler![
+            greet,
+            exit_app,
+            stt_start,
+            stt_push,
+            stt_stop,
+            face_recognize
+        ])
         .run(tauri::generate_context!())
         .expect("error while running tauri application");
 }
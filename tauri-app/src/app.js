@@ -6,7 +6,10 @@ class MayaApp {
         this.isCameraOn = false;
         this.language = 'en';
         this.apiMode = 'local';
-        this.mediaRecorder = null;
+        this.micStream = null;
+        this.audioContext = null;
+        this.captureNode = null;
+        this.partialMessage = null;
         this.cameraStream = null;
         
         this.init();
@@ -16,6 +19,7 @@ class MayaApp {
         console.log('Initializing MAYA...');
         this.addMessage('system', 'MAYA Tauri App is ready!');
         this.setupEventListeners();
+        await this.setupSttEvents();
         await this.setupCamera();
         
         // Optimize video playback
@@ -163,88 +167,117 @@ class MayaApp {
     }
     
     async startListening() {
+        if (!window.__TAURI__) {
+            this.addMessage('system', 'Voice input needs the MAYA desktop app.');
+            this.resetMicButton();
+            return;
+        }
+        
+        const { invoke } = window.__TAURI__.core;
         try {
-            const stream = await navigator.mediaDevices.getUserMedia({ 
+            // Python streaming STT server (python -m maya.stt_server)
+            await invoke('stt_start', { language: this.language });
+            
+            this.micStream = await navigator.mediaDevices.getUserMedia({ 
                 audio: {
                     echoCancellation: true,
                     noiseSuppression: true,
+                    channelCount: 1,
                     sampleRate: 16000
                 }
             });
             
-            this.mediaRecorder = new MediaRecorder(stream, {
-                mimeType: 'audio/webm'
-            });
-            
-            let audioChunks = [];
+            // The context resamples the microphone to the 16 kHz the server expects
+            this.audioContext = new AudioContext({ sampleRate: 16000 });
+            await this.audioContext.audioWorklet.addModule('pcm-worklet.js');
             
-            this.mediaRecorder.ondataavailable = (event) => {
-                if (event.data.size > 0) {
-                    audioChunks.push(event.data);
-                }
-            };
-            
-            this.mediaRecorder.onstop = async () => {
-                if (audioChunks.length > 0) {
-                    const audioBlob = new Blob(audioChunks, { type: 'audio/webm' });
-                    console.log('Audio recorded:', audioBlob.size, 'bytes');
-                    
-                    // Simulate transcription (replace with actual API call)
-                    this.addMessage('user', 'Voice input detected');
-                    this.addMessage('ai', 'This is a demo response. Connect to backend for real transcription.');
-                    
-                    audioChunks = [];
-                }
-                
-                // Continue listening if still active
-                if (this.isListening) {
-                    setTimeout(() => {
-                        if (this.isListening && this.mediaRecorder) {
-                            this.mediaRecorder.start();
-                            setTimeout(() => {
-                                if (this.mediaRecorder && this.mediaRecorder.state === 'recording') {
-                                    this.mediaRecorder.stop();
-                                }
-                            }, 5000);
-                        }
-                    }, 100);
-                }
+            const source = this.audioContext.createMediaStreamSource(this.micStream);
+            this.captureNode = new AudioWorkletNode(this.audioContext, 'pcm-capture', {
+                processorOptions: { chunkMs: 100 }
+            });
+            this.captureNode.port.onmessage = (event) => {
+                invoke('stt_push', new Uint8Array(event.data)).catch((error) => {
+                    console.error('Failed to stream audio:', error);
+                });
             };
+            source.connect(this.captureNode);
+            this.captureNode.connect(this.audioContext.destination);  // Outputs silence
             
-            this.mediaRecorder.start();
-            this.addMessage('system', 'Listening... (5-second intervals)');
-            
-            // Stop after 5 seconds
-            setTimeout(() => {
-                if (this.mediaRecorder && this.mediaRecorder.state === 'recording') {
-                    this.mediaRecorder.stop();
-                }
-            }, 5000);
+            this.addMessage('system', 'Listening...');
             
         } catch (error) {
-            console.error('Microphone access failed:', error);
+            console.error('Voice streaming failed:', error);
             this.isListening = false;
-            const micBtn = document.getElementById('micBtn');
-            if (micBtn) {
-                micBtn.classList.remove('active');
-                micBtn.setAttribute('data-active', 'false');
-            }
-            this.addMessage('system', 'Microphone access denied. Please grant permissions.');
+            this.resetMicButton();
+            this.releaseMicrophone();
+            this.addMessage('system', `Voice input unavailable: ${error}`);
+        }
+    }
+    
+    async setupSttEvents() {
+        if (!window.__TAURI__) return;
+        
+        const { listen } = window.__TAURI__.event;
+        await listen('stt-partial', (event) => this.showTranscript(event.payload, false));
+        await listen('stt-final', (event) => this.showTranscript(event.payload, true));
+        await listen('stt-error', (event) => {
+            console.error('STT error:', event.payload);
+            this.addMessage('system', `Transcription error: ${event.payload}`);
+        });
+    }
+    
+    showTranscript(text, isFinal) {
+        // One live bubble per utterance, replaced by each partial
+        if (!this.partialMessage) {
+            if (!text) return;
+            this.partialMessage = this.addMessage('user', '');
+        }
+        
+        const paragraph = this.partialMessage.querySelector('p');
+        paragraph.textContent = text;
+        this.partialMessage.classList.toggle('partial', !isFinal);
+        
+        if (isFinal) {
+            if (!text) this.partialMessage.remove();
+            this.partialMessage = null;
+        }
+        
+        const chatMessages = document.getElementById('chatMessages');
+        if (chatMessages) chatMessages.scrollTop = chatMessages.scrollHeight;
+    }
+    
+    resetMicButton() {
+        const micBtn = document.getElementById('micBtn');
+        if (micBtn) {
+            micBtn.classList.remove('active');
+            micBtn.setAttribute('data-active', 'false');
+        }
+    }
+    
+    releaseMicrophone() {
+        if (this.captureNode) {
+            this.captureNode.port.onmessage = null;
+            this.captureNode.disconnect();
+            this.captureNode = null;
+        }
+        if (this.audioContext) {
+            this.audioContext.close();
+            this.audioContext = null;
+        }
+        if (this.micStream) {
+            this.micStream.getTracks().forEach(track => track.stop());
+            this.micStream = null;
         }
     }
     
     stopListening() {
-        if (this.mediaRecorder) {
-            if (this.mediaRecorder.state === 'recording') {
-                this.mediaRecorder.stop();
-            }
-            
-            if (this.mediaRecorder.stream) {
-                const tracks = this.mediaRecorder.stream.getTracks();
-                tracks.forEach(track => track.stop());
-            }
-            
-            this.mediaRecorder = null;
+        this.releaseMicrophone();
+        
+        if (window.__TAURI__) {
+            // The server still sends the final transcript of the last utterance
+            window.__TAURI__.core.invoke('stt_stop').catch((error) => {
+                console.error('Failed to stop STT stream:', error);
+            });
         }
         this.addMessage('system', 'Listening stopped');
     }
@@ -279,6 +312,7 @@ class MayaApp {
         
         chatMessages.appendChild(messageDiv);
         chatMessages.scrollTop = chatMessages.scrollHeight;
+        return messageDiv;
     }
     
     async endSession() {
@@ -294,7 +328,7 @@ class MayaApp {
         }
         
         // Stop microphone
-        if (this.mediaRecorder) {
+        if (this.micStream) {
             this.stopListening();
             console.log('Microphone stopped');
         }
@@ -0,0 +1,30 @@
+// MAYA PCM capture worklet - converts microphone audio to 16-bit PCM chunks
+
+class PcmCaptureProcessor extends AudioWorkletProcessor {
+    constructor(options) {
+        super();
+        // 100 ms per chunk at the context sample rate
+        this.chunkSize = Math.round(sampleRate * (options.processorOptions?.chunkMs || 100) / 1000);
+        this.buffer = new Int16Array(this.chunkSize);
+        this.offset = 0;
+    }
+
+    process(inputs) {
+        const channel = inputs[0] && inputs[0][0];
+        if (!channel) return true;
+
+        for (let i = 0; i < channel.length; i++) {
+            const sample = Math.max(-1, Math.min(1, channel[i]));
+            this.buffer[this.offset++] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+
+            if (this.offset === this.chunkSize) {
+                this.port.postMessage(this.buffer.buffer, [this.buffer.buffer]);
+                this.buffer = new Int16Array(this.chunkSize);
+                this.offset = 0;
+            }
+        }
+        return true;
+    }
+}
+
+registerProcessor('pcm-capture', PcmCaptureProcessor);
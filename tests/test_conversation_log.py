@@ -0,0 +1,60 @@
+"""Batched writes, paging and search of ConversationLog"""
+
+import pytest
+
+from frontend.components.conversation_log import ConversationLog
+
+MESSAGES = [
+    ("What is the weather in Dhaka?", True),
+    ("Sunny and 31 degrees.", False),
+    ("Remind me to water the plants", True),
+    ("Reminder set for the plants.", False),
+    ("Thanks!", True),
+]
+
+
+@pytest.fixture
+def log(tmp_path):
+    """Log holding MESSAGES, written through the writer thread"""
+    log = ConversationLog(tmp_path / "conversations.db", flush_interval=0.01)
+    for i, (text, is_user) in enumerate(MESSAGES):
+        log.append(text, is_user, created_at=1000.0 + i)
+    log.close()  # Flushes the queue
+    return log
+
+
+def texts(rows):
+    return [row[3] for row in rows]
+
+
+def test_recent_returns_newest_page_oldest_first(log):
+    rows = log.recent(limit=2)
+    assert texts(rows) == ["Reminder set for the plants.", "Thanks!"]
+    assert rows[-1][1:3] == (1004.0, 1)
+
+
+def test_page_before_walks_back_through_history(log):
+    newest = log.recent(limit=2)
+    older = log.page_before(newest[0][0], limit=2)
+    assert texts(older) == ["Sunny and 31 degrees.", "Remind me to water the plants"]
+    assert texts(log.page_before(older[0][0], limit=2)) == ["What is the weather in Dhaka?"]
+
+
+def test_search_matches_every_word_by_prefix(log):
+    assert texts(log.search("plant remind")) == [
+        "Reminder set for the plants.", "Remind me to water the plants"
+    ]
+    assert texts(log.search("weather dhaka")) == ["What is the weather in Dhaka?"]
+    assert log.search("weather plants") == []
+
+
+def test_search_treats_fts_syntax_as_text(log):
+    assert texts(log.search('water* "plants (')) == ["Remind me to water the plants"]
+    assert log.search("   ") == []
+
+
+def test_search_without_fts_falls_back_to_like(log):
+    log.has_fts = False
+    assert texts(log.search("plant remind")) == [
+        "Reminder set for the plants.", "Remind me to water the plants"
+    ]
@@ -0,0 +1,89 @@
+"""Round-trips, tombstones, torn writes and compaction of EmbeddingStore"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+fernet = pytest.importorskip("cryptography.fernet")
+
+from frontend.components.embedding_store import EmbeddingStore  # noqa: E402
+
+
+@pytest.fixture
+def cipher():
+    return fernet.Fernet(fernet.Fernet.generate_key())
+
+
+def open_store(tmp_path, cipher, **options):
+    return EmbeddingStore(tmp_path / "embeddings.bin", cipher, **options)
+
+
+def embedding(seed, dim=128):
+    return np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+
+
+def test_put_round_trips_through_a_fresh_store(tmp_path, cipher):
+    store = open_store(tmp_path, cipher)
+    store.put("alice", embedding(1))
+    store.put("bob", embedding(2))
+    store.put("alice", embedding(3))  # Latest record wins
+    
+    loaded = open_store(tmp_path, cipher).load()
+    assert sorted(loaded) == ["alice", "bob"]
+    np.testing.assert_array_equal(loaded["alice"], embedding(3))
+    np.testing.assert_array_equal(loaded["bob"], embedding(2))
+    assert loaded["bob"].dtype == np.float32
+
+
+def test_delete_survives_reload(tmp_path, cipher):
+    store = open_store(tmp_path, cipher)
+    store.put("alice", embedding(1))
+    store.put("bob", embedding(2))
+    assert store.delete("alice")
+    assert not store.delete("alice")
+    
+    assert list(open_store(tmp_path, cipher).load()) == ["bob"]
+
+
+def test_torn_final_record_is_ignored_and_overwritten(tmp_path, cipher):
+    store = open_store(tmp_path, cipher)
+    store.put("alice", embedding(1))
+    with open(store.path, "ab") as f:
+        f.write(b"\x00\x00\x01\x00partial")  # Length prefix promising more than was written
+    
+    reopened = open_store(tmp_path, cipher)
+    assert list(reopened.load()) == ["alice"]
+    reopened.put("bob", embedding(2))
+    assert sorted(open_store(tmp_path, cipher).load()) == ["alice", "bob"]
+
+
+def test_compaction_drops_dead_records(tmp_path, cipher):
+    store = open_store(tmp_path, cipher, compact_min_dead=4)
+    for seed in range(6):
+        store.put("alice", embedding(seed))
+    assert store.dead < 4
+    
+    loaded = open_store(tmp_path, cipher).load()
+    np.testing.assert_array_equal(loaded["alice"], embedding(5))
+
+
+def test_dimension_mismatch_is_rejected(tmp_path, cipher):
+    store = open_store(tmp_path, cipher)
+    store.put("alice", embedding(1))
+    with pytest.raises(ValueError):
+        store.put("bob", embedding(2, dim=64))
+
+
+def test_replace_all_rewrites_the_store(tmp_path, cipher):
+    store = open_store(tmp_path, cipher)
+    store.put("alice", embedding(1))
+    store.replace_all({"carol": embedding(4)})
+    assert list(open_store(tmp_path, cipher).load()) == ["carol"]
+
+
+def test_put_after_replacing_a_new_store_with_nothing(tmp_path, cipher):
+    store = open_store(tmp_path, cipher)
+    store.replace_all({})  # Never loaded or created: header without a dimension
+    store.put("alice", embedding(1))
+    
+    loaded = open_store(tmp_path, cipher).load()
+    np.testing.assert_array_equal(loaded["alice"], embedding(1))
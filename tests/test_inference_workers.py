@@ -0,0 +1,99 @@
+"""Request cancellation of InferenceWorker, with the worker loop on a thread"""
+
+import queue
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PyQt6")
+pytest.importorskip("sounddevice")
+
+from frontend.components import inference_workers  # noqa: E402
+from frontend.components.inference_workers import InferenceWorker, _worker_main  # noqa: E402
+
+
+class SlowEngine:
+    """Engine whose 'wait' op runs until cancelled; 'echo' returns at once"""
+    
+    aborted = []
+    
+    def __init__(self, options, notify):
+        pass
+    
+    def ready_info(self):
+        return {}
+    
+    def handle(self, op, arrays, params, cancelled):
+        if op == "echo":
+            return float(arrays[0][0])
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if cancelled.is_set():
+                SlowEngine.aborted.append(float(arrays[0][0]))
+                raise RuntimeError("aborted")
+            time.sleep(0.005)
+        return "finished"
+
+
+class ThreadWorker(InferenceWorker):
+    """InferenceWorker running the worker loop on a thread instead of a process"""
+    
+    def _start_process(self):
+        self.ring.reset()
+        self._requests = queue.Queue()
+        self._responses = queue.Queue()
+        self.process = threading.Thread(
+            target=_worker_main,
+            args=(self.kind, self.options, self.ring.shm.name, self.ring.slots,
+                  self.ring.slot_bytes, self._states, self._cancelled, self._requests, self._responses),
+            daemon=True
+        )
+        self.process.start()
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setitem(inference_workers.ENGINES, "slow", SlowEngine)
+    SlowEngine.aborted.clear()
+    worker = ThreadWorker("slow", slots=4, slot_bytes=64)
+    assert worker.wait_ready(timeout=5)
+    yield worker
+    worker.close()
+
+
+def value(number):
+    return np.array([number], dtype=np.float32)
+
+
+def test_cancelled_request_frees_the_worker_for_the_next(worker):
+    running = worker.submit("wait", [value(1)])
+    time.sleep(0.05)  # Let it start
+    worker.cancel(running)
+    
+    started = time.monotonic()
+    assert worker.call("echo", [value(2)], timeout=2) == 2.0
+    assert time.monotonic() - started < 1.0
+    assert SlowEngine.aborted == [1.0]
+    assert running.cancelled()
+
+
+def test_cancelled_queued_request_is_skipped(worker):
+    running = worker.submit("wait", [value(1)])
+    queued = worker.submit("wait", [value(2)])
+    time.sleep(0.05)  # The first is running, the second queued behind it
+    worker.cancel(queued)
+    worker.cancel(running)
+    
+    assert worker.call("echo", [value(3)], timeout=2) == 3.0
+    assert SlowEngine.aborted == [1.0]  # The queued one never ran
+
+
+def test_stale_cancel_does_not_hit_the_next_request_in_its_slot(worker):
+    for number in range(1, 9):  # Cycles every slot twice
+        assert worker.call("echo", [value(number)], timeout=2) == float(number)
+    done = worker.submit("echo", [value(9)])
+    assert done.result(timeout=2) == 9.0
+    worker.cancel(done)  # Already finished: nothing to cancel
+    assert worker.call("echo", [value(10)], timeout=2) == 10.0
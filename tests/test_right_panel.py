@@ -0,0 +1,53 @@
+"""Streamed replies in RightPanel while older history is loaded above them"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from frontend.components.conversation_log import ConversationLog  # noqa: E402
+from frontend.components.right_panel import RightPanel  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = ConversationLog(tmp_path / "conversations.db", flush_interval=0.01)
+    yield log
+    log.close()
+
+
+def test_stream_follows_its_message_when_history_is_prepended(app, log):
+    panel = RightPanel(conversation_log=log)
+    panel.add_message("Tell me a joke", True)
+    message = panel.begin_message(is_user=False)
+    panel.append_to_message(message, "Why did ")
+    
+    # The user scrolls up and an older page is inserted above the reply
+    panel.conversation.prepend([("older question", True), ("older answer", False)])
+    panel.append_to_message(message, "the chicken cross?")
+    panel.finish_message(message)
+    
+    model = panel.conversation
+    assert message.row() == 3
+    assert [model.text(row) for row in range(model.rowCount())] == [
+        "older question", "older answer", "Tell me a joke", "Why did the chicken cross?"
+    ]
+    log.close()
+    assert [row[3] for row in log.recent()] == ["Tell me a joke", "Why did the chicken cross?"]
+
+
+def test_finishing_a_message_of_a_reset_conversation_is_ignored(app, log):
+    panel = RightPanel(conversation_log=log)
+    message = panel.begin_message(is_user=False)
+    panel.conversation.clear()
+    panel.append_to_message(message, "late token")
+    panel.finish_message(message)
+    log.close()
+    assert log.recent() == []
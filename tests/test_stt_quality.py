@@ -0,0 +1,70 @@
+"""Tier placement and RTF-driven tier changes of AdaptiveQualityController"""
+
+import pytest
+
+from frontend.components.stt_quality import QUALITY_TIERS, AdaptiveQualityController, tier_rank
+
+
+def feed(controller, rtf, times):
+    """Record the same RTF several times; returns the last decision"""
+    result = None
+    for _ in range(times):
+        result = controller.record(rtf)
+    return result
+
+
+def test_configured_tier_on_the_ladder_is_used_as_is():
+    controller = AdaptiveQualityController("small", "balanced")
+    assert controller.tiers == QUALITY_TIERS
+    assert controller.tier == ("small", "balanced")
+
+
+def test_larger_size_is_added_as_the_top_tier():
+    controller = AdaptiveQualityController("medium", "balanced")
+    assert controller.tier == ("medium", "balanced")
+    assert controller.tiers[-1] == ("medium", "balanced")
+    # Nothing above it to upgrade to; a slow machine steps down to small
+    assert feed(controller, 0.01, 3) is None
+    assert feed(controller, 1.0, 3) == ("small", "accurate")
+
+
+def test_known_size_with_new_profile_is_inserted_by_speed():
+    controller = AdaptiveQualityController("base", "accurate")
+    assert controller.tier == ("base", "accurate")
+    index = controller.index
+    assert controller.tiers[index - 1] == ("base", "balanced")
+    assert controller.tiers[index + 1] == ("small", "balanced")
+
+
+@pytest.mark.parametrize("size, expected", [
+    ("base.en", "base"),
+    ("large-v3", "large"),
+    ("large-v3-turbo", "turbo"),
+])
+def test_tier_rank_normalizes_checkpoint_names(size, expected):
+    assert tier_rank(size, "balanced") == tier_rank(expected, "balanced")
+
+
+def test_unranked_size_turns_adaptation_off():
+    controller = AdaptiveQualityController("distil-whisper", "balanced")
+    assert controller.tiers == (("distil-whisper", "balanced"),)
+    assert feed(controller, 0.01, 3) is None
+    assert feed(controller, 1.0, 3) is None
+
+
+def test_change_needs_a_full_window_of_agreeing_measurements():
+    controller = AdaptiveQualityController("base", "balanced", window=3)
+    assert feed(controller, 1.0, 2) is None
+    assert controller.record(0.2) is None  # Between thresholds breaks the run
+    assert feed(controller, 1.0, 3) == ("base", "interactive")
+    assert controller.decisions[-1]["action"] == "downgrade"
+
+
+def test_upgrade_when_fast():
+    controller = AdaptiveQualityController("base", "balanced")
+    assert feed(controller, 0.05, 3) == ("small", "balanced")
+
+
+def test_thresholds_must_leave_a_gap():
+    with pytest.raises(ValueError):
+        AdaptiveQualityController(downgrade_rtf=0.2, upgrade_rtf=0.2)
@@ -0,0 +1,104 @@
+"""Hedging, failover and cancellation of HybridSTTRouter"""
+
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PyQt6")
+pytest.importorskip("sounddevice")
+
+from frontend.components.stt_router import HybridSTTRouter  # noqa: E402
+from frontend.components.voice_listener import TranscriptionCancelled  # noqa: E402
+
+AUDIO = np.zeros(16000, dtype=np.float32)
+
+
+class FakeEngine:
+    """Answers after a delay, or fails; a set cancel event aborts the wait"""
+    
+    def __init__(self, text="", delay=0.0, error=None):
+        self.text = text
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancel_events = []
+    
+    def transcribe(self, audio, cancel_event=None):
+        self.calls += 1
+        self.cancel_events.append(cancel_event)
+        if cancel_event is not None and cancel_event.wait(self.delay):
+            raise TranscriptionCancelled()
+        if cancel_event is None:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return self.text
+
+
+def make_router(local, cloud, **options):
+    options.setdefault("hedge_after", 0.2)
+    return HybridSTTRouter(local, cloud, **options)
+
+
+def test_fast_cloud_wins_without_a_hedge():
+    local, cloud = FakeEngine("local"), FakeEngine("cloud")
+    router = make_router(local, cloud)
+    assert router.transcribe(AUDIO) == "cloud"
+    assert local.calls == 0
+    assert router.hedges_started == 0
+    assert router.wins == {"cloud": 1, "local": 0}
+
+
+def test_slow_cloud_is_hedged_and_cancelled_without_counting_as_failure():
+    local, cloud = FakeEngine("local"), FakeEngine("cloud", delay=5.0)
+    router = make_router(local, cloud, hedge_after=0.05)
+    started = time.monotonic()
+    assert router.transcribe(AUDIO) == "local"
+    assert time.monotonic() - started < 1.0
+    assert router.hedges_started == 1
+    assert cloud.cancel_events[0].is_set()
+    assert router.cloud_failures == 0
+
+
+def test_cloud_failure_starts_local_at_once():
+    local, cloud = FakeEngine("local"), FakeEngine(error=ConnectionError("offline"))
+    router = make_router(local, cloud, hedge_after=10.0)
+    started = time.monotonic()
+    assert router.transcribe(AUDIO) == "local"
+    assert time.monotonic() - started < 1.0
+    assert router.cloud_failures == 1
+
+
+def test_both_paths_failing_raises():
+    local = FakeEngine(error=RuntimeError("no model"))
+    cloud = FakeEngine(error=ConnectionError("offline"))
+    with pytest.raises(RuntimeError, match="offline"):
+        make_router(local, cloud).transcribe(AUDIO)
+
+
+def test_caller_cancel_stops_both_paths_and_leaves_its_event_alone():
+    local, cloud = FakeEngine("local", delay=5.0), FakeEngine("cloud", delay=5.0)
+    router = make_router(local, cloud, hedge_after=10.0)
+    caller_cancel = threading.Event()
+    threading.Timer(0.05, caller_cancel.set).start()
+    
+    with pytest.raises(TranscriptionCancelled):
+        router.transcribe(AUDIO, cancel_event=caller_cancel)
+    assert cloud.cancel_events[0] is not caller_cancel
+    assert cloud.cancel_events[0].is_set()
+    assert local.calls == 0  # Cancelling is no reason to hedge
+    assert router.cloud_failures == 0
+
+
+def test_repeated_cloud_failures_go_local_only():
+    local, cloud = FakeEngine("local"), FakeEngine(error=ConnectionError("offline"))
+    router = make_router(local, cloud, failure_threshold=2, unhealthy_cooldown=60.0)
+    for _ in range(2):
+        router.transcribe(AUDIO)
+    assert not router.network_healthy()
+    
+    router.transcribe(AUDIO)
+    assert cloud.calls == 2
+    assert router.stats()["wins"]["local"] == 3
@@ -0,0 +1,85 @@
+"""Per-frame coalescing of UIDispatcher"""
+
+import threading
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+from frontend.components.ui_dispatcher import UIDispatcher  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+@pytest.fixture
+def dispatcher(app):
+    return UIDispatcher(interval_ms=16)
+
+
+def test_latest_state_per_key_wins(dispatcher):
+    seen = []
+    for state in ("listening", "processing", "idle"):
+        dispatcher.set_state("waveform", seen.append, state)
+    dispatcher.flush()
+    assert seen == ["idle"]
+    assert dispatcher.received["state"] == 3
+    assert dispatcher.applied["state"] == 1
+
+
+def test_text_for_a_key_is_joined_into_one_call(dispatcher):
+    seen = []
+    for token in ("Hel", "lo", " there"):
+        dispatcher.append_text("reply", seen.append, token)
+    dispatcher.flush()
+    assert seen == ["Hello there"]
+
+
+def test_calls_run_in_order_and_are_never_merged(dispatcher):
+    seen = []
+    dispatcher.call(seen.append, 1)
+    dispatcher.set_state("status", seen.append, "a")
+    dispatcher.call(seen.append, 2)
+    dispatcher.call(seen.append, 2)
+    dispatcher.flush()
+    assert seen == [1, "a", 2, 2]
+
+
+def test_flush_applies_updates_queued_from_other_threads(dispatcher):
+    seen = []
+    
+    def produce(n):
+        for _ in range(100):
+            dispatcher.append_text("log", seen.append, "x")
+        dispatcher.call(seen.append, n)
+    
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    dispatcher.flush()
+    
+    text = [item for item in seen if isinstance(item, str)]
+    assert "".join(text) == "x" * 400
+    assert sorted(item for item in seen if isinstance(item, int)) == [0, 1, 2, 3]
+    assert dispatcher.frames == 1
+
+
+def test_failing_update_does_not_stop_the_frame(dispatcher):
+    seen = []
+    
+    def fail(value):
+        raise RuntimeError("widget gone")
+    
+    dispatcher.call(fail, None)
+    dispatcher.call(seen.append, "after")
+    dispatcher.flush()
+    assert seen == ["after"]
+
+
+def test_empty_flush_is_not_a_frame(dispatcher):
+    dispatcher.flush()
+    assert dispatcher.frames == 0
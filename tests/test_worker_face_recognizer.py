@@ -0,0 +1,94 @@
+"""Result freshness and stage tracing of WorkerFaceRecognizer"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PyQt6")
+pytest.importorskip("sounddevice")
+
+from frontend.components.inference_workers import WorkerCrashed, WorkerFaceRecognizer  # noqa: E402
+from frontend.components.tracing import tracer  # noqa: E402
+
+MATCH = {"match": True, "name": "alice", "confidence": 0.93}
+STAGES = [("face detect", 0.0, 0.004), ("face embedding", 0.004, 0.006)]
+
+
+class FakeWorker:
+    """Face worker whose recognize futures the test resolves by hand"""
+    
+    def __init__(self):
+        self.ready = threading.Event()
+        self.ready.set()
+        self.submitted = []  # (frame, future)
+        self.crashed = False
+    
+    def submit(self, op, arrays=(), params=None, drop_if_busy=False):
+        if self.crashed:
+            raise WorkerCrashed("face worker exited")
+        future = Future()
+        self.submitted.append((arrays[0], future))
+        return future
+
+
+@pytest.fixture
+def worker():
+    return FakeWorker()
+
+
+def test_nothing_is_returned_before_the_worker_answers(worker):
+    recognizer = WorkerFaceRecognizer(worker)
+    assert recognizer.recognize("frame 1") is None
+    assert recognizer.recognize("frame 2") is None
+    assert [frame for frame, _ in worker.submitted] == ["frame 1"]  # Busy: frame 2 dropped
+
+
+def test_each_result_is_returned_once(worker):
+    recognizer = WorkerFaceRecognizer(worker)
+    recognizer.recognize("frame 1")
+    worker.submitted[0][1].set_result((MATCH, STAGES, 0.011))
+    
+    assert recognizer.recognize("frame 2") == MATCH
+    # frame 2 is still in flight: a stale match must not be counted again
+    assert recognizer.recognize("frame 3") is None
+    assert recognizer.recognize("frame 4") is None
+    assert [frame for frame, _ in worker.submitted] == ["frame 1", "frame 2"]
+
+
+def test_worker_error_reads_as_no_match(worker):
+    recognizer = WorkerFaceRecognizer(worker)
+    recognizer.recognize("frame 1")
+    worker.submitted[0][1].set_exception(RuntimeError("model failed"))
+    
+    assert recognizer.recognize("frame 2")["match"] is False
+
+
+def test_nothing_is_submitted_until_ready(worker):
+    worker.ready.clear()
+    recognizer = WorkerFaceRecognizer(worker)
+    assert recognizer.recognize("frame 1") is None
+    assert worker.submitted == []
+
+
+def test_crashed_worker_returns_none(worker):
+    worker.crashed = True
+    recognizer = WorkerFaceRecognizer(worker)
+    assert recognizer.recognize("frame 1") is None
+
+
+def test_worker_stage_times_are_traced_in_the_parent(worker, monkeypatch):
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "_events", deque())
+    recognizer = WorkerFaceRecognizer(worker)
+    recognizer.recognize("frame 1")
+    worker.submitted[0][1].set_result((MATCH, STAGES, 0.011))
+    
+    spans = {event["name"]: event for event in tracer._events}
+    assert set(spans) == {"face detect", "face embedding"}
+    detect, embedding = spans["face detect"], spans["face embedding"]
+    assert detect["dur"] == 4000
+    assert embedding["ts"] - detect["ts"] == 4000
+    assert embedding["args"]["process"] == "face worker"